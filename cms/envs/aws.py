@@ -153,6 +153,26 @@ if 'loc_cache' not in CACHES:
         'LOCATION': 'edx_location_mem_cache',
     }
 
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS
+)
+COURSE_STRUCTURE_INDEXED_FIELDS = ENV_TOKENS.get('COURSE_STRUCTURE_INDEXED_FIELDS', COURSE_STRUCTURE_INDEXED_FIELDS)
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = ENV_TOKENS.get(
+    'COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES', COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES
+)
+COURSE_DEFINITION_BATCH_LOADING = ENV_TOKENS.get('COURSE_DEFINITION_BATCH_LOADING', COURSE_DEFINITION_BATCH_LOADING)
+PRECOMPUTE_INHERITED_SETTINGS = ENV_TOKENS.get('PRECOMPUTE_INHERITED_SETTINGS', PRECOMPUTE_INHERITED_SETTINGS)
+ASSET_INDEX_CACHE_TIMEOUT = ENV_TOKENS.get('ASSET_INDEX_CACHE_TIMEOUT', ASSET_INDEX_CACHE_TIMEOUT)
+ASSET_NOT_FOUND_CACHE_TIMEOUT = ENV_TOKENS.get('ASSET_NOT_FOUND_CACHE_TIMEOUT', ASSET_NOT_FOUND_CACHE_TIMEOUT)
+ASSET_FIND_REQUEST_CACHE = ENV_TOKENS.get('ASSET_FIND_REQUEST_CACHE', ASSET_FIND_REQUEST_CACHE)
+CONTENTSERVER_DISK_CACHE_DIR = ENV_TOKENS.get('CONTENTSERVER_DISK_CACHE_DIR', CONTENTSERVER_DISK_CACHE_DIR)
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'CONTENTSERVER_DISK_CACHE_MAX_SIZE', CONTENTSERVER_DISK_CACHE_MAX_SIZE
+)
+STATIC_URL_REWRITERS_MAX_ENTRIES = ENV_TOKENS.get(
+    'STATIC_URL_REWRITERS_MAX_ENTRIES', STATIC_URL_REWRITERS_MAX_ENTRIES
+)
+
 SESSION_COOKIE_DOMAIN = ENV_TOKENS.get('SESSION_COOKIE_DOMAIN')
 SESSION_COOKIE_HTTPONLY = ENV_TOKENS.get('SESSION_COOKIE_HTTPONLY', True)
 SESSION_ENGINE = ENV_TOKENS.get('SESSION_ENGINE', SESSION_ENGINE)
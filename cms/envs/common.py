@@ -276,6 +276,10 @@ FEATURES = {
     # Whether archived courses (courses with end dates in the past) should be
     # shown in Studio in a separate list.
     'ENABLE_SEPARATE_ARCHIVED_COURSES': True,
+
+    # Whether to report the time and blocks removed of each Block Structure
+    # transformer as monitoring custom metrics.
+    'PROFILE_BLOCK_STRUCTURE_TRANSFORMERS': False,
 }
 
 ENABLE_JASMINE = False
@@ -283,7 +287,7 @@ ENABLE_JASMINE = False
 ############################# SOCIAL MEDIA SHARING #############################
 SOCIAL_SHARING_SETTINGS = {
     # Note: Ensure 'CUSTOM_COURSE_URLS' has a matching value in lms/envs/common.py
-    'CUSTOM_COURSE_URLS': False
+    'CUSTOM_COURSE_URLS': False,
 }
 
 ############################# SET PATH INFORMATION #############################
@@ -531,6 +535,51 @@ MODULESTORE = {
     }
 }
 
+# Maximum number of blocks (summed over all structures) to keep in the process-local
+# LRU cache of split modulestore course structures. Set to 0 to disable it.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = 100000
+
+# Settings fields whose values are indexed, in the structures of the process-local
+# cache, to answer get_items queries on them without scanning every block.
+COURSE_STRUCTURE_INDEXED_FIELDS = ['group_access', 'is_entrance_exam']
+
+# Maximum number of split modulestore definitions to keep in the process-local LRU
+# cache, in front of the 'course_definition_cache' django cache, if it exists. Set
+# to 0 to disable it.
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = 10000
+
+# Whether fetching the definition of a lazily loaded block also fetches the pending
+# definitions of its siblings, in the same query.
+COURSE_DEFINITION_BATCH_LOADING = True
+
+# Whether blocks of the structures in the process-local cache read their inherited
+# settings from a table computed once per structure, rather than from their ancestors.
+# Disabled in Studio, which edits blocks in memory before saving them.
+PRECOMPUTE_INHERITED_SETTINGS = False
+
+# Number of seconds to cache the per-course index of asset metadata (digest, lock
+# and content type) used when rewriting static URLs. Set to 0 to disable it.
+ASSET_INDEX_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of seconds to remember that a course asset does not exist, so that repeated
+# requests of missing assets don't query GridFS each time. Set to 0 to disable it.
+ASSET_NOT_FOUND_CACHE_TIMEOUT = 60
+
+# Whether to remember the course assets found during a request, so that repeated
+# finds of the same asset don't query GridFS each time. Only the content of small
+# assets, up to a total size per request, is kept.
+ASSET_FIND_REQUEST_CACHE = True
+
+# Directory in which the contentserver caches the data of course assets too large for the
+# django cache, and the maximum total size in bytes of the cached data. Set the directory
+# to None to disable the cache.
+CONTENTSERVER_DISK_CACHE_DIR = None
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Maximum number of compiled url rewriters, one per course and set of rewriting
+# options, that a process keeps for reuse. Set to 0 to disable it.
+STATIC_URL_REWRITERS_MAX_ENTRIES = 1000
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
@@ -1414,6 +1463,11 @@ COURSE_CATALOG_API_URL = None
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
+# Number of seconds for which a pending subsection grade recalculation task accepts
+# the later recalculations of the same user's grades in the same course, which it
+# then performs at once. Set to 0 to disable coalescing.
+RECALCULATE_GRADES_COALESCE_SECONDS = 300
+
 # Queue to use for updating grades due to grading policy change
 POLICY_CHANGE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
@@ -184,6 +184,28 @@ CACHES = {
     },
 }
 
+# Structures are cached in-process outside of the django caches, which would
+# make mongo call counts depend on test ordering.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = 0
+
+# Definitions are cached in-process, and fetched along with their siblings', which
+# would make mongo call counts depend on test ordering and on the blocks accessed.
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = 0
+COURSE_DEFINITION_BATCH_LOADING = False
+
+# Asset indexes are kept in the request cache, which would make mongo call
+# counts of static URL rewriting depend on test ordering.
+ASSET_INDEX_CACHE_TIMEOUT = 0
+
+# Finds of assets are cached across tests and in the request cache, which would
+# make tests that write to GridFS directly, and mongo call counts, depend on
+# test ordering.
+ASSET_NOT_FOUND_CACHE_TIMEOUT = 0
+ASSET_FIND_REQUEST_CACHE = False
+
+# Tests of grades tasks expect each score change to enqueue its own task.
+RECALCULATE_GRADES_COALESCE_SECONDS = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
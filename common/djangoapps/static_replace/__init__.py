@@ -1,10 +1,15 @@
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
+from functools import partial
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
 
+from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
@@ -65,12 +70,20 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
     output: <text> after the link rewriting rules are applied
     """
 
-    def replace_jump_to_id_url(match):
-        quote = match.group('quote')
-        rest = match.group('rest')
-        return "".join([quote, jump_to_id_base_url + rest, quote])
+    return re.sub(
+        _url_replace_regex('/jump_to_id/'),
+        partial(_replace_jump_to_id_url, jump_to_id_base_url=jump_to_id_base_url),
+        text
+    )
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+
+def _replace_jump_to_id_url(match, jump_to_id_base_url):
+    """
+    Replace a single matched /jump_to_id/ url.
+    """
+    quote = match.group('quote')
+    rest = match.group('rest')
+    return "".join([quote, jump_to_id_base_url + rest, quote])
 
 
 def replace_course_urls(text, course_key):
@@ -83,14 +96,20 @@ def replace_course_urls(text, course_key):
     returns: text with the links replaced
     """
 
-    course_id = course_key.to_deprecated_string()
+    return re.sub(
+        _url_replace_regex('/course/'),
+        partial(_replace_course_url, course_id=course_key.to_deprecated_string()),
+        text
+    )
 
-    def replace_course_url(match):
-        quote = match.group('quote')
-        rest = match.group('rest')
-        return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+def _replace_course_url(match, course_id):
+    """
+    Replace a single matched /course/ url.
+    """
+    quote = match.group('quote')
+    rest = match.group('rest')
+    return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -98,36 +117,44 @@ def process_static_urls(text, replacement_function, data_dir=None):
     Run an arbitrary replacement function on any urls matching the static file
     directory
     """
-    def wrap_part_extraction(match):
-        """
-        Unwraps a match group for the captures specified in _url_replace_regex
-        and forward them on as function arguments
-        """
-        original = match.group(0)
-        prefix = match.group('prefix')
-        quote = match.group('quote')
-        rest = match.group('rest')
+    return re.sub(
+        _url_replace_regex(_static_url_prefix_regex(data_dir)),
+        partial(_process_static_url, replacement_function=replacement_function),
+        text
+    )
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
 
-        starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
-            return original
+def _static_url_prefix_regex(data_dir):
+    """
+    Match the prefix of static urls which are not in the given data directory.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
 
-        return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+def _process_static_url(match, replacement_function):
+    """
+    Unwraps a match group for the captures specified in _url_replace_regex
+    and forward them on as function arguments
+    """
+    original = match.group(0)
+    prefix = match.group('prefix')
+    quote = match.group('quote')
+    rest = match.group('rest')
+
+    # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
+    # works for actual static assets and for magical course asset URLs....
+    full_url = prefix + rest
+
+    starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        return original
+
+    return replacement_function(original, prefix, quote, rest)
 
 
 def make_static_urls_absolute(request, html):
@@ -160,58 +187,300 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
 
-    def replace_static_url(original, prefix, quote, rest):
+    replace_static_url = partial(
+        _replace_static_url,
+        data_directory=data_directory,
+        course_id=course_id,
+        static_asset_path=static_asset_path,
+    )
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path):
+    """
+    Replace a single matched url.
+    """
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return original
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            # Import is placed here to avoid model import at project startup.
+            from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+            base_url = AssetBaseUrlConfig.get_base_url()
+            excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
+                url = staticfiles_storage.url(rest)
+            else:
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    return "".join([quote, url, quote])
+
+
+class UrlRewriter(object):
+    """
+    Rewrites the /static/, /course/ and /jump_to_id/ urls of a course's content in a
+    single scan, with the same results as replace_static_urls, replace_course_urls
+    and replace_jump_to_id_urls applied one after another. (The only difference is
+    that a url's closing quote is never also taken as the opening quote of another.)
+
+    Use get_url_rewriter to get a rewriter whose patterns are only compiled once.
+    """
+    def __init__(self, course_id, data_directory=None, static_asset_path='', jump_to_id_base_url=None):
         """
-        Replace a single matched url.
+        course_id: The course identifier used to distinguish static content for this course in studio
+        data_directory: The directory in which course data is stored
+        static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+        jump_to_id_base_url: The base of the url to which /jump_to_id/ urls are redirected, or
+            None to leave them unchanged
         """
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            return original
+        self.course_id = course_id
+        self.static_asset_path = static_asset_path
+        prefixes = [
+            u'(?P<static>{})'.format(_static_url_prefix_regex(static_asset_path or data_directory)),
+            u'(?P<course>/course/)',
+        ]
+        if jump_to_id_base_url is not None:
+            prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
+        self._regex = re.compile(_url_replace_regex(u'|'.join(prefixes)))
+        self._replace_static_url = partial(
+            _process_static_url,
+            replacement_function=partial(
+                _replace_static_url,
+                data_directory=data_directory,
+                course_id=course_id,
+                static_asset_path=static_asset_path,
+            ),
+        )
+        self._replace_course_url = partial(_replace_course_url, course_id=course_id.to_deprecated_string())
+        self._replace_jump_to_id_url = partial(_replace_jump_to_id_url, jump_to_id_base_url=jump_to_id_base_url)
+
+    def rewrite(self, text):
+        """
+        Returns text with its urls rewritten.
+        """
+        return self._regex.sub(self._replace_url, text)
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+    def result_version(self):
+        """
+        Returns a token identifying the state, other than the text and the rewriter's own
+        arguments, on which rewritten content depends, or None if that state cannot be
+        identified and rewritten content must not be reused.
+        """
+        if settings.DEBUG:
+            # Static files found by the staticfiles finders may change at any time.
+            return None
+        if self.static_asset_path:
+            return ()
+
+        asset_index_version = AssetManager.get_asset_index_version(self.course_id)
+        if asset_index_version is None:
+            return None
+        # Import is placed here to avoid model import at project startup.
+        from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+        return (
+            asset_index_version,
+            AssetBaseUrlConfig.get_base_url(),
+            tuple(AssetExcludedExtensionsConfig.get_excluded_extensions()),
+        )
+
+    def _replace_url(self, match):
+        """
+        Replace a single matched url, according to its prefix.
+        """
+        if match.group('static') is not None:
+            return self._replace_static_url(match)
+        elif match.group('course') is not None:
+            return self._replace_course_url(match)
+        return self._replace_jump_to_id_url(match)
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
 
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
+class UrlRewriterCache(object):
+    """
+    Process-local, bounded LRU cache of UrlRewriters, keyed by the arguments they were
+    created with and the STATIC_URL.
+
+    The cache is disabled when its maximum number of entries is 0.
+    """
+    def __init__(self, max_entries=None):
+        """
+        Arguments:
+            max_entries (int): The maximum number of rewriters to hold. If None, the
+                ``STATIC_URL_REWRITERS_MAX_ENTRIES`` django setting is used.
+        """
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+    @property
+    def max_entries(self):
+        """
+        The maximum number of rewriters this cache may hold.
+        """
+        if self._max_entries is not None:
+            return self._max_entries
+        return getattr(settings, 'STATIC_URL_REWRITERS_MAX_ENTRIES', 0)
 
-        return "".join([quote, url, quote])
+    def get(self, key):
+        """Return the cached rewriter for ``key``, or None if it isn't cached."""
+        with self._lock:
+            rewriter = self._entries.pop(key, None)
+            if rewriter is not None:
+                # Re-insert to mark as most recently used
+                self._entries[key] = rewriter
+        return rewriter
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    def set(self, key, rewriter):
+        """Cache ``rewriter`` under ``key``, evicting the least recently used rewriters as needed."""
+        max_entries = self.max_entries
+        if max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= max_entries:
+                self._entries.popitem(last=False)
+            self._entries[key] = rewriter
+
+
+URL_REWRITER_CACHE = UrlRewriterCache()
+
+
+def get_url_rewriter(course_id, data_directory=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Returns a UrlRewriter for the given arguments, reusing the one created and compiled
+    by a previous call in this process while it is cached.
+    """
+    key = (course_id, data_directory, static_asset_path, jump_to_id_base_url, settings.STATIC_URL)
+    rewriter = URL_REWRITER_CACHE.get(key)
+    if rewriter is None:
+        rewriter = UrlRewriter(course_id, data_directory, static_asset_path, jump_to_id_base_url)
+        URL_REWRITER_CACHE.set(key, rewriter)
+    return rewriter
+
+
+class RewrittenContentCache(object):
+    """
+    Process-local, bounded LRU cache of rewritten content, keyed by the rewriter, a hash
+    of the original content and the rewriter's result version.
+
+    The cache is bounded by the total length of the rewritten content it holds; it is
+    disabled when the bound is 0.
+    """
+    def __init__(self, max_length=None):
+        """
+        Arguments:
+            max_length (int): The maximum length of rewritten content (summed over all
+                cached entries) to hold. If None, the ``STATIC_URL_REWRITE_CACHE_MAX_LENGTH``
+                django setting is used.
+        """
+        self._max_length = max_length
+        self._entries = OrderedDict()
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_length(self):
+        """
+        The maximum length of rewritten content this cache may hold.
+        """
+        if self._max_length is not None:
+            return self._max_length
+        return getattr(settings, 'STATIC_URL_REWRITE_CACHE_MAX_LENGTH', 0)
+
+    def get(self, key):
+        """Return the cached rewritten content for ``key``, or None if it isn't cached."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                # Re-insert to mark as most recently used
+                self._entries[key] = entry
+        return entry
+
+    def set(self, key, content):
+        """Cache ``content`` under ``key``, evicting least recently used content as needed."""
+        max_length = self.max_length
+        if len(content) > max_length:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_length -= len(previous)
+
+            while self._entries and self._total_length + len(content) > max_length:
+                __, evicted = self._entries.popitem(last=False)
+                self._total_length -= len(evicted)
+
+            self._entries[key] = content
+            self._total_length += len(content)
+
+
+REWRITTEN_CONTENT_CACHE = RewrittenContentCache()
+
+
+def replace_urls(text, course_id, data_directory=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Replace the /static/, /course/ and, if jump_to_id_base_url is not None, /jump_to_id/ urls
+    in text, as replace_static_urls, replace_course_urls and replace_jump_to_id_urls would,
+    in a single scan of text.
+
+    Unless their rewriting may have changed since, the results of previous calls with the
+    same text are reused.
+
+    text: The source text to do the substitution in
+    course_id: The course identifier used to distinguish static content for this course in studio
+    data_directory: The directory in which course data is stored
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    jump_to_id_base_url: The base of the url to which /jump_to_id/ urls are redirected
+    """
+    rewriter = get_url_rewriter(course_id, data_directory, static_asset_path, jump_to_id_base_url)
+    if not REWRITTEN_CONTENT_CACHE.max_length:
+        return rewriter.rewrite(text)
+
+    result_version = rewriter.result_version()
+    if result_version is None:
+        return rewriter.rewrite(text)
+
+    is_unicode = isinstance(text, unicode)
+    text_hash = hashlib.md5(text.encode('utf-8') if is_unicode else text).hexdigest()
+    key = (rewriter, is_unicode, text_hash, result_version)
+    rewritten = REWRITTEN_CONTENT_CACHE.get(key)
+    if rewritten is None:
+        rewritten = rewriter.rewrite(text)
+        REWRITTEN_CONTENT_CACHE.set(key, rewritten)
+    return rewritten
@@ -7,23 +7,31 @@ from urlparse import parse_qsl, urlparse, urlunparse
 
 import ddt
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import override_settings
 from django.utils.http import urlencode, urlquote
 from mock import Mock, patch
 from nose.tools import assert_equals, assert_false, assert_true  # pylint: disable=no-name-in-module
 from opaque_keys.edx.keys import CourseKey
 from PIL import Image
+from request_cache import clear_cache
 
 from static_replace import (
+    RewrittenContentCache,
+    UrlRewriterCache,
     _url_replace_regex,
+    get_url_rewriter,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
+from xmodule.contentstore.mongo import ASSET_INDEX_REQUEST_CACHE_NAME, _asset_index_cache_id, _asset_index_id
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -180,6 +188,84 @@ def test_static_url_with_query(mock_modulestore, mock_storage):
     assert_equals(post_text, replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY))
 
 
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.models.AssetBaseUrlConfig.get_base_url')
+@patch('static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
+def test_replace_urls(mock_get_excluded_extensions, mock_get_base_url, mock_storage, mock_static_content):
+    """
+    Make sure replace_urls rewrites all urls like the separate replacements do.
+    """
+    mock_storage.exists.side_effect = lambda path: path == 'js/vendor.js'
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    mock_static_content.get_canonicalized_asset_path.side_effect = lambda course_id, path, *args: '/c4x/' + path
+    mock_get_base_url.return_value = u''
+    mock_get_excluded_extensions.return_value = ['.html']
+
+    text = (
+        '<img src="/static/file.png"/><script src=\'/static/js/vendor.js\'></script>'
+        '<a href="/course/courseware">x</a><a href="/jump_to_id/abc">y</a>'
+        '<a href=\\"/static/foo.png?raw\\"></a><a href="/not-static/foo.png"></a>'
+        '<img src="/static/xblock/resources/a.b/public/c.png"/><a href="/static/file.png'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump/',
+    )
+    assert_equals(expected, replace_urls(text, COURSE_KEY, DATA_DIRECTORY, jump_to_id_base_url='/jump/'))
+    assert_equals(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        replace_urls(text, COURSE_KEY, DATA_DIRECTORY),
+    )
+
+
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.AssetManager.get_asset_index_version')
+@patch('static_replace.models.AssetBaseUrlConfig.get_base_url')
+@patch('static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
+def test_replace_urls_reuses_results(
+        mock_get_excluded_extensions, mock_get_base_url, mock_get_asset_index_version, mock_storage, mock_static_content
+):
+    """
+    Make sure replace_urls reuses its results until the course's assets change.
+    """
+    mock_storage.exists.return_value = False
+    mock_static_content.get_canonicalized_asset_path.return_value = '/c4x/file.png'
+    mock_get_base_url.return_value = u''
+    mock_get_excluded_extensions.return_value = ['.html']
+    mock_get_asset_index_version.return_value = 'version1'
+
+    with patch('static_replace.REWRITTEN_CONTENT_CACHE', RewrittenContentCache(max_length=1000)):
+        for __ in range(2):
+            assert_equals('"/c4x/file.png"', replace_urls(STATIC_SOURCE, COURSE_KEY))
+        assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 1)
+
+        mock_get_asset_index_version.return_value = 'version2'
+        assert_equals('"/c4x/file.png"', replace_urls(STATIC_SOURCE, COURSE_KEY))
+        assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 2)
+
+        # Results aren't reused if the course's assets changes cannot be tracked.
+        mock_get_asset_index_version.return_value = None
+        for __ in range(2):
+            assert_equals('"/c4x/file.png"', replace_urls(STATIC_SOURCE, COURSE_KEY))
+        assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 4)
+
+
+def test_url_rewriter_cache():
+    """
+    Make sure the url rewriters are reused, and the least recently used are evicted.
+    """
+    other_course_key = CourseKey.from_string('org/other_course/run')
+    with patch('static_replace.URL_REWRITER_CACHE', UrlRewriterCache(max_entries=1)):
+        rewriter = get_url_rewriter(COURSE_KEY)
+        assert_true(get_url_rewriter(COURSE_KEY) is rewriter)
+
+        assert_false(get_url_rewriter(other_course_key) is rewriter)
+        assert_false(get_url_rewriter(COURSE_KEY) is rewriter)
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
@@ -768,3 +854,63 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             print expected
             print asset_path
             self.assertIsNotNone(re.match(expected, asset_path))
+
+    @ddt.data('split', 'old')
+    def test_canonical_asset_path_with_asset_index(self, prefix):
+        """
+        Tests that the asset index yields the same paths as finding each asset, that it is
+        loaded with a single query, and that it is reloaded once an asset changes.
+        """
+        course_key = self.courses[prefix].id
+        content = self.create_image(prefix, (1, 1), 'blue', u'{}_indexed.png')
+        paths = [
+            path.format(prefix) for path in (
+                u'/{0}_indexed.png',
+                u'/{0}_lock.png',
+                u'/{0}_excluded.html',
+                u'/missing_{0}.png',
+                u'/{0}_ünlöck.png?foo=/static/{0}_lock.png',
+            )
+        ]
+
+        def get_asset_paths():
+            """
+            Returns the canonicalized paths of all the assets.
+            """
+            return [
+                StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', ['.html']) for path in paths
+            ]
+
+        expected_paths = get_asset_paths()
+        self.assertTrue(expected_paths[0].startswith(u'//dev/assets/courseware/'))
+
+        asset_index_cache = LocMemCache('asset_index', {})
+        with override_settings(ASSET_INDEX_CACHE_TIMEOUT=60), patch(
+            'xmodule.contentstore.mongo.ASSET_INDEX_CACHE_CHUNK_SIZE', 2
+        ):
+            with patch('xmodule.contentstore.mongo.get_asset_index_cache', return_value=asset_index_cache):
+                clear_cache(ASSET_INDEX_REQUEST_CACHE_NAME)
+                with check_mongo_calls(1):
+                    self.assertEqual(get_asset_paths(), expected_paths)
+
+                # A later request reuses the index from the cache.
+                clear_cache(ASSET_INDEX_REQUEST_CACHE_NAME)
+                with check_mongo_calls(0):
+                    self.assertEqual(get_asset_paths(), expected_paths)
+
+                # The index is reloaded if one of its chunks was evicted.
+                clear_cache(ASSET_INDEX_REQUEST_CACHE_NAME)
+                index_id = _asset_index_id(course_key)
+                index_key = u'asset_index.{}.{}'.format(
+                    _asset_index_cache_id(index_id), contentstore().get_asset_index_version(course_key)
+                )
+                self.assertGreater(asset_index_cache.get(index_key), 1)
+                asset_index_cache.delete(index_key + u'.0')
+                with check_mongo_calls(1):
+                    self.assertEqual(get_asset_paths(), expected_paths)
+
+                # Locking an asset invalidates the index.
+                contentstore().set_attr(content.location, 'locked', True)
+                with check_mongo_calls(1):
+                    locked_path = get_asset_paths()[0]
+                self.assertTrue(locked_path.startswith(u'/assets/courseware/'))
@@ -0,0 +1,134 @@
+"""
+Bulk loading of the per-course data displayed on the student dashboard.
+"""
+from collections import defaultdict
+
+from lazy import lazy
+
+from certificates.models import GeneratedCertificate, certificate_status  # pylint: disable=import-error
+from course_modes.models import CourseMode
+from courseware.access import has_access
+from openedx.features.course_experience import COURSE_PRE_START_ACCESS_FLAG
+from shoppingcart.models import CourseRegistrationCode
+from student.helpers import check_verify_status_by_course
+
+
+class DashboardData(object):
+    """
+    Loads the course modes, certificates, verification statuses, registration
+    codes and courseware access of all of a user's enrollments with a fixed
+    number of bulk queries, rather than a few queries per enrollment.
+
+    Each kind of data is loaded the first time it is used.  The per-course
+    methods are lookups into the loaded data.
+    """
+    def __init__(self, user, course_enrollments):
+        """
+        Arguments:
+            user (User): The user whose dashboard is displayed.
+            course_enrollments (list[CourseEnrollment]): The user's
+                enrollments displayed on the dashboard, with their
+                course overviews.
+        """
+        self.user = user
+        self.course_enrollments = course_enrollments
+        self.course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+    @lazy
+    def course_modes_by_course(self):
+        """
+        Returns a dict mapping each course id to a dict of its unexpired
+        course modes by slug.
+        """
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(self.course_ids)
+        return {
+            course_id: {
+                mode.slug: mode
+                for mode in modes
+            }
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+
+    @lazy
+    def certificates_by_course(self):
+        """
+        Returns a dict mapping course ids to the user's certificate in the
+        course, for the courses in which the user has one.
+        """
+        return {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(
+                user=self.user, course_id__in=self.course_ids,
+            )
+        }
+
+    @lazy
+    def verify_status_by_course(self):
+        """
+        Returns the per-course verification statuses of the user, as returned
+        by check_verify_status_by_course.
+        """
+        return check_verify_status_by_course(self.user, self.course_enrollments)
+
+    @lazy
+    def redeemed_registration_codes_by_course(self):
+        """
+        Returns a dict mapping course ids to the registration codes the user
+        redeemed in the course, with their invoices.
+        """
+        redeemed_registration_codes = defaultdict(list)
+        for registration_code in CourseRegistrationCode.objects.filter(
+                course_id__in=self.course_ids,
+                registrationcoderedemption__redeemed_by=self.user,
+        ).select_related('invoice_item__invoice'):
+            redeemed_registration_codes[registration_code.course_id].append(registration_code)
+        return redeemed_registration_codes
+
+    @lazy
+    def show_courseware_links_for(self):
+        """
+        Returns the frozenset of the ids of the courses whose courseware the
+        user can load.
+        """
+        # The course start date checks each course's override of this flag.
+        COURSE_PRE_START_ACCESS_FLAG.prefetch_course_overrides(self.course_ids)
+        return frozenset(
+            enrollment.course_id for enrollment in self.course_enrollments
+            if has_access(self.user, 'load', enrollment.course_overview)
+        )
+
+    def course_modes(self, course_id):
+        """
+        Returns a dict of the unexpired course modes of the course by slug.
+        """
+        return self.course_modes_by_course[course_id]
+
+    def certificate_status(self, course_id):
+        """
+        Returns the status of the user's certificate in the course, as
+        returned by certificates.models.certificate_status_for_student.
+        """
+        return certificate_status(
+            self.certificates_by_course.get(course_id),
+            course_mode_slugs=list(self.course_modes(course_id)),
+        )
+
+    def redeemed_registration_codes(self, course_id):
+        """
+        Returns the list of registration codes the user redeemed in the course.
+        """
+        return self.redeemed_registration_codes_by_course.get(course_id, [])
+
+    def is_paid_course(self, enrollment):
+        """
+        Returns whether the course of the enrollment is paid, as
+        CourseEnrollment.is_paid_course does.
+        """
+        selectable_modes = {
+            slug: mode for slug, mode in self.course_modes(enrollment.course_id).iteritems()
+            if slug not in CourseMode.CREDIT_MODES
+        }
+        return (
+            CourseMode.is_white_label(enrollment.course_id, modes_dict=selectable_modes) or
+            CourseMode.is_professional_slug(enrollment.mode)
+        )
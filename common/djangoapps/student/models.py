@@ -179,6 +179,35 @@ def anonymous_id_for_user(user, course_id, save=True):
     return digest
 
 
+def anonymous_ids_for_users(users, course_id):
+    """
+    Return a dict mapping the id of each of the given users to their
+    anonymous_id_for_user in the course.
+
+    The AnonymousUserIds already saved for the users are read in one
+    query, so that only the missing ones are saved one by one.
+    """
+    anonymous_ids = {user.id: anonymous_id_for_user(user, course_id, save=False) for user in users}
+    saved_ids = set(
+        AnonymousUserId.objects.filter(
+            anonymous_user_id__in=anonymous_ids.values(),
+        ).values_list('anonymous_user_id', flat=True)
+    )
+    for user in users:
+        if anonymous_ids[user.id] not in saved_ids:
+            try:
+                AnonymousUserId.objects.get_or_create(
+                    user=user,
+                    course_id=course_id,
+                    anonymous_user_id=anonymous_ids[user.id],
+                )
+            except IntegrityError:
+                # Another thread has already created this entry, so
+                # continue
+                pass
+    return anonymous_ids
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -0,0 +1,86 @@
+"""
+Tests for the bulk loading of student dashboard data.
+"""
+import unittest
+
+from django.conf import settings
+from django.test import TestCase
+
+from certificates.models import (  # pylint: disable=import-error
+    CertificateStatuses,
+    GeneratedCertificate,
+    certificate_status_for_student
+)
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+from course_modes.models import CourseMode
+from course_modes.tests.factories import CourseModeFactory
+from student.dashboard_data import DashboardData
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+class DashboardDataTest(TestCase):
+    """
+    Tests that DashboardData loads the data of all enrollments at once, and
+    matches the per-course helpers.
+    """
+    NUM_COURSES = 4
+
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory()
+        self.enrollments = [
+            CourseEnrollmentFactory(user=self.user, mode=CourseMode.VERIFIED)
+            for __ in range(self.NUM_COURSES)
+        ]
+        for enrollment in self.enrollments:
+            CourseModeFactory(course_id=enrollment.course_id, mode_slug=CourseMode.VERIFIED)
+
+        # A white label course
+        white_label_enrollment = self.enrollments[-1]
+        white_label_enrollment.mode = CourseMode.HONOR
+        white_label_enrollment.save()
+        CourseMode.objects.filter(course_id=white_label_enrollment.course_id).delete()
+        CourseModeFactory(course_id=white_label_enrollment.course_id, mode_slug=CourseMode.HONOR, min_price=10)
+
+        GeneratedCertificateFactory(
+            user=self.user,
+            course_id=self.enrollments[0].course_id,
+            status=CertificateStatuses.downloadable,
+            mode=GeneratedCertificate.MODES.verified,
+            download_url='http://www.example.com/certificate.pdf',
+        )
+        GeneratedCertificateFactory(
+            user=self.user,
+            course_id=self.enrollments[1].course_id,
+            status=CertificateStatuses.notpassing,
+            mode=GeneratedCertificate.MODES.audit,
+        )
+
+    def test_certificate_status(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        # the course modes and the certificates
+        with self.assertNumQueries(2):
+            cert_statuses = {
+                enrollment.course_id: dashboard_data.certificate_status(enrollment.course_id)
+                for enrollment in self.enrollments
+            }
+
+        for enrollment in self.enrollments:
+            self.assertEqual(
+                cert_statuses[enrollment.course_id],
+                certificate_status_for_student(self.user, enrollment.course_id)
+            )
+
+    def test_is_paid_course(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        with self.assertNumQueries(1):
+            paid_courses = [dashboard_data.is_paid_course(enrollment) for enrollment in self.enrollments]
+        self.assertEqual(paid_courses, [enrollment.is_paid_course() for enrollment in self.enrollments])
+        self.assertEqual(paid_courses, [False] * (self.NUM_COURSES - 1) + [True])
+
+    def test_redeemed_registration_codes(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        with self.assertNumQueries(1):
+            for enrollment in self.enrollments:
+                self.assertEqual(dashboard_data.redeemed_registration_codes(enrollment.course_id), [])
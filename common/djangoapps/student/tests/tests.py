@@ -39,6 +39,7 @@ from student.models import (
     LinkedInAddToProfileConfiguration,
     UserAttribute,
     anonymous_id_for_user,
+    anonymous_ids_for_users,
     unique_id_for_user,
     user_by_anonymous_id
 )
@@ -1057,6 +1058,21 @@ class AnonymousLookupTable(ModuleStoreTestCase):
             self.assertEqual(self.user, user_by_anonymous_id(anonymous_id))
             self.assertEqual(self.user, user_by_anonymous_id(new_anonymous_id))
 
+    def test_anonymous_ids_for_users(self):
+        other_user = UserFactory.create()
+        saved_id = anonymous_id_for_user(self.user, self.course.id)
+        users = [User.objects.get(pk=self.user.id), User.objects.get(pk=other_user.id)]
+
+        # The missing id is saved
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+        self.assertEqual(anonymous_ids[self.user.id], saved_id)
+        self.assertEqual(other_user, user_by_anonymous_id(anonymous_ids[other_user.id]))
+
+        # Once all are saved, they're read in a single query
+        users = [User.objects.get(pk=self.user.id), User.objects.get(pk=other_user.id)]
+        with self.assertNumQueries(1):
+            self.assertEqual(anonymous_ids_for_users(users, self.course.id), anonymous_ids)
+
 
 @attr(shard=3)
 @skip_unless_lms
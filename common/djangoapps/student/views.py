@@ -93,13 +93,13 @@ from openedx.features.enterprise_support.api import (
     get_dashboard_consent_notification
 )
 from shoppingcart.api import order_history
-from shoppingcart.models import CourseRegistrationCode, DonationConfiguration
+from shoppingcart.models import DonationConfiguration
 from student.cookies import delete_logged_in_cookies, set_logged_in_cookies, set_user_info_cookie
+from student.dashboard_data import DashboardData
 from student.forms import AccountCreationForm, PasswordResetFormNoActive, get_registration_extension_form
 from student.helpers import (
     DISABLE_UNENROLL_CERT_STATES,
     auth_pipeline_urls,
-    check_verify_status_by_course,
     destroy_oauth_tokens,
     get_next_url_for_login_page
 )
@@ -227,7 +227,7 @@ def process_survey_link(survey_link, user):
     return survey_link.format(UNIQUE_ID=unique_id_for_user(user))
 
 
-def cert_info(user, course_overview, course_mode):
+def cert_info(user, course_overview, course_mode, dashboard_data=None):
     """
     Get the certificate info needed to render the dashboard section for the given
     student and course.
@@ -236,6 +236,8 @@ def cert_info(user, course_overview, course_mode):
         user (User): A user.
         course_overview (CourseOverview): A course.
         course_mode (str): The enrollment mode (honor, verified, audit, etc.)
+        dashboard_data (DashboardData): If given, the user's certificate is
+            looked up in the certificates it loaded.
 
     Returns:
         dict: A dictionary with keys:
@@ -247,12 +249,11 @@ def cert_info(user, course_overview, course_mode):
             'grade': if status is not 'processing'
             'can_unenroll': if status allows for unenrollment
     """
-    return _cert_info(
-        user,
-        course_overview,
-        certificate_status_for_student(user, course_overview.id),
-        course_mode
-    )
+    if dashboard_data is not None:
+        cert_status = dashboard_data.certificate_status(course_overview.id)
+    else:
+        cert_status = certificate_status_for_student(user, course_overview.id)
+    return _cert_info(user, course_overview, cert_status, course_mode)
 
 
 def reverification_info(statuses):
@@ -688,16 +689,10 @@ def dashboard(request):
     # sort the enrollment pairs by the enrollment date
     course_enrollments.sort(key=lambda x: x.created, reverse=True)
 
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
-    course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in unexpired_course_modes.iteritems()
-    }
+    # Load the course modes, certificates, verification statuses and access of
+    # all the enrollments with a fixed number of bulk queries.
+    dashboard_data = DashboardData(user, course_enrollments)
+    course_modes_by_course = dashboard_data.course_modes_by_course
 
     # Check to see if the student has recently enrolled in a course.
     # If so, display a notification message confirming the enrollment.
@@ -756,10 +751,7 @@ def dashboard(request):
         staff_access = True
         errored_courses = modulestore().get_errored_courses()
 
-    show_courseware_links_for = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if has_access(request.user, 'load', enrollment.course_overview)
-    )
+    show_courseware_links_for = dashboard_data.show_courseware_links_for
 
     # Find programs associated with course runs being displayed. This information
     # is passed in the template context to allow rendering of program-related
@@ -792,9 +784,11 @@ def dashboard(request):
     #
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
-    verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
+    verify_status_by_course = dashboard_data.verify_status_by_course
     cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
+        enrollment.course_id: cert_info(
+            request.user, enrollment.course_overview, enrollment.mode, dashboard_data=dashboard_data
+        )
         for enrollment in course_enrollments
     }
 
@@ -818,17 +812,14 @@ def dashboard(request):
         enrollment.course_id for enrollment in course_enrollments
         if is_course_blocked(
             request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
+            dashboard_data.redeemed_registration_codes(enrollment.course_id),
             enrollment.course_id
         )
     )
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
+        if dashboard_data.is_paid_course(enrollment)
     )
 
     # If there are *any* denied reverifications that have not been toggled off,
@@ -9,6 +9,24 @@ backends.
 from __future__ import absolute_import
 
 import abc
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class BatchSendError(Exception):
+    """
+    Raised by `send_batch` when some of the events of a batch could not be
+    sent, once the others have been.
+
+    """
+
+    def __init__(self, num_failed, num_events):
+        super(BatchSendError, self).__init__(
+            '{} of {} events could not be sent'.format(num_failed, num_events)
+        )
+        self.num_failed = num_failed
+        self.num_events = num_events
 
 
 class BaseBackend(object):
@@ -25,3 +43,23 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker.
+
+        Backends which can write several events at once should override
+        this; by default each event is sent in turn. An event which can't
+        be sent doesn't prevent the others from being sent, and
+        BatchSendError is raised once they all were tried.
+
+        """
+        num_failed = 0
+        for event in events:
+            try:
+                self.send(event)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Error sending event to the %s event tracker backend', self.__class__.__name__)
+                num_failed += 1
+        if num_failed:
+            raise BatchSendError(num_failed, len(events))
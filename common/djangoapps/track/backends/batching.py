@@ -0,0 +1,201 @@
+"""
+Event tracker backend that queues events in memory and sends them in
+batches to another backend from a background thread.
+
+Sending events to MongoDB or to the tracking log happens on the request
+thread, so a burst of events adds its write latency to the request. This
+backend wraps the slow backend: `send` only appends the event to a
+bounded queue, and a worker thread hands the queued events to the
+wrapped backend's `send_batch` every `flush_interval` seconds, or as soon
+as `batch_size` events are queued. The queue is flushed when the process
+exits.
+
+Example configuration::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.batching.BatchingBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {'database': 'track'},
+              },
+              'batch_size': 100,
+              'flush_interval': 1,
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend, BatchSendError
+
+log = logging.getLogger(__name__)
+
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+
+class BatchingBackend(BaseBackend):
+    """
+    Event tracker backend that sends events to another backend in batches,
+    from a background thread.
+
+    The number of events queued, dropped because the queue was full, sent,
+    and lost because the wrapped backend failed to send them, are kept in
+    `queued_count`, `dropped_count`, `sent_count` and `failed_count`.
+
+    """
+
+    def __init__(
+            self, backend, max_queue_size=10000, batch_size=100, flush_interval=1.0,
+            overflow_policy=DROP_NEWEST, shutdown_timeout=5.0, **kwargs
+    ):
+        """
+        :Parameters:
+
+          - `backend`: dict with the `ENGINE` and `OPTIONS` of the wrapped
+            backend, as in the TRACKING_BACKENDS setting
+          - `max_queue_size`: maximum number of events waiting to be sent
+          - `batch_size`: maximum number of events sent at once, and number
+            of queued events which triggers a flush before the interval
+          - `flush_interval`: seconds between two flushes of the queue
+          - `overflow_policy`: which event is dropped when the queue is
+            full, either the event being sent (`drop_newest`) or the
+            oldest queued event (`drop_oldest`)
+          - `shutdown_timeout`: seconds to wait for the worker thread to
+            finish its flush when the process exits
+
+        """
+        super(BatchingBackend, self).__init__(**kwargs)
+
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy {}, expected one of {}'.format(
+                overflow_policy, ', '.join(OVERFLOW_POLICIES)
+            ))
+
+        # avoid circular import: the tracker instantiates this backend when imported
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.shutdown_timeout = shutdown_timeout
+
+        self.queued_count = 0
+        self.dropped_count = 0
+        self.sent_count = 0
+        self.failed_count = 0
+
+        self._events = deque()
+        # Guards the queue and the worker thread
+        self._lock = threading.Lock()
+        # Held while sending, so that batches are sent one at a time and in order
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._stopping = False
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent by the worker thread."""
+        with self._lock:
+            self._ensure_worker()
+            if len(self._events) >= self.max_queue_size:
+                self.dropped_count += 1
+                dog_stats_api.increment('track.backends.batching.dropped')
+                if self.overflow_policy == DROP_NEWEST:
+                    return
+                self._events.popleft()
+            self._events.append(event)
+            self.queued_count += 1
+            queue_size = len(self._events)
+
+        if queue_size >= self.batch_size:
+            self._wakeup.set()
+
+    def send_batch(self, events):
+        """Queue the events to be sent by the worker thread."""
+        for event in events:
+            self.send(event)
+
+    def flush(self):
+        """Send all the queued events to the wrapped backend."""
+        with self._send_lock:
+            while True:
+                with self._lock:
+                    batch = [self._events.popleft() for __ in xrange(min(self.batch_size, len(self._events)))]
+                if not batch:
+                    return
+                try:
+                    self.backend.send_batch(batch)
+                except BatchSendError as exc:
+                    # The rest of the batch was sent
+                    log.warning('Error sending %d of %d events to the %s event tracker backend',
+                                exc.num_failed, len(batch), self.backend.__class__.__name__)
+                    self._count_sent(len(batch) - exc.num_failed, exc.num_failed)
+                except Exception:  # pylint: disable=broad-except
+                    # Keep the worker alive, the next batches may be sent
+                    log.exception('Error sending %d events to the %s event tracker backend',
+                                  len(batch), self.backend.__class__.__name__)
+                    self._count_sent(0, len(batch))
+                else:
+                    self._count_sent(len(batch), 0)
+
+    def _count_sent(self, num_sent, num_failed):
+        """Record the number of events of a batch which were sent, and which were lost."""
+        self.sent_count += num_sent
+        if num_failed:
+            self.failed_count += num_failed
+            dog_stats_api.increment('track.backends.batching.failed', num_failed)
+
+    def close(self):
+        """Stop the worker thread and send the remaining queued events."""
+        with self._lock:
+            worker = self._worker if self._worker_pid == os.getpid() else None
+            self._stopping = True
+        self._wakeup.set()
+        if worker is not None:
+            worker.join(self.shutdown_timeout)
+        self.flush()
+
+    def _ensure_worker(self):
+        """
+        Start the worker thread if it isn't running in this process.
+
+        Threads don't survive a fork, so the worker is started on the first
+        event sent by each process. The events queued by the parent process
+        before the fork are left for the parent to send.
+
+        Must be called with self._lock held.
+        """
+        if self._stopping or (self._worker is not None and self._worker_pid == os.getpid()):
+            return
+        if self._worker_pid is not None:
+            self._events.clear()
+        self._worker_pid = os.getpid()
+        self._worker = threading.Thread(target=self._run, name='track.backends.batching')
+        self._worker.daemon = True
+        self._worker.start()
+
+    def _run(self):
+        """Flush the queue every flush interval, or when woken up, until closed."""
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
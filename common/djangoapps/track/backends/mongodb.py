@@ -7,9 +7,9 @@ import logging
 import pymongo
 from bson.errors import BSONError
 from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+from pymongo.errors import BulkWriteError, PyMongoError
 
-from track.backends import BaseBackend
+from track.backends import BaseBackend, BatchSendError
 
 log = logging.getLogger(__name__)
 
@@ -96,3 +96,40 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """
+        Insert the events in to the Mongo collection at once.
+
+        If the batch can't be encoded or sent, the events are inserted one
+        at a time, so that a bad event doesn't lose the others. Raises
+        BatchSendError when some of the events could not be inserted.
+
+        """
+        if not events:
+            return
+        try:
+            # insert_many sets the _id of the documents it inserts, so
+            # insert copies to leave the events untouched for the other
+            # backends they are sent to.
+            self.collection.insert_many([dict(event) for event in events], ordered=False)
+        except BulkWriteError as exc:
+            # The server inserted the documents it didn't report as errors,
+            # inserting the batch again would duplicate them.
+            num_failed = len(exc.details.get('writeErrors', [])) or len(events)
+            log.exception('Error inserting %d events to MongoDB event tracker backend', num_failed)
+            raise BatchSendError(num_failed, len(events))
+        except (PyMongoError, BSONError):
+            log.exception(
+                'Error inserting %d events to MongoDB event tracker backend, inserting them one at a time',
+                len(events)
+            )
+            num_failed = 0
+            for event in events:
+                try:
+                    self.collection.insert(event, manipulate=False)
+                except (PyMongoError, BSONError):
+                    log.exception('Error inserting to MongoDB event tracker backend')
+                    num_failed += 1
+            if num_failed:
+                raise BatchSendError(num_failed, len(events))
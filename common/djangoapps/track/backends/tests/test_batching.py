@@ -0,0 +1,126 @@
+"""Tests for the batching event tracker backend."""
+from __future__ import absolute_import
+
+import threading
+
+from django.test import TestCase
+
+from track.backends import BaseBackend, BatchSendError
+from track.backends.batching import BatchingBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """Backend recording the batches of events it is sent."""
+
+    def __init__(self, fail=False, fail_events=(), **kwargs):
+        super(InMemoryBackend, self).__init__(**kwargs)
+        self.fail = fail
+        self.fail_events = fail_events
+        self.batches = []
+        self.sent = threading.Event()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        if self.fail:
+            raise Exception('Cannot send events')
+        self.batches.append([event for event in events if event['event'] not in self.fail_events])
+        self.sent.set()
+        num_failed = len(events) - len(self.batches[-1])
+        if num_failed:
+            raise BatchSendError(num_failed, len(events))
+
+
+class TestBatchingBackend(TestCase):
+    """Tests that BatchingBackend queues events and sends them in batches."""
+
+    def _create_backend(self, **options):
+        """Returns a BatchingBackend wrapping an InMemoryBackend, closed on cleanup."""
+        options.setdefault('flush_interval', 60)
+        backend = BatchingBackend(
+            backend={
+                'ENGINE': 'track.backends.tests.test_batching.InMemoryBackend',
+                'OPTIONS': options.pop('wrapped_options', {}),
+            },
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_flush_in_batches(self):
+        backend = self._create_backend(batch_size=10)
+        for event in range(5):
+            backend.send({'event': event})
+        # Sent in batches of at most batch_size events
+        backend.batch_size = 2
+        backend.flush()
+
+        self.assertEqual(
+            backend.backend.batches,
+            [[{'event': 0}, {'event': 1}], [{'event': 2}, {'event': 3}], [{'event': 4}]]
+        )
+        self.assertEqual((backend.queued_count, backend.sent_count), (5, 5))
+
+    def test_flush_when_batch_is_full(self):
+        backend = self._create_backend(batch_size=2)
+        backend.send({'event': 0})
+        backend.send({'event': 1})
+
+        self.assertTrue(backend.backend.sent.wait(5))
+        self.assertEqual(backend.backend.batches, [[{'event': 0}, {'event': 1}]])
+
+    def test_flush_interval(self):
+        backend = self._create_backend(batch_size=10, flush_interval=0.01)
+        backend.send({'event': 0})
+
+        self.assertTrue(backend.backend.sent.wait(5))
+        self.assertEqual(backend.backend.batches, [[{'event': 0}]])
+
+    def test_drop_newest(self):
+        backend = self._create_backend(max_queue_size=2, batch_size=10)
+        for event in range(4):
+            backend.send({'event': event})
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'event': 0}, {'event': 1}]])
+        self.assertEqual(backend.dropped_count, 2)
+
+    def test_drop_oldest(self):
+        backend = self._create_backend(max_queue_size=2, batch_size=10, overflow_policy='drop_oldest')
+        for event in range(4):
+            backend.send({'event': event})
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'event': 2}, {'event': 3}]])
+        self.assertEqual(backend.dropped_count, 2)
+
+    def test_invalid_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            self._create_backend(overflow_policy='block')
+
+    def test_failed_batches(self):
+        backend = self._create_backend(batch_size=10, wrapped_options={'fail': True})
+        backend.send({'event': 0})
+        backend.send({'event': 1})
+        backend.flush()
+
+        self.assertEqual((backend.sent_count, backend.failed_count), (0, 2))
+
+    def test_partially_failed_batches(self):
+        backend = self._create_backend(batch_size=10, wrapped_options={'fail_events': [1]})
+        for event in range(3):
+            backend.send({'event': event})
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'event': 0}, {'event': 2}]])
+        self.assertEqual((backend.sent_count, backend.failed_count), (2, 1))
+
+    def test_close(self):
+        backend = self._create_backend(batch_size=10)
+        backend.send({'event': 0})
+        worker = backend._worker  # pylint: disable=protected-access
+        backend.close()
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(backend.backend.batches, [[{'event': 0}]])
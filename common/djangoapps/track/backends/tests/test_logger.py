@@ -8,6 +8,7 @@ import datetime
 
 from django.test import TestCase
 
+from track.backends import BatchSendError
 from track.backends.logger import LoggerBackend
 
 
@@ -49,6 +50,26 @@ class TestLoggerBackend(TestCase):
         self.assertEqual(saved_events[0], unpacked_event)
         self.assertEqual(saved_events[1], unpacked_event)
 
+    def test_logger_backend_batch(self):
+        self.handler.reset()
+
+        # Each event of the batch is logged as its own record
+        self.backend.send_batch([{'test': 1}, {'test': 2}])
+
+        saved_events = [json.loads(e) for e in self.handler.messages['info']]
+        self.assertEqual(saved_events, [{'test': 1}, {'test': 2}])
+
+    def test_logger_backend_batch_error(self):
+        self.handler.reset()
+
+        # The event which can't be serialized doesn't lose the others
+        with self.assertRaises(BatchSendError) as context:
+            self.backend.send_batch([{'test': 1}, {'test': '\xff'}, {'test': 3}])
+
+        self.assertEqual(context.exception.num_failed, 1)
+        saved_events = [json.loads(e) for e in self.handler.messages['info']]
+        self.assertEqual(saved_events, [{'test': 1}, {'test': 3}])
+
 
 class MockLoggingHandler(logging.Handler):
     """
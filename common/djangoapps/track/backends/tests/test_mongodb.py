@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 
+from bson.errors import InvalidDocument
 from mock import patch
 
 from django.test import TestCase
 
+from track.backends import BatchSendError
 from track.backends.mongodb import MongoBackend
 
 
@@ -37,3 +39,25 @@ class TestMongoBackend(TestCase):
 
         self.assertEqual(events[0], first_argument(calls[0]))
         self.assertEqual(events[1], first_argument(calls[1]))
+
+    def test_mongo_backend_batch(self):
+        events = [{'test': 1}, {'test': 2}]
+
+        self.backend.send_batch(events)
+
+        self.backend.collection.insert_many.assert_called_once_with(events, ordered=False)
+
+    def test_mongo_backend_batch_error(self):
+        events = [{'test': 1}, {'test': 2}, {'test': 3}]
+        self.backend.collection.insert_many.side_effect = InvalidDocument('Cannot encode object')
+        self.backend.collection.insert.side_effect = [None, InvalidDocument('Cannot encode object'), None]
+
+        # Each event is inserted in turn, and the one which failed is reported
+        with self.assertRaises(BatchSendError) as context:
+            self.backend.send_batch(events)
+
+        self.assertEqual(context.exception.num_failed, 1)
+        self.assertEqual(
+            [call[1][0] for call in self.backend.collection.insert.mock_calls],
+            events
+        )
@@ -22,6 +22,9 @@ from django.contrib.auth.models import User
 
 from student.models import anonymous_id_for_user
 
+# Keywords whose values are the same for all the users of a course.
+COURSE_KEYWORDS = ('%%COURSE_DISPLAY_NAME%%', '%%COURSE_END_DATE%%')
+
 
 def anonymous_id_from_user_id(user_id):
     """
@@ -31,12 +34,13 @@ def anonymous_id_from_user_id(user_id):
     return anonymous_id_for_user(user, None)
 
 
-def substitute_keywords(string, user_id, context):
+def substitute_keywords(string, user_id, context, keywords=None):
     """
     Replaces all %%-encoded words using KEYWORD_FUNCTION_MAP mapping functions
 
     Iterates through all keywords that must be substituted and replaces
     them by calling the corresponding functions stored in KEYWORD_FUNCTION_MAP.
+    If `keywords` is given, only those keywords are substituted.
 
     Functions stored in KEYWORD_FUNCTION_MAP must return a replacement string.
     """
@@ -49,7 +53,7 @@ def substitute_keywords(string, user_id, context):
         '%%COURSE_END_DATE%%': lambda: context.get('course_end_date'),
     }
 
-    for key in KEYWORD_FUNCTION_MAP.keys():
+    for key in (keywords if keywords is not None else KEYWORD_FUNCTION_MAP.keys()):
         if key in string:
             substitutor = KEYWORD_FUNCTION_MAP[key]
             string = string.replace(key, substitutor())
@@ -73,3 +77,16 @@ def substitute_keywords_with_data(string, context):
         return string
 
     return substitute_keywords(string, user_id, context)
+
+
+def substitute_course_keywords(string, context):
+    """
+    Given an email context, replaces only the %%-encoded words whose values
+    are the same for all the users of the course, so that a string sent to
+    many users of a course can be substituted once before the per-user
+    substitutions.
+    """
+    if context.get('course_title') is None:
+        return string
+
+    return substitute_keywords(string, None, context, keywords=COURSE_KEYWORDS)
@@ -124,3 +124,21 @@ class KeywordSubTest(ModuleStoreTestCase):
         )
         result = Ks.substitute_keywords_with_data(test_string, no_user_id_context)
         self.assertEqual(test_string, result)
+
+    def test_course_keywords_sub(self):
+        """
+        Test that only the keywords of the course are subbed, and that
+        the per-user keywords are left for later substitution.
+        """
+        test_string = "%%USER_FULLNAME%% is enrolled in %%COURSE_DISPLAY_NAME%% until %%COURSE_END_DATE%%"
+        result = Ks.substitute_course_keywords(test_string, self.context)
+        self.assertEqual(
+            result,
+            "%%USER_FULLNAME%% is enrolled in {} until {}".format(
+                self.context['course_title'], self.context['course_end_date']
+            )
+        )
+        self.assertEqual(
+            Ks.substitute_keywords_with_data(result, self.context),
+            Ks.substitute_keywords_with_data(test_string, self.context),
+        )
@@ -1,12 +1,15 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main function as of now is evaluator(). To evaluate
+an expression many times, parse it once with compile_expression().
 """
 
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 import scipy.constants
@@ -64,6 +67,11 @@ DEFAULT_FUNCTIONS = {
     'arccsch': functions.arccsch,
     'arccoth': functions.arccoth
 }
+# Functions that apply elementwise to arrays of samples.
+VECTORIZABLE_FUNCTIONS = frozenset(
+    func for func in DEFAULT_FUNCTIONS.itervalues()
+    if func not in (math.factorial, functions.arccot)
+)
 DEFAULT_VARIABLES = {
     'i': numpy.complex(0, 1),
     'j': numpy.complex(0, 1),
@@ -87,6 +95,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of expressions kept compiled by compile_expression().
+COMPILED_EXPRESSION_CACHE_SIZE = 1000
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -94,6 +106,14 @@ class UndefinedVariable(Exception):
     pass
 
 
+class _NotVectorizable(Exception):
+    """
+    Indicate that an expression can't be evaluated over arrays of samples
+    at once, and must be evaluated for each sample in turn.
+    """
+    pass
+
+
 def lower_dict(input_dict):
     """
     Convert all keys in a dictionary to lowercase; keep their original values.
@@ -242,34 +262,228 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return CompiledExpression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+_compiled_expressions = OrderedDict()  # pylint: disable=invalid-name
+_compiled_expressions_lock = threading.Lock()  # pylint: disable=invalid-name
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return the CompiledExpression for the given expression.
+
+    The most recently used COMPILED_EXPRESSION_CACHE_SIZE expressions are kept
+    compiled, so use this for expressions evaluated over and over, like the
+    answers of problems. Raise a `pyparsing.ParseException` if the expression
+    can't be parsed.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            # Re-insert to mark as most recently used
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    An expression parsed once, to be evaluated any number of times.
+
+    The parse tree is turned into nested functions of the variables and
+    functions to evaluate it with, which give the same results as
+    `evaluator`. Compiled expressions are immutable, so they may be shared.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse the given expression.
+
+        Raise a `pyparsing.ParseException` if it can't be parsed.
+        """
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        if case_sensitive:
+            self._casify = lambda x: x
+        else:
+            self._casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        if math_expr.strip() == "":
+            self._parser = None
+            self._evaluate = lambda variables, functions: float('nan')
+        else:
+            self._parser = ParseAugmenter(math_expr, case_sensitive)
+            self._parser.parse_algebra()
+            self._evaluate = self._compile(self._parser.tree)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression, like `evaluator`.
+        """
+        all_variables, all_functions = self._get_defaults_and_check(variables, functions)
+        return self._evaluate(all_variables, all_functions)
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the given dictionaries of
+        variables, and return the list of results.
+
+        When every sample gives the same real-valued variables and every
+        function used applies elementwise, the expression is evaluated once
+        over NumPy arrays of the samples. Otherwise, or if that fails, it is
+        evaluated for each sample in turn, which raises any error that
+        `evaluator` would.
+        """
+        if len(variables_list) > 1:
+            results = self._evaluate_vectorized(variables_list, functions)
+            if results is not None:
+                return results
+        return [self.evaluate(variables, functions) for variables in variables_list]
+
+    def _get_defaults_and_check(self, variables, functions):
+        """
+        Return the variables and functions, with defaults, to evaluate the
+        expression with, after checking they define all that it uses.
+        """
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        if self._parser is not None:
+            self._parser.check_variables(all_variables, all_functions)
+        return all_variables, all_functions
+
+    def _evaluate_vectorized(self, variables_list, functions):
+        """
+        Evaluate the expression over arrays of the values of the variables
+        in the given samples, and return the list of results, or None if it
+        can't be vectorized.
+        """
+        names = set(variables_list[0])
+        if any(set(variables) != names for variables in variables_list):
+            return None
+        sample_arrays = {}
+        for name in names:
+            values = [variables[name] for variables in variables_list]
+            if not all(isinstance(value, numbers.Real) for value in values):
+                return None
+            sample_arrays[name] = numpy.array(values, dtype=float)
+
+        all_variables, all_functions = self._get_defaults_and_check(sample_arrays, functions)
+        if self._parser is not None:
+            used_variables = [all_variables[self._casify(name)] for name in self._parser.variables_used]
+            used_functions = [all_functions[self._casify(name)] for name in self._parser.functions_used]
+            if not all(isinstance(value, (numbers.Real, numpy.ndarray)) for value in used_variables):
+                return None
+            if not all(func in VECTORIZABLE_FUNCTIONS for func in used_functions):
+                return None
+
+        try:
+            # Raise rather than return infinities or NaNs, so that they
+            # come from evaluating each sample, as with `evaluator`.
+            with numpy.errstate(divide='raise', over='raise', invalid='raise', under='ignore'):
+                result = self._evaluate(all_variables, all_functions)
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+        if numpy.ndim(result) == 0:
+            return [result] * len(variables_list)
+        return list(result)
+
+    def _compile(self, node):
+        """
+        Return a function of the variables and functions to evaluate the
+        given node of the parse tree with, that returns its value.
+
+        Like `ParseAugmenter.reduce_tree` with the actions of `evaluator`,
+        the children of a node are all evaluated before it.
+        """
+        node_name = node.getName()
+        children = [child for child in node if isinstance(child, ParseResults)]
+
+        if node_name == 'number':
+            value = eval_number(list(node))
+            return lambda variables, functions: value
+
+        elif node_name == 'variable':
+            name = self._casify(node[0])
+            return lambda variables, functions: variables[name]
+
+        elif node_name == 'function':
+            name = self._casify(node[0])
+            argument = self._compile(node[1])
+            return lambda variables, functions: functions[name](argument(variables, functions))
+
+        elif node_name == 'atom':
+            # Ignore parentheses.
+            return self._compile(children[0])
+
+        compiled_children = [self._compile(child) for child in children]
+        if node_name in ('power', 'parallel') and len(compiled_children) == 1:
+            return compiled_children[0]
+
+        if node_name == 'power':
+            def evaluate_power(variables, functions):
+                """
+                Exponentiate right to left, like `eval_power`.
+                """
+                values = [child(variables, functions) for child in compiled_children]
+                return reduce(lambda a, b: b ** a, reversed(values))
+            return evaluate_power
+
+        elif node_name == 'parallel':
+            def evaluate_parallel(variables, functions):
+                """
+                Combine as parallel resistors, like `eval_parallel`.
+                """
+                values = [child(variables, functions) for child in compiled_children]
+                if any(_is_zero(value) for value in values):
+                    return float('nan')
+                return 1. / sum(1. / value for value in values)
+            return evaluate_parallel
+
+        elif node_name in ('product', 'sum'):
+            if node_name == 'product':
+                initial_value, current_op = 1.0, operator.mul
+                operators = {'*': operator.mul, '/': operator.truediv}
+            else:
+                initial_value, current_op = 0.0, operator.add
+                operators = {'+': operator.add, '-': operator.sub}
+            ops = []
+            for child in node:
+                if isinstance(child, ParseResults):
+                    ops.append(current_op)
+                else:
+                    current_op = operators[child]
+
+            def evaluate_operations(variables, functions):
+                """
+                Apply the operations in order, like `eval_product` and `eval_sum`.
+                """
+                values = [child(variables, functions) for child in compiled_children]
+                total = initial_value
+                for op, value in zip(ops, values):
+                    total = op(total, value)
+                return total
+            return evaluate_operations
+
+        raise Exception(u"Unknown branch name '{}'".format(node_name))  # pragma: no cover
+
+
+def _is_zero(value):
+    """
+    Return whether the value is zero. Raise _NotVectorizable if the value is
+    an array with a zero, so that those samples are evaluated in turn.
+    """
+    if isinstance(value, numpy.ndarray):
+        if (value == 0).any():
+            raise _NotVectorizable
+        return False
+    return value == 0
 
 
 class ParseAugmenter(object):
@@ -559,3 +559,62 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and calc.CompiledExpression
+    """
+    samples = [{'x': 1.5, 'y': 2.0}, {'x': -0.5, 'y': 3.0}, {'x': 2.0, 'y': 0.25}]
+
+    def assert_evaluates_like_evaluator(self, math_expr, samples):
+        """
+        Check that evaluating the compiled expression over all the samples
+        gives the same results as `evaluator` does for each.
+        """
+        expected = [calc.evaluator(variables, {}, math_expr) for variables in samples]
+        results = calc.compile_expression(math_expr).evaluate_many(samples, {})
+        self.assertEqual(len(expected), len(results))
+        for expected_value, value in zip(expected, results):
+            if numpy.isnan(expected_value):
+                self.assertTrue(numpy.isnan(value))
+            else:
+                self.assertAlmostEqual(expected_value, value, delta=1e-12)
+
+    def test_evaluate_many(self):
+        """
+        Vectorized expressions, and those evaluated per sample, should
+        match evaluator.
+        """
+        for math_expr in ('x+1', '-x^2 + 3*y', 'sin(x)/cos(y)', 'x||y', 'y^0.5', 'x*i', 'fact(3)*x', '5k', ''):
+            self.assert_evaluates_like_evaluator(math_expr, self.samples)
+        self.assert_evaluates_like_evaluator('x||y', self.samples + [{'x': 0.0, 'y': 1.0}])
+
+    def test_evaluate_many_errors(self):
+        """
+        Errors should be raised as by evaluator.
+        """
+        compiled = calc.compile_expression('x/(y-y)')
+        with self.assertRaises(ZeroDivisionError):
+            compiled.evaluate_many(self.samples, {})
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.compile_expression('x+z').evaluate_many(self.samples, {})
+        with self.assertRaises(ValueError):
+            calc.compile_expression('fact(x)').evaluate_many(self.samples, {})
+
+    def test_compiled_expressions_cached(self):
+        """
+        Expressions should be compiled once, until they are evicted.
+        """
+        calc_module = calc.calc
+        cache_size = calc_module.COMPILED_EXPRESSION_CACHE_SIZE
+        self.addCleanup(setattr, calc_module, 'COMPILED_EXPRESSION_CACHE_SIZE', cache_size)
+        calc_module.COMPILED_EXPRESSION_CACHE_SIZE = 10
+
+        compiled = calc.compile_expression('x^2 + y')
+        self.assertIs(compiled, calc.compile_expression('x^2 + y'))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + y', case_sensitive=True))
+
+        for index in range(calc_module.COMPILED_EXPRESSION_CACHE_SIZE):
+            calc.compile_expression(str(index))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + y'))
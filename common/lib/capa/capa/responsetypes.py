@@ -42,7 +42,7 @@ import capa.safe_exec as safe_exec
 import capa.xqueue_interface as xqueue_interface
 import dogstats_wrapper as dog_stats_api
 # specific library imports
-from calc import UndefinedVariable, evaluator
+from calc import CompiledExpression, UndefinedVariable, compile_expression, evaluator
 from cmath import isnan
 from openedx.core.djangolib.markup import HTML, Text
 
@@ -3085,23 +3085,26 @@ class FormulaResponse(LoncapaResponse):
         )
         return CorrectMap(self.answer_id, correctness)
 
-    def tupleize_answers(self, answer, var_dict_list):
+    def tupleize_answers(self, answer, var_dict_list, cache_compiled=False):
         """
         Takes in an answer and a list of dictionaries mapping variables to values.
         Each dictionary represents a test case for the answer.
         Returns a tuple of formula evaluation results.
+
+        The answer is parsed once for all the test cases.  If cache_compiled
+        is True, as for instructor answers, the parsed answer is also cached
+        for later calls.
         """
         _ = self.capa_system.i18n.ugettext
 
         out = []
-        for var_dict in var_dict_list:
+        if var_dict_list:
             try:
-                out.append(evaluator(
-                    var_dict,
-                    dict(),
-                    answer,
-                    case_sensitive=self.case_sensitive,
-                ))
+                if cache_compiled:
+                    compiled_answer = compile_expression(answer, self.case_sensitive)
+                else:
+                    compiled_answer = CompiledExpression(answer, self.case_sensitive)
+                out = compiled_answer.evaluate_many(var_dict_list, dict())
             except UndefinedVariable as err:
                 log.debug(
                     'formularesponse: undefined variable in formula=%s',
@@ -3174,7 +3177,7 @@ class FormulaResponse(LoncapaResponse):
         """
         var_dict_list = self.randomize_variables(samples)
         student_result = self.tupleize_answers(given, var_dict_list)
-        instructor_result = self.tupleize_answers(expected, var_dict_list)
+        instructor_result = self.tupleize_answers(expected, var_dict_list, cache_compiled=True)
 
         correct = all(compare_with_tolerance(student, instructor, self.tolerance)
                       for student, instructor in zip(student_result, instructor_result))
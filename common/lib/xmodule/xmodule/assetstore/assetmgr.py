@@ -58,3 +58,20 @@ class AssetManager(object):
         compressed course structure from the structure cache.
         """
         return contentstore().find(asset_key, throw_on_not_found, as_stream)
+
+    @staticmethod
+    def get_asset_index(course_key):
+        """
+        Returns the index of the metadata of the course's assets in the deprecated contentstore,
+        mapping the (category, name) of each asset to its AssetIndexEntry, or None if the
+        contentstore does not provide one.
+        """
+        return contentstore().get_asset_index(course_key)
+
+    @staticmethod
+    def get_asset_index_version(course_key):
+        """
+        Returns a token which changes whenever any of the course's assets changes in the
+        deprecated contentstore, or None if the contentstore does not track such changes.
+        """
+        return contentstore().get_asset_index_version(course_key)
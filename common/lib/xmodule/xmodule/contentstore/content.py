@@ -14,6 +14,7 @@ VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
 import os
 import logging
 import StringIO
+from collections import namedtuple
 from urlparse import urlparse, urlunparse, parse_qsl
 from urllib import urlencode, quote_plus
 
@@ -24,6 +25,9 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 from PIL import Image
 
+# The metadata of an asset which is needed to build URLs to it.
+AssetIndexEntry = namedtuple('AssetIndexEntry', ['content_digest', 'locked', 'content_type'])
+
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
@@ -246,13 +250,21 @@ class StaticContent(object):
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        asset_index = AssetManager.get_asset_index(asset_key.course_key)
+        if asset_index is not None:
+            # If the item isn't in the index, just treat it as if it's locked.
+            index_entry = asset_index.get((asset_key.category, asset_key.name))
+            if index_entry is not None:
+                serve_from_cdn = not index_entry.locked
+                content_digest = index_entry.content_digest
+        else:
+            try:
+                content = AssetManager.find(asset_key, as_stream=True)
+                serve_from_cdn = not getattr(content, "locked", True)
+                content_digest = getattr(content, "content_digest", None)
+            except (ItemNotFoundError, NotFoundError):
+                # If we can't find the item, just treat it as if it's locked.
+                serve_from_cdn = False
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -294,6 +306,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -316,7 +334,7 @@ class StaticContentStream(StaticContent):
 
     def stream_data(self):
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._read_chunk()
             if len(chunk) == 0:
                 break
             yield chunk
@@ -326,16 +344,37 @@ class StaticContentStream(StaticContent):
         Stream the data between first_byte and last_byte (included)
         """
         self._stream.seek(first_byte)
-        position = first_byte
-        while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
-                chunk = self._stream.read(last_byte - position + 1)
-                yield chunk
+        remaining = last_byte - first_byte + 1
+        while remaining > 0:
+            chunk = self._read_chunk()
+            if len(chunk) == 0:
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+            remaining -= len(chunk)
             yield chunk
 
+    def _read_chunk(self):
+        """
+        Reads the next chunk of data from the stream.  GridFS files are read one of
+        their stored chunks at a time, without copying them; other streams are read
+        STREAM_DATA_CHUNK_SIZE bytes at a time.
+        """
+        readchunk = getattr(self._stream, 'readchunk', None)
+        if readchunk is not None:
+            return readchunk()
+        return self._stream.read(STREAM_DATA_CHUNK_SIZE)
+
+    def with_stream(self, stream):
+        """
+        Returns a copy of this content which streams its data from the given stream.
+        """
+        return StaticContentStream(
+            self.location, self.name, self.content_type, stream, last_modified_at=self.last_modified_at,
+            thumbnail_location=self.thumbnail_location, import_path=self.import_path, length=self.length,
+            locked=self.locked, content_digest=self.content_digest,
+        )
+
     def close(self):
         self._stream.close()
 
@@ -358,6 +397,20 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
+    def get_asset_index(self, course_key):
+        '''
+        Returns a dict mapping the (category, name) of each of the course's assets to its
+        AssetIndexEntry, or None if this ContentStore does not provide asset indexes.
+        '''
+        return None
+
+    def get_asset_index_version(self, course_key):
+        '''
+        Returns a token which changes whenever any of the course's assets changes, or None if
+        this ContentStore does not track such changes.
+        '''
+        return None
+
     def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
@@ -1,8 +1,10 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import hashlib
 import os
 import json
+import uuid
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
@@ -10,13 +12,64 @@ from fs.osfs import OSFS
 from bson.son import SON
 
 from mongodb_proxy import autoretry_read
+from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import AssetKey
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
-from .content import StaticContent, ContentStore, StaticContentStream
+from .content import AssetIndexEntry, StaticContent, ContentStore, StaticContentStream
+
+try:
+    from django.conf import settings
+    from django.core.cache import caches, InvalidCacheBackendError
+    DJANGO_AVAILABLE = True
+except ImportError:
+    DJANGO_AVAILABLE = False
+
+try:
+    # We may not always have the request_cache module available
+    from request_cache.middleware import RequestCache
+    HAS_REQUEST_CACHE = True
+except ImportError:
+    HAS_REQUEST_CACHE = False
+
+# Name of the request cache holding the asset indexes loaded during the current request.
+ASSET_INDEX_REQUEST_CACHE_NAME = 'contentstore.asset_index'
+
+# Maximum number of assets stored in a single django cache entry of an asset index, which
+# keeps the entries of courses with thousands of assets under memcached's 1MB item limit.
+ASSET_INDEX_CACHE_CHUNK_SIZE = 500
+
+# Name of the request cache holding the results of the finds of assets during the current request.
+ASSET_FIND_REQUEST_CACHE_NAME = 'contentstore.find'
+
+# Marks the assets found not to exist in the request cache of finds.
+_ASSET_NOT_FOUND = object()
+
+# Largest asset, and largest total length of the assets, whose content is kept in the request
+# cache of finds. Exports and other requests reading many, or large, assets would otherwise hold
+# all of their content in memory until the request ends.
+ASSET_FIND_REQUEST_CACHE_MAX_ASSET_LENGTH = 64 * 1024
+ASSET_FIND_REQUEST_CACHE_MAX_TOTAL_LENGTH = 4 * 1024 * 1024
+
+# Key of the total length of the assets kept in the request cache of finds.
+_FIND_CACHE_LENGTH_KEY = u'_cached_length'
+
+
+def get_asset_index_cache():
+    """
+    Returns the django cache in which asset indexes and the keys of missing assets are stored,
+    or None if django is not available.
+    Uses the "course_assets" cache if one is configured, and the default cache otherwise.
+    """
+    if not DJANGO_AVAILABLE:
+        return None
+    try:
+        return caches['course_assets']
+    except InvalidCacheBackendError:
+        return caches['default']
 
 
 class MongoContentStore(ContentStore):
@@ -100,6 +153,8 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._forget_missing_asset(content_id)
+        self._invalidate_asset_index(content.location.course_key)
         return content
 
     def delete(self, location_or_id):
@@ -110,47 +165,134 @@ class MongoContentStore(ContentStore):
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        self._invalidate_asset_index_for_id(location_or_id)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
+        """
+        See :meth:`.ContentStore.find`
+
+        The assets found not to exist, and the small assets found other than as streams, are
+        remembered in the request cache when ASSET_FIND_REQUEST_CACHE is enabled.  Assets
+        found not to exist are also remembered for ASSET_NOT_FOUND_CACHE_TIMEOUT seconds
+        in the django cache, so that repeated requests of missing assets, e.g. broken
+        links, don't query GridFS each time.  Saving an asset forgets that it was missing.
+        """
         content_id, __ = self.asset_db_key(location)
+        find_cache = self._get_find_request_cache()
+        find_cache_key = unicode(location)
+
+        content = find_cache.get(find_cache_key)
+        if content is None and self._is_missing_asset(content_id):
+            content = find_cache[find_cache_key] = _ASSET_NOT_FOUND
+        if content is _ASSET_NOT_FOUND:
+            if throw_on_not_found:
+                raise NotFoundError(content_id)
+            return None
+        if content is not None and not as_stream:
+            return content
 
         try:
-            if as_stream:
-                fp = self.fs.get(content_id)
+            content = self._find(location, content_id, as_stream)
+        except NoFile:
+            self._remember_missing_asset(content_id)
+            find_cache[find_cache_key] = _ASSET_NOT_FOUND
+            if throw_on_not_found:
+                raise NotFoundError(content_id)
+            else:
+                return None
+
+        if not as_stream:
+            self._remember_found_asset(find_cache, find_cache_key, content)
+        return content
+
+    def _find(self, location, content_id, as_stream):
+        """
+        Returns the asset with the given location and database _id, loaded from GridFS.
+        Raises NoFile if it does not exist.
+        """
+        if as_stream:
+            fp = self.fs.get(content_id)
+            thumbnail_location = getattr(fp, 'thumbnail_location', None)
+            if thumbnail_location:
+                thumbnail_location = location.course_key.make_asset_key(
+                    'thumbnail',
+                    thumbnail_location[4]
+                )
+            return StaticContentStream(
+                location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                thumbnail_location=thumbnail_location,
+                import_path=getattr(fp, 'import_path', None),
+                length=fp.length, locked=getattr(fp, 'locked', False),
+                content_digest=getattr(fp, 'md5', None),
+            )
+        else:
+            with self.fs.get(content_id) as fp:
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
                         'thumbnail',
                         thumbnail_location[4]
                     )
-                return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                return StaticContent(
+                    location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False),
                     content_digest=getattr(fp, 'md5', None),
                 )
-            else:
-                with self.fs.get(content_id) as fp:
-                    thumbnail_location = getattr(fp, 'thumbnail_location', None)
-                    if thumbnail_location:
-                        thumbnail_location = location.course_key.make_asset_key(
-                            'thumbnail',
-                            thumbnail_location[4]
-                        )
-                    return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
-                        thumbnail_location=thumbnail_location,
-                        import_path=getattr(fp, 'import_path', None),
-                        length=fp.length, locked=getattr(fp, 'locked', False),
-                        content_digest=getattr(fp, 'md5', None),
-                    )
-        except NoFile:
-            if throw_on_not_found:
-                raise NotFoundError(content_id)
-            else:
-                return None
+
+    @staticmethod
+    def _get_find_request_cache():
+        """
+        Returns the request cache of the results of finds, or a throwaway dict if it is disabled.
+        """
+        if HAS_REQUEST_CACHE and DJANGO_AVAILABLE and getattr(settings, 'ASSET_FIND_REQUEST_CACHE', False):
+            return RequestCache.get_request_cache(ASSET_FIND_REQUEST_CACHE_NAME)
+        return {}
+
+    @staticmethod
+    def _remember_found_asset(find_cache, find_cache_key, content):
+        """
+        Remembers the found asset in the request cache of finds, unless it is larger than
+        ASSET_FIND_REQUEST_CACHE_MAX_ASSET_LENGTH, or the cache would then hold more than
+        ASSET_FIND_REQUEST_CACHE_MAX_TOTAL_LENGTH of content.
+        """
+        length = len(content.data)
+        cached_length = find_cache.get(_FIND_CACHE_LENGTH_KEY, 0) + length
+        if length > ASSET_FIND_REQUEST_CACHE_MAX_ASSET_LENGTH:
+            return
+        if cached_length > ASSET_FIND_REQUEST_CACHE_MAX_TOTAL_LENGTH:
+            return
+        find_cache[find_cache_key] = content
+        find_cache[_FIND_CACHE_LENGTH_KEY] = cached_length
+
+    @staticmethod
+    def _is_missing_asset(content_id):
+        """
+        Returns whether the asset with the given database _id was recently found not to exist.
+        """
+        if not (DJANGO_AVAILABLE and getattr(settings, 'ASSET_NOT_FOUND_CACHE_TIMEOUT', 0)):
+            return False
+        return get_asset_index_cache().get(_missing_asset_key(content_id)) is not None
+
+    @staticmethod
+    def _remember_missing_asset(content_id):
+        """
+        Remembers that the asset with the given database _id does not exist, for
+        ASSET_NOT_FOUND_CACHE_TIMEOUT seconds.
+        """
+        timeout = getattr(settings, 'ASSET_NOT_FOUND_CACHE_TIMEOUT', 0) if DJANGO_AVAILABLE else 0
+        if timeout:
+            get_asset_index_cache().set(_missing_asset_key(content_id), True, timeout)
+
+    @staticmethod
+    def _forget_missing_asset(content_id):
+        """
+        Forgets that the asset with the given database _id was found not to exist.
+        """
+        if DJANGO_AVAILABLE and getattr(settings, 'ASSET_NOT_FOUND_CACHE_TIMEOUT', 0):
+            get_asset_index_cache().delete(_missing_asset_key(content_id))
 
     def export(self, location, output_directory):
         content = self.find(location)
@@ -225,6 +367,7 @@ class MongoContentStore(ContentStore):
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
                 self.fs.delete(asset[prefix])
+                self._invalidate_asset_index_for_id(asset[prefix])
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -311,6 +454,7 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._invalidate_asset_index(location.course_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -367,6 +511,8 @@ class MongoContentStore(ContentStore):
                 # getattr b/c caching may mean some pickled instances don't have attr
                 locked=asset.get('locked', False)
             )
+            self._forget_missing_asset(asset_id)
+        self._invalidate_asset_index(dest_course_key)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -379,6 +525,109 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+        self._invalidate_asset_index(course_key)
+
+    def get_asset_index(self, course_key):
+        """
+        See :meth:`.ContentStore.get_asset_index`
+
+        The index is loaded with a single query and kept in the request cache and, for
+        ASSET_INDEX_CACHE_TIMEOUT seconds, in the django cache. Entries in the django cache are
+        stored under a generation token which is replaced whenever the course's assets change,
+        so an index loaded concurrently with a change is never used afterwards.
+
+        Returns None if the index is disabled, i.e. ASSET_INDEX_CACHE_TIMEOUT is 0.
+        """
+        timeout = getattr(settings, 'ASSET_INDEX_CACHE_TIMEOUT', 0) if DJANGO_AVAILABLE else 0
+        if not timeout:
+            return None
+
+        index_id = _asset_index_id(course_key)
+        request_cache = RequestCache.get_request_cache(ASSET_INDEX_REQUEST_CACHE_NAME) if HAS_REQUEST_CACHE else {}
+        if index_id in request_cache:
+            return request_cache[index_id]
+
+        cache = get_asset_index_cache()
+        cache_key = u'asset_index.{}.{}'.format(
+            _asset_index_cache_id(index_id), self._get_asset_index_generation(index_id)
+        )
+        asset_index = _get_cached_asset_index(cache, cache_key)
+        if asset_index is None:
+            asset_index = self._load_asset_index(course_key)
+            _set_cached_asset_index(cache, cache_key, asset_index, timeout)
+        request_cache[index_id] = asset_index
+        return asset_index
+
+    def get_asset_index_version(self, course_key):
+        """
+        See :meth:`.ContentStore.get_asset_index_version`
+
+        Returns the generation token of the course's asset index, or None if the index is
+        disabled or its generation cannot be stored.
+        """
+        if not (DJANGO_AVAILABLE and getattr(settings, 'ASSET_INDEX_CACHE_TIMEOUT', 0)):
+            return None
+        return self._get_asset_index_generation(_asset_index_id(course_key))
+
+    @autoretry_read()
+    def _load_asset_index(self, course_key):
+        """
+        Returns the asset index of the given course, loaded from the database.
+        """
+        asset_index = {}
+        projection = ['content_son', 'md5', 'locked', 'contentType']
+        for asset in self.fs_files.find(query_for_course(course_key), projection):
+            asset_id = asset.get('content_son', asset['_id'])
+            asset_index[(asset_id['category'], asset_id['name'])] = AssetIndexEntry(
+                content_digest=asset.get('md5'),
+                locked=asset.get('locked', False),
+                content_type=asset.get('contentType'),
+            )
+        return asset_index
+
+    @staticmethod
+    def _get_asset_index_generation(index_id):
+        """
+        Returns the token of the current generation of the asset index identified by index_id.
+        """
+        cache = get_asset_index_cache()
+        generation_key = _asset_index_generation_key(index_id)
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, uuid.uuid4().hex, None)
+            generation = cache.get(generation_key)
+        return generation
+
+    def _invalidate_asset_index(self, course_key):
+        """
+        Discards the cached asset index of the given course.
+        """
+        self._invalidate_asset_index_by_id(_asset_index_id(course_key))
+
+    def _invalidate_asset_index_for_id(self, content_id):
+        """
+        Discards the cached asset index of the course owning the asset with the given database _id.
+        """
+        if isinstance(content_id, basestring):
+            try:
+                index_id = _asset_index_id(AssetKey.from_string(content_id).course_key)
+            except InvalidKeyError:
+                return
+        else:
+            index_id = (content_id['org'], content_id['course'], content_id.get('run'))
+        self._invalidate_asset_index_by_id(index_id)
+
+    @staticmethod
+    def _invalidate_asset_index_by_id(index_id):
+        """
+        Discards the cached asset index identified by index_id, and the assets found during
+        the current request.
+        """
+        if HAS_REQUEST_CACHE:
+            RequestCache.get_request_cache(ASSET_INDEX_REQUEST_CACHE_NAME).pop(index_id, None)
+            RequestCache.clear_request_cache(ASSET_FIND_REQUEST_CACHE_NAME)
+        if DJANGO_AVAILABLE and getattr(settings, 'ASSET_INDEX_CACHE_TIMEOUT', 0):
+            get_asset_index_cache().set(_asset_index_generation_key(index_id), uuid.uuid4().hex, None)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -503,6 +752,72 @@ class MongoContentStore(ContentStore):
         )
 
 
+def _asset_index_id(course_key):
+    """
+    Returns the (org, course, run) tuple identifying the assets of the given course, the
+    same way as query_for_course does. Deprecated courses' assets have no run.
+    """
+    if getattr(course_key, 'deprecated', False):
+        return course_key.org, course_key.course, None
+    return course_key.org, course_key.course, course_key.run
+
+
+def _get_cached_asset_index(cache, cache_key):
+    """
+    Returns the asset index stored in the cache under cache_key, or None if it, or any of
+    its chunks, isn't cached.
+    """
+    num_chunks = cache.get(cache_key)
+    if num_chunks is None:
+        return None
+    chunk_keys = [u'{}.{}'.format(cache_key, chunk) for chunk in range(num_chunks)]
+    chunks = cache.get_many(chunk_keys)
+    if len(chunks) != num_chunks:
+        return None
+    asset_index = {}
+    for chunk_key in chunk_keys:
+        asset_index.update(chunks[chunk_key])
+    return asset_index
+
+
+def _set_cached_asset_index(cache, cache_key, asset_index, timeout):
+    """
+    Stores the asset index in the cache under cache_key, split in chunks of at most
+    ASSET_INDEX_CACHE_CHUNK_SIZE assets.
+    """
+    entries = sorted(asset_index.items())
+    chunks = {
+        u'{}.{}'.format(cache_key, chunk): dict(entries[start:start + ASSET_INDEX_CACHE_CHUNK_SIZE])
+        for chunk, start in enumerate(range(0, len(entries), ASSET_INDEX_CACHE_CHUNK_SIZE))
+    }
+    cache.set_many(chunks, timeout)
+    # Stored last, so that the index isn't read before all of its chunks are cached.
+    cache.set(cache_key, len(chunks), timeout)
+
+
+def _asset_index_cache_id(index_id):
+    """
+    Returns a string identifying the asset index identified by index_id which is safe to use
+    in cache keys.
+    """
+    return hashlib.md5(repr(index_id)).hexdigest()
+
+
+def _asset_index_generation_key(index_id):
+    """
+    Returns the cache key of the token of the current generation of the asset index
+    identified by index_id.
+    """
+    return u'asset_index.generation.{}'.format(_asset_index_cache_id(index_id))
+
+
+def _missing_asset_key(content_id):
+    """
+    Returns the cache key of the mark that the asset with the given database _id does not exist.
+    """
+    return u'asset_not_found.{}'.format(hashlib.md5(repr(content_id)).hexdigest())
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
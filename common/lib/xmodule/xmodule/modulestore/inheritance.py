@@ -307,6 +307,14 @@ class InheritingFieldData(KvsFieldData):
         The default for an inheritable name is found on a parent.
         """
         if name in self.inheritable_names:
+            if getattr(self._kvs, 'ancestor_settings', None) is not None:
+                # The settings of the block's ancestors are precomputed, so don't walk
+                # up the content tree.
+                try:
+                    return self._kvs.inherited_default(name)
+                except KeyError:
+                    return super(InheritingFieldData, self).default(block, name)
+
             # Walk up the content tree to find the first ancestor
             # that this field is set on. Use the field from the current
             # block so that if it has a different default than the root
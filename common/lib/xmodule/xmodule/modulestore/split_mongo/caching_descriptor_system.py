@@ -1,3 +1,4 @@
+import copy
 import sys
 import logging
 
@@ -19,8 +20,14 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import inheriting_field_data, InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.id_manager import SplitMongoIdManager
-from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionLazyLoader
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_LRU_CACHE
+from xmodule.modulestore.split_mongo.definition_lazy_loader import (
+    DefinitionBatchLoader,
+    DefinitionLazyLoader,
+    batch_loading_enabled
+)
 from xmodule.modulestore.split_mongo.split_mongo_kvs import SplitMongoKVS
+from xmodule.modulestore.split_mongo.structure_index import inherited_settings_enabled
 from xmodule.x_module import XModuleMixin
 
 log = logging.getLogger(__name__)
@@ -93,6 +100,30 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 parent_map[child] = block_key
         return parent_map
 
+    @lazy
+    def _definition_batch_loader(self):
+        """
+        Fetches the definitions of lazily loaded blocks along with their siblings', or
+        None if batch loading is disabled.
+        """
+        if not batch_loading_enabled():
+            return None
+        return DefinitionBatchLoader(self.modulestore, self.course_entry.structure['blocks'], self._parent_map)
+
+    @lazy
+    def _inherited_settings(self):
+        """
+        The inheritable settings each block inherits from its ancestors, precomputed for
+        the structure, or None if the structure isn't cached (and so may be modified) or
+        if precomputing them is disabled.
+        """
+        if not inherited_settings_enabled():
+            return None
+        structure_index = STRUCTURE_LRU_CACHE.get_index(self.course_entry.structure)
+        if structure_index is None:
+            return None
+        return structure_index.inherited_settings
+
     @contract(usage_key="BlockUsageLocator | BlockKey", course_entry_override="CourseEnvelope | None")
     def _load_item(self, usage_key, course_entry_override=None, **kwargs):
         """
@@ -198,6 +229,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                block_key=block_key,
+                batch_loader=self._definition_batch_loader,
             )
         else:
             definition_loader = None
@@ -212,14 +245,20 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
             block_id=block_key.id,
         )
 
-        converted_fields = convert_fields(block_data.fields)
-        converted_defaults = convert_fields(block_data.defaults)
+        # convert_fields only copies the dicts themselves, and the runtime may modify the values,
+        # which are shared with the structure's blocks and, through the process cache, other threads.
+        converted_fields = convert_fields(copy.deepcopy(block_data.fields))
+        converted_defaults = convert_fields(copy.deepcopy(block_data.defaults))
         if block_key in self._parent_map:
             parent_key = self._parent_map[block_key]
             parent = course_key.make_usage_key(parent_key.type, parent_key.id)
         else:
             parent = None
 
+        ancestor_settings = None
+        if InheritanceMixin in self.modulestore.xblock_mixins and self._inherited_settings is not None:
+            ancestor_settings = self._inherited_settings.get(block_key)
+
         aside_fields = None
 
         # for the situation if block_data has no asides attribute
@@ -239,7 +278,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 converted_defaults,
                 parent=parent,
                 aside_fields=aside_fields,
-                field_decorator=kwargs.get('field_decorator')
+                field_decorator=kwargs.get('field_decorator'),
+                ancestor_settings=ancestor_settings,
             )
 
             if InheritanceMixin in self.modulestore.xblock_mixins:
@@ -1,6 +1,22 @@
 from opaque_keys.edx.locator import DefinitionLocator
 import copy
 
+try:
+    from django.conf import settings
+    DJANGO_AVAILABLE = True
+except ImportError:
+    DJANGO_AVAILABLE = False
+
+
+def batch_loading_enabled():
+    """
+    Returns whether the definitions of lazily loaded blocks are fetched along with their
+    siblings', per the COURSE_DEFINITION_BATCH_LOADING django setting.
+    """
+    if DJANGO_AVAILABLE:
+        return getattr(settings, 'COURSE_DEFINITION_BATCH_LOADING', False)
+    return False
+
 
 class DefinitionLazyLoader(object):
     """
@@ -9,16 +25,23 @@ class DefinitionLazyLoader(object):
     object doesn't force access during init but waits until client wants the
     definition. Only works if the modulestore is a split mongo store.
     """
-    def __init__(self, modulestore, course_key, block_type, definition_id, field_converter):
+    def __init__(
+            self, modulestore, course_key, block_type, definition_id, field_converter, block_key=None, batch_loader=None
+    ):
         """
         Simple placeholder for yet-to-be-fetched data
         :param modulestore: the pymongo db connection with the definitions
         :param definition_locator: the id of the record in the above to fetch
+        :param block_key: the BlockKey of the block whose definition this is
+        :param batch_loader: if given with the block_key, the DefinitionBatchLoader which
+            fetches the definition along with the pending definitions of the block's siblings
         """
         self.modulestore = modulestore
         self.course_key = course_key
         self.definition_locator = DefinitionLocator(block_type, definition_id)
         self.field_converter = field_converter
+        self.block_key = block_key
+        self.batch_loader = batch_loader
 
     def fetch(self):
         """
@@ -28,5 +51,61 @@ class DefinitionLazyLoader(object):
         # get_definition may return a cached value perhaps from another course or code path
         # so, we copy the result here so that updates don't cross-pollinate nor change the cached
         # value in such a way that we can't tell that the definition's been updated.
-        definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
+        if self.batch_loader is not None and self.block_key is not None:
+            definition = self.batch_loader.get_definition(
+                self.course_key, self.block_key, self.definition_locator.definition_id
+            )
+        else:
+            definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
         return copy.deepcopy(definition)
+
+
+class DefinitionBatchLoader(object):
+    """
+    Fetches the definitions of lazily loaded blocks in batches: the first time the
+    definition of a block is fetched, the definitions of all the children of its
+    parent which weren't fetched yet are fetched with it, in one query.
+
+    The fetched definitions are held until their blocks fetch them.
+    """
+    def __init__(self, modulestore, blocks, parent_map):
+        """
+        :param modulestore: the split mongo store with the definitions
+        :param blocks: the blocks of the course structure, by BlockKey
+        :param parent_map: a dict mapping the BlockKey of each block to its parent's
+        """
+        self.modulestore = modulestore
+        self.blocks = blocks
+        self.parent_map = parent_map
+        self._definitions = {}
+        self._fetched_ids = set()
+
+    def get_definition(self, course_key, block_key, definition_id):
+        """
+        Return the definition with the given id of the given block, fetching it with the
+        pending definitions of the block's siblings if it wasn't already fetched.
+        """
+        if definition_id not in self._definitions:
+            definition_ids = self._pending_sibling_definition_ids(block_key)
+            definition_ids.add(definition_id)
+            self._fetched_ids.update(definition_ids)
+            for definition in self.modulestore.get_definitions(course_key, list(definition_ids)):
+                self._definitions[definition['_id']] = definition
+        return self._definitions.pop(definition_id, None)
+
+    def _pending_sibling_definition_ids(self, block_key):
+        """
+        Return the set of the ids of the not yet fetched definitions of the children
+        of the block's parent.
+        """
+        parent_key = self.parent_map.get(block_key)
+        if parent_key is None or parent_key not in self.blocks:
+            return set()
+        definition_ids = set()
+        for child_key in self.blocks[parent_key].fields.get('children', []):
+            block_data = self.blocks.get(child_key)
+            if block_data is None or block_data.definition is None or block_data.definition_loaded:
+                continue
+            if block_data.definition not in self._fetched_ids:
+                definition_ids.add(block_data.definition)
+        return definition_ids
@@ -8,6 +8,8 @@ import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +17,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -28,6 +31,7 @@ from mongodb_proxy import autoretry_read
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_indexed_fields
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 
@@ -279,6 +283,259 @@ class CourseStructureCache(object):
             self.cache.set(key, compressed_pickled_data, None)
 
 
+class StructureLRUCache(object):
+    """
+    Process-local, bounded LRU cache of course structures, keyed by structure id.
+
+    Sits in front of :class:`CourseStructureCache` so that repeated requests for the
+    same structure in a process skip the decompress and unpickle step. Structures are
+    immutable, so entries are never invalidated, only evicted. The cache is bounded by
+    the total number of blocks held (a proxy for memory use); it is disabled when the
+    bound is 0.
+
+    Structures returned from this cache are shared between callers, and must not be
+    modified in place (:meth:`SplitMongoModuleStore.version_structure` copies before editing).
+    Since they are immutable, their :class:`StructureIndex` is built once, when first
+    requested, and kept alongside them.
+    """
+    def __init__(self, max_blocks=None):
+        """
+        Arguments:
+            max_blocks (int): The maximum number of blocks (summed over all cached
+                structures) to hold. If None, the ``COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS``
+                django setting is used.
+        """
+        self._max_blocks = max_blocks
+        self._entries = OrderedDict()
+        self._indexes = {}
+        self._total_blocks = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_blocks(self):
+        """
+        The maximum number of blocks this cache may hold.
+        """
+        if self._max_blocks is not None:
+            return self._max_blocks
+        if DJANGO_AVAILABLE:
+            return getattr(settings, 'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS', 0)
+        return 0
+
+    def get(self, key, course_context=None):
+        """Return the cached structure for ``key``, or None if it isn't cached."""
+        if not self.max_blocks:
+            return None
+
+        with TIMER.timer("StructureLRUCache.get", course_context) as tagger:
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    # Re-insert to mark as most recently used
+                    self._entries[key] = entry
+            tagger.tag(from_cache=str(entry is not None).lower())
+
+            if entry is None:
+                return None
+            return entry[0]
+
+    def set(self, key, structure, course_context=None):
+        """Cache ``structure`` under ``key``, evicting least recently used structures as needed."""
+        max_blocks = self.max_blocks
+        if not max_blocks:
+            return
+
+        with TIMER.timer("StructureLRUCache.set", course_context) as tagger:
+            num_blocks = len(structure['blocks'])
+            tagger.measure('blocks', num_blocks)
+            if num_blocks > max_blocks:
+                tagger.tag(too_large='true')
+                return
+
+            evictions = 0
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                self._indexes.pop(key, None)
+                if previous is not None:
+                    self._total_blocks -= previous[1]
+
+                while self._entries and self._total_blocks + num_blocks > max_blocks:
+                    evicted_key, (__, evicted_blocks) = self._entries.popitem(last=False)
+                    self._indexes.pop(evicted_key, None)
+                    self._total_blocks -= evicted_blocks
+                    evictions += 1
+
+                self._entries[key] = (structure, num_blocks)
+                self._total_blocks += num_blocks
+
+            tagger.measure('evictions', evictions)
+            tagger.tag(evicted=str(bool(evictions)).lower())
+
+    def get_index(self, structure, course_context=None):
+        """
+        Return the :class:`StructureIndex` of ``structure``, building it if needed, or None
+        if ``structure`` isn't the cached structure with its id.
+
+        Only the cached structures are indexed, since they are never modified.
+        """
+        key = structure.get('_id')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not structure:
+                return None
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = StructureIndex(structure, get_indexed_fields())
+        return index
+
+    def clear(self):
+        """Remove all cached structures."""
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+            self._total_blocks = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by all connections in the process, since structures are immutable
+STRUCTURE_LRU_CACHE = StructureLRUCache()
+
+
+class DefinitionCache(object):
+    """
+    Cache of definitions, keyed by definition id, shared by all requests in the process.
+
+    Definitions are content-addressed and never modified, so entries are never invalidated,
+    only evicted. A process-local LRU cache, bounded by the number of definitions it holds,
+    sits in front of an optional django cache: if the 'course_definition_cache' doesn't
+    exist, only the process-local tier is used. It is disabled when its bound is 0, as the
+    django tier is when the cache doesn't exist. Definitions are pickled and compressed in
+    the django cache, as structures are by :class:`CourseStructureCache`.
+
+    Definitions returned from the process-local tier are shared between callers, and must
+    not be modified in place.
+    """
+    DJANGO_CACHE_KEY = u'split_definition.{}'
+
+    def __init__(self, max_entries=None):
+        """
+        Arguments:
+            max_entries (int): The maximum number of definitions to hold in the process-local
+                tier. If None, the ``COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES`` django
+                setting is used.
+        """
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entries(self):
+        """
+        The maximum number of definitions the process-local tier may hold.
+        """
+        if self._max_entries is not None:
+            return self._max_entries
+        if DJANGO_AVAILABLE:
+            return getattr(settings, 'COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES', 0)
+        return 0
+
+    def _django_cache(self):
+        """
+        Return the django cache tier, or None if it doesn't exist.
+        """
+        if DJANGO_AVAILABLE:
+            try:
+                return get_cache('course_definition_cache')
+            except InvalidCacheBackendError:
+                pass
+        return None
+
+    def get_many(self, keys, course_context=None):
+        """
+        Return a dict mapping the ids of the cached definitions among ``keys`` to the definitions.
+        """
+        found = {}
+        with TIMER.timer("DefinitionCache.get_many", course_context) as tagger:
+            tagger.measure('definitions', len(keys))
+            if self.max_entries:
+                with self._lock:
+                    for key in keys:
+                        definition = self._entries.pop(key, None)
+                        if definition is not None:
+                            # Re-insert to mark as most recently used
+                            self._entries[key] = definition
+                            found[key] = definition
+                tagger.measure('from_process_cache', len(found))
+
+            cache = self._django_cache()
+            missing = [key for key in keys if key not in found]
+            if cache is not None and missing:
+                cache_keys = {self.DJANGO_CACHE_KEY.format(key): key for key in missing}
+                from_cache = {
+                    cache_keys[cache_key]: pickle.loads(zlib.decompress(compressed_pickled_data))
+                    for cache_key, compressed_pickled_data in cache.get_many(cache_keys.keys()).iteritems()
+                }
+                tagger.measure('from_cache', len(from_cache))
+                self._set_process_entries(from_cache)
+                found.update(from_cache)
+        return found
+
+    def set_many(self, definitions, course_context=None):
+        """
+        Cache the given definitions under their ids.
+        """
+        definitions = {definition['_id']: definition for definition in definitions}
+        if not definitions:
+            return
+
+        with TIMER.timer("DefinitionCache.set_many", course_context) as tagger:
+            tagger.measure('definitions', len(definitions))
+            self._set_process_entries(definitions)
+
+            cache = self._django_cache()
+            if cache is not None:
+                # Definitions are immutable, so we set a timeout of "never"
+                cache.set_many(
+                    {
+                        self.DJANGO_CACHE_KEY.format(key): zlib.compress(
+                            pickle.dumps(definition, pickle.HIGHEST_PROTOCOL), 1
+                        )
+                        for key, definition in definitions.iteritems()
+                    },
+                    None
+                )
+
+    def _set_process_entries(self, definitions):
+        """
+        Add the definitions, keyed by id, to the process-local tier, evicting least recently
+        used definitions as needed.
+        """
+        max_entries = self.max_entries
+        if not max_entries or not definitions:
+            return
+
+        with self._lock:
+            for key, definition in definitions.iteritems():
+                self._entries.pop(key, None)
+                self._entries[key] = definition
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all definitions cached in the process."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by all connections in the process, since definitions are immutable
+DEFINITION_CACHE = DefinitionCache()
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
@@ -317,9 +574,15 @@ class MongoConnection(object):
         """
         Get the structure from the persistence mechanism whose id is the given key.
 
-        This method will use a cached version of the structure if it is available.
+        This method will use a cached version of the structure if it is available,
+        checking the process-local :data:`STRUCTURE_LRU_CACHE` before the django cache.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
+            structure = STRUCTURE_LRU_CACHE.get(key, course_context)
+            tagger_get_structure.tag(from_process_cache=str(structure is not None).lower())
+            if structure is not None:
+                return structure
+
             cache = CourseStructureCache()
 
             structure = cache.get(key, course_context)
@@ -342,6 +605,7 @@ class MongoConnection(object):
 
                 cache.set(key, structure, course_context)
 
+            STRUCTURE_LRU_CACHE.set(key, structure, course_context)
             return structure
 
     @autoretry_read()
@@ -554,19 +818,31 @@ class MongoConnection(object):
         Get the definition from the persistence mechanism whose id is the given key
         """
         with TIMER.timer("get_definition", course_context) as tagger:
-            definition = self.definitions.find_one({'_id': key})
+            definition = DEFINITION_CACHE.get_many([key], course_context).get(key)
+            tagger.tag(from_cache=str(definition is not None).lower())
+            if definition is None:
+                definition = self.definitions.find_one({'_id': key})
+                if definition is not None:
+                    DEFINITION_CACHE.set_many([definition], course_context)
             tagger.measure("fields", len(definition['fields']))
             tagger.tag(block_type=definition['block_type'])
             return definition
 
     def get_definitions(self, definitions, course_context=None):
         """
-        Retrieve all definitions listed in `definitions`.
+        Retrieve all definitions listed in `definitions`, querying for those which aren't cached.
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
-            return definitions
+            cached_definitions = DEFINITION_CACHE.get_many(definitions, course_context)
+            tagger.measure('cached_definitions', len(cached_definitions))
+            found = cached_definitions.values()
+            missing = [key for key in set(definitions) if key not in cached_definitions]
+            if missing:
+                definitions_from_db = list(self.definitions.find({'_id': {'$in': missing}}))
+                DEFINITION_CACHE.set_many(definitions_from_db, course_context)
+                found.extend(definitions_from_db)
+            return found
 
     def insert_definition(self, definition, course_context=None):
         """
@@ -86,7 +86,7 @@ from xmodule.modulestore import (
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_LRU_CACHE, MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
@@ -794,12 +794,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 definitions = {definition['_id']: definition
                                for definition in descendent_definitions}
 
-                for block in new_module_data.itervalues():
+                for block_key, block in new_module_data.items():
                     if block.definition in definitions:
                         definition = definitions[block.definition]
+                        # The structure's blocks may be shared with other requests and threads
+                        # through the process cache, so merge the definition in to a copy.
+                        block = BlockData(**block.to_storable())
+                        block.fields = dict(block.fields)
                         # convert_fields gets done later in the runtime's xblock_from_json
                         block.fields.update(definition.get('fields'))
                         block.definition_loaded = True
+                        new_module_data[block_key] = block
 
             system.module_data.update(new_module_data)
             return system.module_data
@@ -1236,11 +1241,19 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         if settings is None:
             settings = {}
+        structure_index = STRUCTURE_LRU_CACHE.get_index(course.structure)
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
+            if not isinstance(block_name, six.string_types):
+                # It is iterated by the index, then checked against each block.
+                block_name = list(block_name)
             block_ids = []
-            for block_id, block in course.structure['blocks'].iteritems():
+            if structure_index is not None:
+                candidate_blocks = self._get_candidate_blocks(course, structure_index.candidates(block_names=block_name))
+            else:
+                candidate_blocks = course.structure['blocks'].iteritems()
+            for block_id, block in candidate_blocks:
                 # Don't do an in comparison blindly; first check to make sure
                 # that the name qualifier we're looking at isn't a plain string;
                 # if it is a string, then it should match exactly. If it's other
@@ -1271,7 +1284,14 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             path_cache = {}
             parents_cache = self.build_block_key_to_parents_mapping(course.structure)
 
-        for block_id, value in course.structure['blocks'].iteritems():
+        if structure_index is not None:
+            candidate_blocks = self._get_candidate_blocks(
+                course, structure_index.candidates(qualifiers=qualifiers, settings=settings)
+            )
+        else:
+            candidate_blocks = course.structure['blocks'].iteritems()
+
+        for block_id, value in candidate_blocks:
             if _block_matches_all(value):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
@@ -1287,6 +1307,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    @staticmethod
+    def _get_candidate_blocks(course, candidates):
+        """
+        Returns an iterable of the (block key, block data) pairs of the given candidate
+        block keys of the course, or of all its blocks if candidates is None.
+        """
+        blocks = course.structure['blocks']
+        if candidates is None:
+            return blocks.iteritems()
+        return ((block_key, blocks[block_key]) for block_key in candidates)
+
     def build_block_key_to_parents_mapping(self, structure):
         """
         Given a structure, builds block_key to parents mapping for all block keys in structure
@@ -1296,6 +1327,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         :return dict: a dictionary containing mapping of block_keys against their parents.
         """
+        structure_index = STRUCTURE_LRU_CACHE.get_index(structure)
+        if structure_index is not None:
+            # The prebuilt map is shared, so must not be modified.
+            return structure_index.parent_map
+
         children_to_parents = defaultdict(list)
         for parent_key, value in structure['blocks'].iteritems():
             for child_key in value.fields.get('children', []):
@@ -1323,7 +1359,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if parents_cache is None:
             xblock_parents = self._get_parents_from_structure(block_key, course.structure)
         else:
-            xblock_parents = parents_cache[block_key]
+            xblock_parents = parents_cache.get(block_key, [])
 
         if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
             # Found, xblock has the path to the root
@@ -3167,6 +3203,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Given a structure, find block_key's parent in that structure. Note returns
         the encoded format for parent
         """
+        structure_index = STRUCTURE_LRU_CACHE.get_index(structure)
+        if structure_index is not None:
+            return list(structure_index.parents(block_key))
         return [
             parent_block_key
             for parent_block_key, value in structure['blocks'].iteritems()
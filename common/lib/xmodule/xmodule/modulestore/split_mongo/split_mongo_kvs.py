@@ -22,13 +22,18 @@ class SplitMongoKVS(InheritanceKeyValueStore):
     VALID_SCOPES = (Scope.parent, Scope.children, Scope.settings, Scope.content)
 
     @contract(parent="BlockUsageLocator | None")
-    def __init__(self, definition, initial_values, default_values, parent, aside_fields=None, field_decorator=None):
+    def __init__(
+            self, definition, initial_values, default_values, parent, aside_fields=None, field_decorator=None,
+            ancestor_settings=None,
+    ):
         """
 
         :param definition: either a lazyloader or definition id for the definition
         :param initial_values: a dictionary of the locally set values
         :param default_values: any Scope.settings field defaults that are set locally
             (copied from a template block with copy_from_template)
+        :param ancestor_settings: if precomputed, a dictionary of the json values of the
+            inheritable settings set on the block's ancestors
         """
         # deepcopy so that manipulations of fields does not pollute the source
         super(SplitMongoKVS, self).__init__(copy.deepcopy(initial_values))
@@ -43,6 +48,7 @@ class SplitMongoKVS(InheritanceKeyValueStore):
             self.field_decorator = field_decorator
 
         self.parent = parent
+        self.ancestor_settings = ancestor_settings
         self.aside_fields = aside_fields if aside_fields else {}
 
     def get(self, key):
@@ -174,6 +180,22 @@ class SplitMongoKVS(InheritanceKeyValueStore):
         # If not, try inheriting from a parent, then use the XBlock type's normal default value:
         return super(SplitMongoKVS, self).default(key)
 
+    def inherited_default(self, field_name):
+        """
+        Return the value of the inheritable field inherited from the nearest ancestor
+        which sets it, looked up in the precomputed ancestor settings.
+
+        Raises KeyError if no ancestor sets the field, or if the parent is a library_content
+        block and the field has a default value here, since '_copy_from_templates' puts
+        the fields of library content into defaults.
+        """
+        if self.parent is not None and self.parent.block_type == 'library_content' and \
+                self.has_default_value(field_name):
+            raise KeyError(field_name)
+        # deepcopy since the ancestor settings are shared by all the blocks of the cached
+        # structure, so that manipulations of mutable fields don't pollute them
+        return self.field_decorator(copy.deepcopy(self.ancestor_settings[field_name]))
+
     def _load_definition(self):
         """
         Update fields w/ the lazily loaded definitions
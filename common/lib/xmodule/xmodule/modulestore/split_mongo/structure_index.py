@@ -0,0 +1,259 @@
+"""
+Secondary indexes of the blocks of immutable course structures, used to answer the
+common queries of SplitMongoModuleStore.get_items without scanning every block, and
+to read inherited settings without walking up the blocks' ancestors.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from lazy import lazy
+
+from xmodule.modulestore.inheritance import InheritanceMixin
+
+try:
+    from django.conf import settings
+    DJANGO_AVAILABLE = True
+except ImportError:
+    DJANGO_AVAILABLE = False
+
+
+def get_indexed_fields():
+    """
+    Returns the names of the settings fields whose values are indexed, from the
+    COURSE_STRUCTURE_INDEXED_FIELDS django setting.
+    """
+    if DJANGO_AVAILABLE:
+        return tuple(getattr(settings, 'COURSE_STRUCTURE_INDEXED_FIELDS', ()))
+    return ()
+
+
+def inherited_settings_enabled():
+    """
+    Returns whether blocks read their inherited settings from the tables precomputed
+    for cached structures, per the PRECOMPUTE_INHERITED_SETTINGS django setting.
+    """
+    if DJANGO_AVAILABLE:
+        return getattr(settings, 'PRECOMPUTE_INHERITED_SETTINGS', False)
+    return False
+
+
+class StructureIndex(object):
+    """
+    Lazily built indexes of the blocks of a course structure:
+        * the keys of the blocks of each block type and of each block id,
+        * the keys of the parents of each block,
+        * for each indexed settings field, the keys of the blocks which set the
+          field, and of the blocks which set it to each (hashable) value,
+        * the inheritable settings each block inherits from its ancestors.
+
+    Lookups return the keys of candidate blocks, in the order of the structure's blocks:
+    a superset of the blocks matching the criteria, which callers still match.  The
+    structure must not be modified once it is indexed.
+    """
+    def __init__(self, structure, indexed_fields=()):
+        """
+        Arguments:
+            structure (dict): The course structure, whose 'blocks' map BlockKeys to BlockData.
+            indexed_fields (iterable): The names of the settings fields to index.
+        """
+        self.structure = structure
+        self.indexed_fields = frozenset(indexed_fields)
+        self._field_indexes = {}
+        self._lock = threading.Lock()
+
+    @lazy
+    def _positions(self):
+        """
+        Maps the key of each block to its position among the structure's blocks.
+        """
+        return {block_key: position for position, block_key in enumerate(self.structure['blocks'])}
+
+    @lazy
+    def _keys_by_type(self):
+        """
+        Maps each block type to the keys of the blocks of that type.
+        """
+        keys_by_type = defaultdict(list)
+        for block_key, block_data in self.structure['blocks'].iteritems():
+            keys_by_type[block_data.block_type].append(block_key)
+        return dict(keys_by_type)
+
+    @lazy
+    def _keys_by_id(self):
+        """
+        Maps each block id to the keys of the blocks with that id.
+        """
+        keys_by_id = defaultdict(list)
+        for block_key in self.structure['blocks']:
+            keys_by_id[block_key.id].append(block_key)
+        return dict(keys_by_id)
+
+    @lazy
+    def parent_map(self):
+        """
+        Maps the key of each block to the list of the keys of its parents.
+        """
+        parent_map = defaultdict(list)
+        for block_key, block_data in self.structure['blocks'].iteritems():
+            for child_key in block_data.fields.get('children', []):
+                parent_map[child_key].append(block_key)
+        return dict(parent_map)
+
+    @lazy
+    def inherited_settings(self):
+        """
+        Maps the key of each block to a dict of the json values of the inheritable
+        settings set on its ancestors, each from the nearest ancestor which sets it.
+
+        A block's ancestors are found the way the runtime's get_parent finds them: through
+        its last parent in the order of the structure's blocks.  Blocks share the dict of
+        their parent when the parent sets no inheritable settings.
+        """
+        inheritable_names = frozenset(InheritanceMixin.fields.keys())
+        blocks = self.structure['blocks']
+        inherited_settings = {}
+        # Maps the key of each block to the settings its children inherit
+        children_settings = {}
+        for block_key in blocks:
+            # Walk up to the nearest ancestor whose children's settings are known,
+            # then compute the settings down the lineage from it to the block.
+            lineage = []
+            parent_key = block_key
+            while parent_key is not None and parent_key not in children_settings:
+                lineage.append(parent_key)
+                parents = self.parent_map.get(parent_key)
+                parent_key = parents[-1] if parents else None
+            block_settings = children_settings.get(parent_key, {})
+            for lineage_key in reversed(lineage):
+                inherited_settings[lineage_key] = block_settings
+                own_settings = {
+                    name: value
+                    for name, value in blocks[lineage_key].fields.iteritems()
+                    if name in inheritable_names
+                }
+                if own_settings:
+                    block_settings = dict(block_settings)
+                    block_settings.update(own_settings)
+                children_settings[lineage_key] = block_settings
+        return inherited_settings
+
+    def parents(self, block_key):
+        """
+        Returns the list of the keys of the parents of the given block.
+        """
+        return self.parent_map.get(block_key, [])
+
+    def _field_index(self, field_name):
+        """
+        Returns a tuple of the set of the keys of the blocks which set the given indexed
+        field, and of a dict mapping each hashable value of the field (or element of a
+        list value) to the keys of the blocks with that value.
+        """
+        field_index = self._field_indexes.get(field_name)
+        if field_index is None:
+            keys_with_field = set()
+            keys_by_value = defaultdict(set)
+            for block_key, block_data in self.structure['blocks'].iteritems():
+                if field_name not in block_data.fields:
+                    continue
+                keys_with_field.add(block_key)
+                value = block_data.fields[field_name]
+                for element in (value if isinstance(value, list) else [value]):
+                    if _is_hashable(element):
+                        keys_by_value[element].add(block_key)
+            with self._lock:
+                field_index = self._field_indexes.setdefault(field_name, (keys_with_field, dict(keys_by_value)))
+        return field_index
+
+    def candidates(self, block_names=None, qualifiers=None, settings=None):  # pylint: disable=redefined-outer-name
+        """
+        Returns the keys of the blocks which may match the given criteria of get_items,
+        in the order of the structure's blocks, or None if the indexes can't narrow down
+        the blocks to match.
+
+        Arguments:
+            block_names: The 'name' qualifier of get_items: a block id, or an iterable of block ids.
+            qualifiers (dict): The qualifiers on the block data, with 'category' as 'block_type'.
+            settings (dict): The qualifiers on the settings fields of the block.
+        """
+        candidate_sets = []
+
+        if block_names is not None:
+            if isinstance(block_names, basestring):
+                block_names = [block_names]
+            candidate_sets.append(
+                set(key for name in block_names for key in self._keys_by_id.get(name, []))
+            )
+
+        block_types = _hashable_values((qualifiers or {}).get('block_type'))
+        if block_types is not None:
+            candidate_sets.append(
+                set(key for block_type in block_types for key in self._keys_by_type.get(block_type, []))
+            )
+
+        for field_name, criteria in (settings or {}).iteritems():
+            if field_name == 'children':
+                children = _hashable_values(criteria)
+                if children is not None:
+                    candidate_sets.append(set(parent for child in children for parent in self.parents(child)))
+            elif field_name in self.indexed_fields:
+                field_candidates = self._field_candidates(field_name, criteria)
+                if field_candidates is not None:
+                    candidate_sets.append(field_candidates)
+
+        if not candidate_sets:
+            return None
+        candidate_sets.sort(key=len)
+        candidates = candidate_sets[0].intersection(*candidate_sets[1:])
+        return sorted(candidates, key=self._positions.__getitem__)
+
+    def _field_candidates(self, field_name, criteria):
+        """
+        Returns the set of the keys of the blocks whose value of the given indexed field
+        may match the criteria, or None if the index can't narrow down the blocks.
+        """
+        if isinstance(criteria, dict) and '$exists' in criteria:
+            if criteria['$exists']:
+                return self._field_index(field_name)[0]
+            return None
+        values = _hashable_values(criteria)
+        if values is None:
+            return None
+        keys_by_value = self._field_index(field_name)[1]
+        return set(key for value in values for key in keys_by_value.get(value, ()))
+
+
+def _hashable_values(criteria):
+    """
+    Returns the list of the values a field must be equal to in order to match the
+    given criteria, or None if the criteria are not a hashable value or {'$in': values}
+    of hashable values.  Regexes and callables match by search or call, not equality.
+    """
+    if isinstance(criteria, dict):
+        if criteria.keys() == ['$in'] and all(_is_equality_value(value) for value in criteria['$in']):
+            return list(criteria['$in'])
+        return None
+    if _is_equality_value(criteria):
+        return [criteria]
+    return None
+
+
+def _is_equality_value(value):
+    """
+    Returns whether the value is matched by equality, and can be looked up in an index.
+    """
+    if value is None or callable(value) or isinstance(value, re._pattern_type):  # pylint: disable=protected-access
+        return False
+    return _is_hashable(value)
+
+
+def _is_hashable(value):
+    """
+    Returns whether the value can be used as a dict key.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
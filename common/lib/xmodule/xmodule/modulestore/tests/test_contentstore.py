@@ -9,13 +9,16 @@ from tempfile import mkdtemp
 import path
 import shutil
 
+from django.test.utils import override_settings
+from mock import patch
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
-from xmodule.contentstore.mongo import MongoContentStore
+from xmodule.contentstore.mongo import ASSET_FIND_REQUEST_CACHE_NAME, MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from request_cache.middleware import RequestCache
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
 log = logging.getLogger(__name__)
@@ -123,6 +126,75 @@ class TestContentstore(unittest.TestCase):
             "Found unknown asset {}".format(unknown_asset)
         )
 
+    @ddt.data(True, False)
+    @override_settings(ASSET_NOT_FOUND_CACHE_TIMEOUT=60)
+    def test_find_missing_asset_cached(self, deprecated):
+        """
+        Test that assets found not to exist are not looked up again until saved
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', 'not_yet_uploaded.jpg')
+        self.assertIsNone(self.contentstore.find(asset_key, throw_on_not_found=False))
+
+        with patch.object(self.contentstore.fs, 'get') as mock_get:
+            with self.assertRaises(NotFoundError):
+                self.contentstore.find(asset_key)
+            self.assertIsNone(self.contentstore.find(asset_key, throw_on_not_found=False, as_stream=True))
+        self.assertFalse(mock_get.called)
+
+        self.save_asset(self.course1_files[1], asset_key, 'not_yet_uploaded.jpg', False)
+        self.assertIsNotNone(self.contentstore.find(asset_key))
+
+    @ddt.data(True, False)
+    @override_settings(ASSET_FIND_REQUEST_CACHE=True)
+    def test_find_request_cache(self, deprecated):
+        """
+        Test that repeated finds of an asset within a request are collapsed
+        """
+        self.set_up_assets(deprecated)
+        self.addCleanup(RequestCache.clear_request_cache)
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        content = self.contentstore.find(asset_key)
+
+        with patch.object(self.contentstore.fs, 'get') as mock_get:
+            self.assertIs(self.contentstore.find(asset_key), content)
+        self.assertFalse(mock_get.called)
+
+        # Changes to the asset are found
+        self.contentstore.set_attr(asset_key, 'locked', not content.locked)
+        self.assertEqual(self.contentstore.find(asset_key).locked, not content.locked)
+        self.contentstore.delete(asset_key)
+        self.assertIsNone(self.contentstore.find(asset_key, throw_on_not_found=False))
+
+    @ddt.data(True, False)
+    @override_settings(ASSET_FIND_REQUEST_CACHE=True)
+    def test_find_request_cache_large_assets(self, deprecated):
+        """
+        Test that the content of large assets isn't kept in the request cache, even when
+        all of a course's assets are read by an export
+        """
+        self.set_up_assets(deprecated)
+        self.addCleanup(RequestCache.clear_request_cache)
+        find_cache = RequestCache.get_request_cache(ASSET_FIND_REQUEST_CACHE_NAME)
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+
+        with patch('xmodule.contentstore.mongo.ASSET_FIND_REQUEST_CACHE_MAX_ASSET_LENGTH', 0):
+            self.assertIsNotNone(self.contentstore.find(asset_key))
+            self.assertNotIn(unicode(asset_key), find_cache)
+
+            root_dir = path.Path(mkdtemp())
+            self.addCleanup(shutil.rmtree, root_dir)
+            self.contentstore.export_all_for_course(self.course1_key, root_dir, path.Path(root_dir / "policy.json"))
+        self.assertFalse([content for content in find_cache.values() if isinstance(content, StaticContent)])
+
+        # Small assets are kept while the cache holds little enough content
+        self.contentstore.find(asset_key)
+        self.assertIn(unicode(asset_key), find_cache)
+        with patch('xmodule.contentstore.mongo.ASSET_FIND_REQUEST_CACHE_MAX_TOTAL_LENGTH', 0):
+            other_asset_key = self.course1_key.make_asset_key('asset', self.course1_files[1])
+            self.contentstore.find(other_asset_key)
+            self.assertNotIn(unicode(other_asset_key), find_cache)
+
     @ddt.data(True, False)
     def test_export_for_course(self, deprecated):
         """
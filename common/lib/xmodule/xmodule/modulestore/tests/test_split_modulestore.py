@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -32,6 +33,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import DEFINITION_CACHE, STRUCTURE_LRU_CACHE
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -987,6 +989,48 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS=1000)
+    def test_process_structure_cache(self):
+        STRUCTURE_LRU_CACHE.clear()
+        self.addCleanup(STRUCTURE_LRU_CACHE.clear)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the process cache is checked before the (dummy) django cache
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        # structures are immutable, so the same object is shared
+        self.assertIs(cached_structure, not_cached_structure)
+
+    @override_settings(COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES=1000)
+    def test_process_definition_cache(self):
+        DEFINITION_CACHE.clear()
+        self.addCleanup(DEFINITION_CACHE.clear)
+        definition_id = self.new_course.definition_locator.definition_id
+
+        with check_mongo_calls(1):
+            not_cached_definition = modulestore().db_connection.get_definition(definition_id)
+
+        # definitions are immutable, so the same object is shared
+        with check_mongo_calls(0):
+            self.assertIs(modulestore().db_connection.get_definition(definition_id), not_cached_definition)
+            self.assertEqual(modulestore().db_connection.get_definitions([definition_id]), [not_cached_definition])
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_definition_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        definition_id = self.new_course.definition_locator.definition_id
+
+        with check_mongo_calls(1):
+            not_cached_definitions = modulestore().db_connection.get_definitions([definition_id])
+
+        with check_mongo_calls(0):
+            cached_definition = modulestore().db_connection.get_definition(definition_id)
+
+        self.assertEqual([cached_definition], not_cached_definitions)
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -1008,6 +1052,7 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+@ddt.ddt
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
@@ -1221,6 +1266,85 @@ class SplitModuleItemTests(SplitModuleTest):
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         self.assertEqual(len(matches), 7)
 
+    @override_settings(COURSE_STRUCTURE_INDEXED_FIELDS=['group_access', 'display_name'])
+    def test_get_items_indexed(self):
+        '''
+        get_items returns the same items when using the indexes of cached structures
+        '''
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        chapter = BlockKey('chapter', 'chapter1')
+        queries = [
+            {},
+            {'qualifiers': {'category': 'chapter'}},
+            {'qualifiers': {'category': 'chapter'}, 'include_orphans': False},
+            {'qualifiers': {'name': ['chapter1', 'chapter2']}},
+            {'qualifiers': {'category': 'chapter'}, 'settings': {'display_name': re.compile(r'Hera')}},
+            {'settings': {'group_access': {'$exists': True}}},
+            {'settings': {'group_access': {'$exists': False}}},
+            {'qualifiers': {'children': chapter}},
+            {'qualifiers': {'category': {'$in': ['course', re.compile(r'chap')]}}},
+            {'settings': {'display_name': {'$in': ['Hercules', re.compile(r'Hera')]}}},
+        ]
+
+        def get_item_locations(query):
+            """ Returns the locations of the items matching the query """
+            return [item.location for item in modulestore().get_items(locator, **query)]
+
+        expected = [get_item_locations(query) for query in queries]
+        self.assertTrue(expected[-2])
+        self.assertTrue(expected[-1])
+        with override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS=1000):
+            STRUCTURE_LRU_CACHE.clear()
+            self.addCleanup(STRUCTURE_LRU_CACHE.clear)
+            self.assertEqual([get_item_locations(query) for query in queries], expected)
+            course = modulestore()._lookup_course(locator)  # pylint: disable=protected-access
+            self.assertIsNotNone(STRUCTURE_LRU_CACHE.get_index(course.structure))
+
+            # A name iterable that can only be iterated once still finds its blocks
+            names = (name for name in ['chapter1', 'chapter2'])
+            self.assertEqual(
+                sorted(item.location.block_id for item in modulestore().get_items(locator, qualifiers={'name': names})),
+                ['chapter1', 'chapter2']
+            )
+
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS=1000)
+    def test_eager_loading_leaves_cached_structure(self):
+        """
+        Loading a course's definitions eagerly doesn't merge them in to the structure's
+        blocks, which the process cache shares with later loads.
+        """
+        STRUCTURE_LRU_CACHE.clear()
+        self.addCleanup(STRUCTURE_LRU_CACHE.clear)
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        structure = modulestore()._lookup_course(locator).structure  # pylint: disable=protected-access
+        block_fields = {block_key: dict(block.fields) for block_key, block in structure['blocks'].iteritems()}
+
+        self.assertIsNotNone(modulestore().get_course(locator, depth=None, lazy=False))
+
+        cached_structure = modulestore()._lookup_course(locator).structure  # pylint: disable=protected-access
+        self.assertIs(cached_structure, structure)
+        self.assertEqual(
+            {block_key: block.fields for block_key, block in cached_structure['blocks'].iteritems()},
+            block_fields
+        )
+
+    @ddt.data((False, 3), (True, 1))
+    @ddt.unpack
+    def test_batch_definition_loading(self, batch_loading, num_finds):
+        '''
+        The pending definitions of lazily loaded siblings are fetched together
+        '''
+        locator = BlockUsageLocator(
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT), 'chapter', 'chapter3'
+        )
+        with override_settings(COURSE_DEFINITION_BATCH_LOADING=batch_loading):
+            chapter = modulestore().get_item(locator)
+            with check_mongo_calls(num_finds):
+                problems = chapter.get_children()
+                self.assertEqual(len(problems), 3)
+                for problem in problems:
+                    self.assertIsNotNone(problem.data)
+
     def test_get_parents(self):
         '''
         get_parent_location(locator): BlockUsageLocator
@@ -2014,6 +2138,61 @@ class TestInheritance(SplitModuleTest):
         problem = modulestore().get_item(problem.location.version_agnostic())
         self.assertFalse(problem.visible_to_staff_only)
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_precomputed_inheritance(self, _from_json):
+        """
+        The blocks of cached structures inherit the same settings from the precomputed table
+        """
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        inherited_fields = ['graceperiod', 'start', 'due', 'visible_to_staff_only', 'group_access', 'graded']
+
+        def get_inherited_values():
+            """ Returns the values of the inherited fields of the course's blocks, and the blocks """
+            blocks = modulestore().get_items(course_key)
+            values = {
+                block.location: [getattr(block, field_name) for field_name in inherited_fields]
+                for block in blocks
+            }
+            return values, blocks
+
+        expected, blocks = get_inherited_values()
+        for block in blocks:
+            self.assertIsNone(block._field_data._kvs.ancestor_settings)  # pylint: disable=protected-access
+
+        with override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS=1000, PRECOMPUTE_INHERITED_SETTINGS=True):
+            STRUCTURE_LRU_CACHE.clear()
+            self.addCleanup(STRUCTURE_LRU_CACHE.clear)
+            values, blocks = get_inherited_values()
+            self.assertEqual(values, expected)
+            for block in blocks:
+                self.assertIsNotNone(block._field_data._kvs.ancestor_settings)  # pylint: disable=protected-access
+
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_precomputed_inheritance_isolated(self, _from_json):
+        """
+        Changing an inherited mutable value of a block doesn't change the value inherited
+        by its siblings, nor by the block once reloaded
+        """
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        chapter = modulestore().get_item(BlockUsageLocator(course_key, 'chapter', 'chapter3'))
+        chapter.group_access = {"1": ["11"]}
+        modulestore().update_item(chapter, self.user_id)
+
+        with override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS=1000, PRECOMPUTE_INHERITED_SETTINGS=True):
+            STRUCTURE_LRU_CACHE.clear()
+            self.addCleanup(STRUCTURE_LRU_CACHE.clear)
+            problem = modulestore().get_item(BlockUsageLocator(course_key, 'problem', 'problem3_1'))
+            sibling = modulestore().get_item(BlockUsageLocator(course_key, 'problem', 'problem3_2'))
+            self.assertIsNotNone(problem._field_data._kvs.ancestor_settings)  # pylint: disable=protected-access
+            self.assertEqual(problem.group_access, {"1": ["11"]})
+
+            problem.group_access["2"] = ["22"]
+            problem.group_access["1"].append("12")
+
+            self.assertEqual(sibling.group_access, {"1": ["11"]})
+            reloaded = modulestore().get_item(problem.location.version_agnostic())
+            self.assertEqual(reloaded.group_access, {"1": ["11"]})
+
     def test_dynamic_inheritance(self):
         """
         Test inheritance for create_item with and without a parent pointer
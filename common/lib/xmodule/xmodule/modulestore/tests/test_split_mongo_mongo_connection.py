@@ -1,7 +1,7 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import DefinitionCache, MongoConnection, StructureLRUCache
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +17,105 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestStructureLRUCache(unittest.TestCase):
+    """ Test the process-local course structure cache """
+    def _structure(self, num_blocks):
+        """ Return a fake structure with `num_blocks` blocks """
+        return {'blocks': {index: None for index in range(num_blocks)}}
+
+    def test_get_set(self):
+        cache = StructureLRUCache(max_blocks=10)
+        structure = self._structure(3)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', structure)
+        self.assertIs(cache.get('a'), structure)
+
+    def test_disabled(self):
+        cache = StructureLRUCache(max_blocks=0)
+        cache.set('a', self._structure(3))
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction_by_blocks(self):
+        cache = StructureLRUCache(max_blocks=10)
+        cache.set('a', self._structure(4))
+        cache.set('b', self._structure(4))
+        # touch 'a' so that 'b' is the least recently used
+        cache.get('a')
+        cache.set('c', self._structure(4))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_too_large(self):
+        cache = StructureLRUCache(max_blocks=10)
+        cache.set('a', self._structure(4))
+        cache.set('b', self._structure(11))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+    def test_reset_same_key(self):
+        cache = StructureLRUCache(max_blocks=10)
+        cache.set('a', self._structure(6))
+        cache.set('a', self._structure(6))
+        cache.set('b', self._structure(4))
+        self.assertEqual(len(cache), 2)
+
+    def test_get_index(self):
+        cache = StructureLRUCache(max_blocks=10)
+        structure = dict(self._structure(4), _id='a')
+        self.assertIsNone(cache.get_index(structure))
+        cache.set('a', structure)
+        index = cache.get_index(structure)
+        self.assertIsNotNone(index)
+        self.assertIs(cache.get_index(structure), index)
+        # only the cached structure is indexed
+        self.assertIsNone(cache.get_index(dict(structure)))
+        cache.set('b', self._structure(8))
+        self.assertIsNone(cache.get_index(structure))
+
+
+class TestDefinitionCache(unittest.TestCase):
+    """ Test the cache of definitions shared by all requests """
+    def _definition(self, definition_id):
+        """ Return a fake definition with id `definition_id` """
+        return {'_id': definition_id, 'fields': {}}
+
+    def test_get_set(self):
+        cache = DefinitionCache(max_entries=10)
+        definition = self._definition('a')
+        self.assertEqual(cache.get_many(['a', 'b']), {})
+        cache.set_many([definition])
+        found = cache.get_many(['a', 'b'])
+        self.assertEqual(found.keys(), ['a'])
+        self.assertIs(found['a'], definition)
+
+    def test_disabled(self):
+        cache = DefinitionCache(max_entries=0)
+        cache.set_many([self._definition('a')])
+        self.assertEqual(cache.get_many(['a']), {})
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction(self):
+        cache = DefinitionCache(max_entries=2)
+        cache.set_many([self._definition('a'), self._definition('b')])
+        # touch 'a' so that 'b' is the least recently used
+        cache.get_many(['a'])
+        cache.set_many([self._definition('c')])
+        self.assertEqual(sorted(cache.get_many(['a', 'b', 'c'])), ['a', 'c'])
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_django_cache(self, mock_get_cache):
+        django_cache = {}
+        mock_get_cache.return_value.get_many.side_effect = lambda keys: {
+            key: django_cache[key] for key in keys if key in django_cache
+        }
+        mock_get_cache.return_value.set_many.side_effect = lambda data, timeout: django_cache.update(data)
+
+        DefinitionCache(max_entries=0).set_many([self._definition('a')])
+        cache = DefinitionCache(max_entries=10)
+        self.assertEqual(cache.get_many(['a', 'b']), {'a': self._definition('a')})
+        # definitions found in the django cache are added to the process-local tier
+        self.assertEqual(len(cache), 1)
@@ -0,0 +1,112 @@
+""" Test the indexes of split modulestore course structures """
+import re
+import unittest
+
+import ddt
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+
+COURSE = BlockKey('course', 'course')
+CHAPTER1 = BlockKey('chapter', 'chapter1')
+CHAPTER2 = BlockKey('chapter', 'chapter2')
+PROBLEM1 = BlockKey('problem', 'problem1')
+PROBLEM2 = BlockKey('problem', 'problem2')
+HTML = BlockKey('html', 'problem1')
+
+
+@ddt.ddt
+class TestStructureIndex(unittest.TestCase):
+    """ Test the candidate blocks returned by StructureIndex """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        blocks = {
+            COURSE: {'children': [CHAPTER1, CHAPTER2]},
+            CHAPTER1: {'children': [PROBLEM1, HTML], 'group_access': {1: [1]}},
+            CHAPTER2: {'children': [PROBLEM2, PROBLEM1], 'is_entrance_exam': True, 'graded': True},
+            PROBLEM1: {'format': 'Homework', 'graded': False},
+            PROBLEM2: {'format': ['Homework', 'Lab']},
+            HTML: {},
+        }
+        self.structure = {
+            '_id': 'structure',
+            'root': COURSE,
+            'blocks': {
+                block_key: BlockData(block_type=block_key.type, fields=fields)
+                for block_key, fields in blocks.iteritems()
+            },
+        }
+        self.index = StructureIndex(self.structure, indexed_fields=['group_access', 'is_entrance_exam', 'format'])
+
+    def _assert_candidates(self, expected, **criteria):
+        """ Assert the candidates of the criteria are the expected blocks, in the order of the structure """
+        candidates = self.index.candidates(**criteria)
+        self.assertEqual(set(candidates), set(expected))
+        self.assertEqual(candidates, [key for key in self.structure['blocks'] if key in expected])
+
+    @ddt.data(
+        ('problem1', [PROBLEM1, HTML]),
+        (['problem2', 'chapter1'], [PROBLEM2, CHAPTER1]),
+        ('nosuchblock', []),
+    )
+    @ddt.unpack
+    def test_block_names(self, block_names, expected):
+        self._assert_candidates(expected, block_names=block_names)
+
+    @ddt.data(
+        ('problem', [PROBLEM1, PROBLEM2]),
+        ({'$in': ['chapter', 'html']}, [CHAPTER1, CHAPTER2, HTML]),
+        ('garbage', []),
+    )
+    @ddt.unpack
+    def test_block_type(self, block_type, expected):
+        self._assert_candidates(expected, qualifiers={'block_type': block_type})
+
+    @ddt.data(
+        ({'group_access': {'$exists': True}}, [CHAPTER1]),
+        ({'is_entrance_exam': True}, [CHAPTER2]),
+        ({'format': 'Lab'}, [PROBLEM2]),
+        ({'format': 'Homework'}, [PROBLEM1, PROBLEM2]),
+        ({'children': PROBLEM1}, [CHAPTER1, CHAPTER2]),
+        ({'format': 'Homework', 'children': PROBLEM1}, []),
+    )
+    @ddt.unpack
+    def test_settings(self, settings, expected):
+        self._assert_candidates(expected, settings=settings)
+
+    def test_combined(self):
+        self._assert_candidates([PROBLEM2], qualifiers={'block_type': 'problem'}, settings={'format': 'Lab'})
+
+    @ddt.data(
+        {},
+        {'qualifiers': {'block_type': re.compile('prob')}},
+        {'qualifiers': {'edited_by': 'someone'}},
+        {'settings': {'group_access': {'$exists': False}}},
+        {'settings': {'display_name': 'not indexed'}},
+        {'settings': {'format': lambda value: value.startswith('Home')}},
+        {'qualifiers': {'block_type': {'$in': ['chapter', re.compile('prob')]}}},
+        {'settings': {'format': {'$in': ['Lab', lambda value: value.startswith('Home')]}}},
+    )
+    def test_not_narrowed(self, criteria):
+        self.assertIsNone(self.index.candidates(**criteria))
+
+    def test_parents(self):
+        self.assertItemsEqual(self.index.parents(PROBLEM1), [CHAPTER1, CHAPTER2])
+        self.assertEqual(self.index.parents(PROBLEM2), [CHAPTER2])
+        self.assertEqual(self.index.parents(COURSE), [])
+
+    def test_inherited_settings(self):
+        last_parent = [key for key in self.structure['blocks'] if key in (CHAPTER1, CHAPTER2)][-1]
+        inherited_settings = self.index.inherited_settings
+        self.assertEqual(inherited_settings[COURSE], {})
+        self.assertEqual(inherited_settings[CHAPTER1], {})
+        self.assertEqual(inherited_settings[HTML], {'group_access': {1: [1]}})
+        self.assertEqual(inherited_settings[PROBLEM2], {'graded': True})
+        # Inherited through the last parent, as the runtime's get_parent does
+        self.assertEqual(
+            inherited_settings[PROBLEM1],
+            inherited_settings[HTML] if last_parent == CHAPTER1 else inherited_settings[PROBLEM2],
+        )
+        # Blocks share their parent's settings unless it sets some
+        self.assertIs(inherited_settings[CHAPTER1], inherited_settings[CHAPTER2])
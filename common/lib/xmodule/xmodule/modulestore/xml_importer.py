@@ -20,8 +20,11 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
 from abc import abstractmethod
+from functools import partial
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -54,6 +57,15 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Number of threads importing static content files concurrently.
+STATIC_CONTENT_IMPORT_THREADS = 4
+
+# Static content files larger than this many bytes are streamed into the contentstore.
+STATIC_CONTENT_STREAMING_MIN_SIZE = 1024 * 1024
+
+# Number of bytes of static content files read at a time when hashing or streaming them.
+STATIC_CONTENT_READ_CHUNK_SIZE = 1024 * 1024
+
 
 def import_static_content(
         course_data_path, static_content_store,
@@ -77,6 +89,11 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
+    # The assets already in the contentstore, by name, so that unchanged ones aren't imported again.
+    stored_assets, __ = static_content_store.get_all_content_for_course(target_id)
+    stored_assets = {stored_asset['asset_key'].path: stored_asset for stored_asset in stored_assets}
+
+    content_paths = []
     for dirname, _, filenames in os.walk(static_dir):
         for filename in filenames:
 
@@ -87,63 +104,150 @@ def import_static_content(
                     log.debug('skipping static content %s...', content_path)
                 continue
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+            content_paths.append(content_path)
+
+    import_file = partial(
+        _import_static_file,
+        static_dir=static_dir,
+        static_content_store=static_content_store,
+        target_id=target_id,
+        policy=policy,
+        mimetypes_list=mimetypes_list,
+        stored_assets=stored_assets,
+        verbose=verbose,
+    )
+    # Files are hashed, thumbnailed and saved concurrently.
+    pool = ThreadPool(STATIC_CONTENT_IMPORT_THREADS)
+    try:
+        for imported in pool.imap_unordered(import_file, content_paths):
+            if imported is not None:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                fullname_with_subpath, asset_key = imported
+                remap_dict[fullname_with_subpath] = asset_key
+    finally:
+        pool.terminate()
+        pool.join()
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+    return remap_dict
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
 
-            policy_ele = policy.get(asset_key.path, {})
+def _import_static_file(
+        content_path, static_dir, static_content_store, target_id, policy, mimetypes_list, stored_assets, verbose
+):
+    """
+    Imports the static content file at content_path, unless it is unchanged since it was last
+    imported.
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+    Returns the file's path relative to static_dir and its asset key, or None if it was not imported.
+    """
+    filename = os.path.basename(content_path)
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+    if verbose:
+        log.debug('importing static content %s...', content_path)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    try:
+        content_digest, length = _digest_static_file(content_path)
+    except IOError:
+        if filename.startswith('._'):
+            # OS X "companion files". See
+            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+            return None
+        # Not a 'hidden file', then re-raise exception
+        raise
+
+    # strip away leading path from the name
+    fullname_with_subpath = content_path.replace(static_dir, '')
+    if fullname_with_subpath.startswith('/'):
+        fullname_with_subpath = fullname_with_subpath[1:]
+    asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+    policy_ele = policy.get(asset_key.path, {})
+
+    # During export display name is used to create files, strip away slashes from name
+    displayname = escape_invalid_characters(
+        name=policy_ele.get('displayname', filename),
+        invalid_char_list=['/', '\\']
+    )
+    locked = policy_ele.get('locked', False)
+    mime_type = policy_ele.get('contentType')
+
+    # Check extracted contentType in list of all valid mimetypes
+    if not mime_type or mime_type not in mimetypes_list:
+        mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+
+    stored_asset = stored_assets.get(asset_key.path)
+    if stored_asset is not None and (
+            stored_asset.get('md5') == content_digest and
+            stored_asset.get('locked', False) == locked and
+            stored_asset.get('contentType') == mime_type and
+            stored_asset.get('displayname') == displayname and
+            stored_asset.get('import_path') == fullname_with_subpath and
+            (stored_asset.get('thumbnail_location') is not None or not _is_image(mime_type))
+    ):
+        if verbose:
+            log.debug('skipping unchanged static content %s...', content_path)
+        return fullname_with_subpath, asset_key
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    # Large files are streamed into the contentstore rather than read into memory.
+    if length > STATIC_CONTENT_STREAMING_MIN_SIZE:
+        data = _read_static_file(content_path)
+    else:
+        with open(content_path, 'rb') as f:
+            data = f.read()
+    content = StaticContent(
+        asset_key, displayname, mime_type, data,
+        import_path=fullname_with_subpath, locked=locked
+    )
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+    # first let's save a thumbnail so we can get back a thumbnail location
+    thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(
+        content, tempfile_path=content_path
+    )
 
-    return remap_dict
+    if thumbnail_content is not None:
+        content.thumbnail_location = thumbnail_location
+
+    # then commit the content
+    try:
+        static_content_store.save(content)
+    except Exception as err:
+        log.exception(u'Error importing {0}, error={1}'.format(
+            fullname_with_subpath, err
+        ))
+
+    return fullname_with_subpath, asset_key
+
+
+def _digest_static_file(content_path):
+    """
+    Returns the md5 hex digest, as computed by GridFS, and the length of the file at content_path.
+    """
+    digest = hashlib.md5()
+    length = 0
+    for chunk in _read_static_file(content_path):
+        digest.update(chunk)
+        length += len(chunk)
+    return digest.hexdigest(), length
+
+
+def _read_static_file(content_path):
+    """
+    Yields the data of the file at content_path, STATIC_CONTENT_READ_CHUNK_SIZE bytes at a time.
+    """
+    with open(content_path, 'rb') as f:
+        while True:
+            chunk = f.read(STATIC_CONTENT_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _is_image(mime_type):
+    """
+    Returns whether a thumbnail is generated for content of the given mime type.
+    """
+    return mime_type is not None and mime_type.split('/')[0] == 'image'
 
 
 class ImportManager(object):
@@ -87,6 +87,19 @@ class FakeGridFsItem(object):
         return chunk
 
 
+class FakeChunkedGridFsItem(FakeGridFsItem):
+    """
+    This class also provides the method to read a GridFS item one stored chunk at a time
+    """
+    chunk_size = 256
+
+    def readchunk(self):
+        """
+        Read the rest of the chunk at position cursor and move the cursor
+        """
+        return self.read(self.chunk_size - self.cursor % self.chunk_size)
+
+
 class MockImage(Mock):
     """
     This class pretends to be PIL.Image for purposes of thumbnails testing.
@@ -209,6 +222,21 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, last_byte - first_byte + 1)
 
+    def test_static_content_stream_stream_data_in_range_of_chunks(self):
+        """
+        Test StaticContentStream stream_data_in_range function with a stream read one
+        stored chunk at a time, asserts that we get exactly the requested bytes
+        """
+        item = FakeChunkedGridFsItem(SAMPLE_STRING)
+        static_content_stream = StaticContentStream('loc', 'name', 'type', item, length=item.length)
+
+        chunks = list(static_content_stream.stream_data_in_range(100, 1500))
+        self.assertEqual(''.join(chunks), SAMPLE_STRING[100:1501])
+        self.assertEqual(len(chunks[0]), FakeChunkedGridFsItem.chunk_size - 100)
+
+        item.seek(0)
+        self.assertEqual(''.join(static_content_stream.stream_data()), SAMPLE_STRING)
+
     def test_static_content_write_js(self):
         """
         Test that only one filename starts with 000.
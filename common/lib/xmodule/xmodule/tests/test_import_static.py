@@ -1,6 +1,7 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
 from mock import Mock
 from xmodule.modulestore.xml_importer import import_static_content
@@ -15,6 +16,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = CourseLocator("edX", "tilde", "Fall_2012")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -30,6 +32,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = CourseLocator("edX", "dot-underscore", "2014_Fall")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -39,3 +42,41 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class UnchangedFilesTestCase(unittest.TestCase):
+    "Tests for files unchanged since they were last imported"
+    def test_skip_unchanged_static_files(self):
+        course_dir = DATA_DIR / "tilde"
+        course_id = CourseLocator("edX", "tilde", "Fall_2012")
+        content_store = Mock()
+        content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
+        remap_dict = import_static_content(course_dir, content_store, course_id)
+        saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
+        self.assertIn("example.txt", [sc.name for sc in saved_static_content])
+
+        stored_assets = [
+            {
+                'asset_key': sc.location,
+                'md5': hashlib.md5(sc.data).hexdigest(),
+                'locked': sc.locked,
+                'contentType': sc.content_type,
+                'displayname': sc.name,
+                'import_path': sc.import_path,
+                'thumbnail_location': sc.thumbnail_location,
+            }
+            for sc in saved_static_content
+        ]
+        content_store.reset_mock()
+        content_store.get_all_content_for_course.return_value = (stored_assets, len(stored_assets))
+        self.assertEqual(import_static_content(course_dir, content_store, course_id), remap_dict)
+        self.assertFalse(content_store.save.called)
+        self.assertFalse(content_store.generate_thumbnail.called)
+
+        stored_assets[0]['md5'] = 'changed'
+        self.assertEqual(import_static_content(course_dir, content_store, course_id), remap_dict)
+        self.assertEqual(
+            [call[0][0].location for call in content_store.save.call_args_list],
+            [stored_assets[0]['asset_key']]
+        )
@@ -2,6 +2,8 @@
 Models for bulk email
 """
 import logging
+import re
+from string import Formatter
 
 import markupsafe
 from config_models.models import ConfigurationModel
@@ -17,7 +19,7 @@ from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
 from openedx.core.lib.html_to_text import html_to_text
 from openedx.core.lib.mail_utils import wrap_message
 from student.roles import CourseInstructorRole, CourseStaffRole
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import substitute_course_keywords, substitute_keywords_with_data
 from util.query import use_read_replica_if_available
 
 log = logging.getLogger(__name__)
@@ -404,6 +406,114 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Create a CompiledCourseEmailTemplate that renders the plain text
+        message of `render_plaintext` for each recipient, from the provided
+        `context` dict of values shared by all recipients.
+        """
+        return CompiledCourseEmailTemplate(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Create a CompiledCourseEmailTemplate that renders the HTML message
+        of `render_htmltext` for each recipient, from the provided `context`
+        dict of values shared by all recipients.
+        """
+        return CompiledCourseEmailTemplate(self.html_template, htmltext, context, escape_values=True)
+
+
+class CompiledCourseEmailTemplate(object):
+    """
+    A course email template, formatted with the values shared by all the
+    recipients of an email, and with its message body inserted, so that
+    only the values specific to each recipient are substituted when the
+    email is rendered for the recipient.
+
+    The rendered messages are the same as those of
+    CourseEmailTemplate.render_plaintext and render_htmltext.
+    """
+    # Context values that differ between the recipients of an email.
+    RECIPIENT_FIELDS = frozenset(['name', 'email', 'user_id'])
+
+    def __init__(self, format_string, message_body, context, escape_values=False):
+        """
+        Arguments:
+            format_string (unicode): The template.
+            message_body (unicode): The message body inserted in the template.
+            context (dict): The values shared by all recipients.
+            escape_values (bool): Whether to HTML-escape the string values
+                of the context and of the recipients.
+        """
+        self.escape_values = escape_values
+        self.context = {
+            key: value for key, value in self._escape(context).iteritems()
+            if key not in self.RECIPIENT_FIELDS
+        }
+        self.format_string = self._compile_format_string(format_string, self.context)
+        self.message_body = message_body
+        if 'course_id' in self.context:
+            self.message_body = substitute_course_keywords(message_body, self.context)
+
+    def _escape(self, context):
+        """
+        Returns a copy of the context with its string values HTML-escaped,
+        if values are escaped.
+        """
+        if not self.escape_values:
+            return dict(context)
+        return {
+            key: markupsafe.escape(value) if isinstance(value, basestring) else value
+            for key, value in context.iteritems()
+        }
+
+    @classmethod
+    def _compile_format_string(cls, format_string, context):
+        """
+        Returns the format string with all its replacement fields that are
+        not recipient fields replaced by their values in the context.
+        """
+        def escape_braces(text):
+            """ Escapes the text so that it is formatted as itself. """
+            return text.replace('{', '{{').replace('}', '}}')
+
+        compiled_parts = []
+        for literal_text, field_name, format_spec, conversion in Formatter().parse(format_string):
+            compiled_parts.append(escape_braces(literal_text))
+            if field_name is None:
+                continue
+
+            field = u'{{{}{}{}}}'.format(
+                field_name,
+                u'!' + conversion if conversion else u'',
+                u':' + format_spec if format_spec else u'',
+            )
+            # The name of the context value, without attribute access or indexing.
+            if re.match(r'[^.\[]*', field_name).group() in cls.RECIPIENT_FIELDS:
+                compiled_parts.append(field)
+            else:
+                compiled_parts.append(escape_braces(field.format(**context)))
+        return u''.join(compiled_parts)
+
+    def render(self, recipient_context):
+        """
+        Create the message of the recipient with the provided
+        `recipient_context` dict, containing the recipient's 'name',
+        'email' and 'user_id'.
+        """
+        context = dict(self.context)
+        context.update(self._escape(recipient_context))
+
+        # Only the recipient's %%-encoded keywords remain in the message body.
+        message_body = self.message_body
+        if 'user_id' in context and 'course_id' in context:
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        result = self.format_string.format(**context)
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return wrap_message(result)
+
 
 class CourseAuthorization(models.Model):
     """
@@ -7,10 +7,13 @@ import json
 import logging
 import random
 import re
+import sys
 from collections import Counter
+from multiprocessing.pool import ThreadPool
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
 from time import sleep
 
+import six
 from boto.exception import AWSConnectionError
 from boto.ses.exceptions import (
     SESAddressBlacklistedError,
@@ -42,6 +45,7 @@ from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import (
     SubtaskStatus,
     check_subtask_is_valid,
+    checkpoint_subtask_status,
     queue_subtasks_for_query,
     update_subtask_status
 )
@@ -92,6 +96,10 @@ BULK_EMAIL_FAILURE_ERRORS = (
     SMTPException,
 )
 
+# Factor by which the delay between sends decreases after each batch of
+# emails sent without being throttled.
+SEND_DELAY_DECAY = 0.9
+
 
 def _get_course_email_context(course):
     """
@@ -419,6 +427,69 @@ def _get_source_address(course_id, course_title, course_language, truncate=True)
     return from_addr
 
 
+class _SendRateController(object):
+    """
+    Adapts the number of connections over which a subtask sends emails, and
+    the delay between its sends, to the rate at which the email service
+    accepts them.
+
+    A subtask that has not been throttled sends over BULK_EMAIL_SMTP_CONNECTIONS
+    connections, without delay.  Each retry of the subtask because of throttling
+    halves its number of connections, and doubles its delay between sends,
+    from BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS up to BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS.
+    The delay then decays with each batch of emails that is sent without being
+    throttled, back down to BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS.
+    """
+    def __init__(self, subtask_status):
+        num_throttled_retries = subtask_status.retried_nomax
+        self.num_connections = max(settings.BULK_EMAIL_SMTP_CONNECTIONS >> num_throttled_retries, 1)
+        if num_throttled_retries > 0:
+            self.min_delay = settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
+            self.delay = min(
+                self.min_delay * 2 ** min(num_throttled_retries - 1, 32),
+                max(settings.BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS, self.min_delay),
+            )
+        else:
+            self.min_delay = self.delay = 0
+
+    def wait(self, num_emails):
+        """
+        Sleeps for the delay between sends before sending the given number of emails.
+        """
+        if self.delay > 0:
+            sleep(self.delay * num_emails)
+
+    def record_success(self):
+        """
+        Decays the delay between sends after a batch of emails was sent without being throttled.
+        """
+        self.delay = max(self.delay * SEND_DELAY_DECAY, self.min_delay)
+
+
+def _send_email_messages(email_msgs, pool, course_title):
+    """
+    Sends each of the given email messages over its own connection, concurrently
+    if a thread pool is given.
+
+    Returns a list with, for each message, the exc_info of the error raised when sending it,
+    or None if it was sent.
+    """
+    def send(email_msg):
+        """
+        Sends the email message, returning the exc_info of the error raised, if any.
+        """
+        try:
+            with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                email_msg.connection.send_messages([email_msg])
+        except Exception:  # pylint: disable=broad-except
+            return sys.exc_info()
+        return None
+
+    if pool is None:
+        return [send(email_msg) for email_msg in email_msgs]
+    return pool.map(send, email_msgs)
+
+
 def _send_course_email(entry_id, email_id, to_list, global_email_context, subtask_status):
     """
     Performs the email sending task.
@@ -438,7 +509,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
       * `subtask_status` : object of class SubtaskStatus representing current status.
 
     Sends to all addresses contained in to_list that are not also in the Optout table.
-    Emails are sent multi-part, in both plain text and html.
+    Emails are sent multi-part, in both plain text and html, over a small pool of
+    connections whose size and delay between sends are adapted by _SendRateController.
 
     Returns a tuple of two values:
       * First value is a SubtaskStatus object which represents current progress at the end of this call.
@@ -494,51 +566,57 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connections = []
+    pool = None
     try:
-        connection = get_connection()
-        connection.open()
-
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
-
+        # Define context values to use in all course emails, and compile the templates
+        # with them, so that only the user-specific values are substituted for each recipient.
+        email_context = dict(global_email_context, course_id=course_email.course_id)
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
+
+        # Send over a small pool of connections, one email per connection at a time.
+        rate_controller = _SendRateController(subtask_status)
+        num_connections = min(rate_controller.num_connections, max(len(to_list), 1))
+        for __ in range(num_connections):
+            connection = get_connection()
+            connections.append(connection)
+            connection.open()
+        if num_connections > 1:
+            pool = ThreadPool(num_connections)
+
+        num_sent_since_checkpoint = 0
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
+            # Send to the users at the end of the list, one per connection.  At the end of
+            # processing these users, they will be removed from the to_list.
             # That way, the to_list will always contain the recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            batch = []
+            for current_recipient, connection in zip(reversed(to_list), connections):
+                recipient_num += 1
+                email = current_recipient['email']
+                recipient_context = {
+                    'email': email,
+                    'name': current_recipient['profile__name'],
+                    'user_id': current_recipient['pk'],
+                }
+
+                # Construct message content using the compiled templates and user-specific values:
+                plaintext_msg = plaintext_template.render(recipient_context)
+                html_msg = html_template.render(recipient_context)
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_msg,
+                    from_addr,
+                    [email],
+                    connection=connection
+                )
+                email_msg.attach_alternative(html_msg, 'text/html')
+                batch.append((recipient_num, current_recipient, email_msg))
 
-            try:
                 log.info(
                     "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
                     Recipient name: %s, Email address: %s",
@@ -550,82 +628,111 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+
+            # Throttle to the rate at which the email service is accepting emails.
+            rate_controller.wait(len(batch))
+            send_errors = _send_email_messages([msg for __, __, msg in batch], pool, course_title)
+
+            # Recipients whose email was not sent, and is to be retried with the task.
+            retry_recipients = []
+            retry_error = None
+            for (current_recipient_num, current_recipient, __), send_error in zip(batch, send_errors):
+                email = current_recipient['email']
+                try:
+                    if send_error is not None:
+                        six.reraise(*send_error)
+
+                except SMTPDataError as exc:
+                    # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        current_recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                        # This will cause the outer handler to catch the exception and retry the entire task.
+                        retry_recipients.append(current_recipient)
+                        retry_error = retry_error or send_error
+                        continue
+                    else:
+                        # This will fall through and not retry the message.
+                        log.warning(
+                            'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                            Email not delivered to %s due to error %s',
+                            parent_task_id,
+                            task_id,
+                            email_id,
+                            current_recipient_num,
+                            total_recipients,
+                            email,
+                            exc.smtp_error
+                        )
+                        dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                        subtask_status.increment(failed=1)
+
+                except SINGLE_EMAIL_FAILURE_ERRORS as exc:
                     # This will fall through and not retry the message.
-                    log.warning(
-                        'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                        Email not delivered to %s due to error %s',
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
                         parent_task_id,
                         task_id,
                         email_id,
-                        recipient_num,
+                        current_recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        exc
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
+                except Exception:  # pylint: disable=broad-except
+                    # This will cause the outer handler to catch the exception and handle it.
+                    retry_recipients.append(current_recipient)
+                    retry_error = retry_error or send_error
+                    continue
 
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
-
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        current_recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+
+                recipients_info[email] += 1
+
+            # Remove the users that were emailed off the end of the list only once they have
+            # been processed.  (That way, if there were a failure that needed to be retried,
+            # the user is still on the list.)
+            to_list[-len(batch):] = list(reversed(retry_recipients))
+            if retry_error is not None:
+                six.reraise(*retry_error)
+            rate_controller.record_success()
+
+            num_sent_since_checkpoint += len(batch)
+            if to_list and settings.BULK_EMAIL_CHECKPOINT_INTERVAL and \
+                    num_sent_since_checkpoint >= settings.BULK_EMAIL_CHECKPOINT_INTERVAL:
+                checkpoint_subtask_status(entry_id, task_id, subtask_status)
+                num_sent_since_checkpoint = 0
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -638,8 +745,10 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             total_recipients_failed,
             total_recipients
         )
-        duplicate_recipients = ["{0} ({1})".format(email, repetition)
-                                for email, repetition in recipients_info.most_common() if repetition > 1]
+        duplicate_recipients = [
+            "{0} ({1})".format(recipient_email, repetition)
+            for recipient_email, repetition in recipients_info.most_common() if repetition > 1
+        ]
         if duplicate_recipients:
             log.info(
                 "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Duplicate Recipients [%s]: [%s]",
@@ -706,7 +815,11 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        for connection in connections:
+            connection.close()
 
 
 def _get_current_task():
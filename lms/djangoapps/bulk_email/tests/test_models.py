@@ -126,6 +126,7 @@ class NoCourseEmailTemplateTest(TestCase):
 
 
 @attr(shard=1)
+@ddt.ddt
 class CourseEmailTemplateTest(TestCase):
     """Test the CourseEmailTemplate model."""
 
@@ -223,6 +224,31 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    @ddt.data(
+        ('compile_plaintext', 'render_plaintext', '_get_sample_plain_context'),
+        ('compile_htmltext', 'render_htmltext', '_get_sample_html_context'),
+    )
+    @ddt.unpack
+    def test_compiled_template(self, compile_method, render_method, get_context):
+        template = CourseEmailTemplate.get_template()
+        message = "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%."
+        context = self._add_xss_fields(getattr(self, get_context)())
+        compiled_template = getattr(template, compile_method)(message, context)
+
+        for name, email in [("Profile Name", "profile@test.com"), ("<b>Other Name</b>", "other@test.com")]:
+            recipient_context = {'name': name, 'email': email, 'user_id': context['user_id']}
+            self.assertEqual(
+                compiled_template.render(recipient_context),
+                getattr(template, render_method)(message, dict(context, **recipient_context)),
+            )
+
+    def test_compiled_template_requires_context(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._get_sample_html_context()
+        del context['course_title']
+        with self.assertRaises(KeyError):
+            template.compile_htmltext("My new html text.", context)
+
 
 @attr(shard=1)
 class CourseAuthorizationTest(TestCase):
@@ -26,6 +26,7 @@ from boto.ses.exceptions import (
 from celery.states import FAILURE, SUCCESS  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locator import CourseLocator
@@ -197,6 +198,32 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
             get_conn.return_value.send_messages.side_effect = cycle([None])
             self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
 
+    @override_settings(BULK_EMAIL_SMTP_CONNECTIONS=3)
+    def test_successful_concurrently(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+            self.assertEquals(get_conn.call_count, 3)
+            self.assertEquals(get_conn.return_value.send_messages.call_count, num_emails)
+            self.assertEquals(get_conn.return_value.close.call_count, 3)
+
+    @override_settings(BULK_EMAIL_CHECKPOINT_INTERVAL=10)
+    def test_checkpoints(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            with patch('bulk_email.tasks.checkpoint_subtask_status') as mock_checkpoint:
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        # No checkpoint is needed once all emails are sent.
+        self.assertEquals(mock_checkpoint.call_count, (num_emails - 1) // 10)
+
     def test_successful_twice(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -259,6 +286,11 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
                 send_bulk_course_email, 'emailed', num_emails, expected_succeeds, failed=expected_fails
             )
 
+    @override_settings(BULK_EMAIL_SMTP_CONNECTIONS=4)
+    def test_smtp_blacklisted_user_concurrently(self):
+        # Test that failures of concurrent sends only fail their own emails.
+        self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
+
     def test_smtp_blacklisted_user(self):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
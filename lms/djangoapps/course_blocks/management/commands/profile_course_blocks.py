@@ -0,0 +1,84 @@
+"""
+Command to profile the Block Structure transformers on a course.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from openedx.core.djangoapps.content.block_structure.profiling import TransformerProfiler
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    """
+    Collects the course's block structure from the modulestore, without
+    storing it, and transforms it for the given user with the default
+    course block access transformers.  Then prints the time taken, blocks
+    removed and, optionally, the memory allocated by each transformer.
+
+    Example usage:
+        $ ./manage.py lms profile_course_blocks 'edX/DemoX/Demo_Course' --username staff --settings=devstack
+    """
+    args = u'<course_id>'
+    help = u'Prints the time taken and blocks removed by each Block Structure transformer for a course.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            'course_id',
+            help=u'Course to profile.',
+        )
+        parser.add_argument(
+            '--username',
+            dest='username',
+            required=True,
+            help=u'User for whom the course blocks are transformed.',
+        )
+        parser.add_argument(
+            '--trace_memory',
+            help=u'Also print the memory allocated by each transformer. Requires the tracemalloc module.',
+            action='store_true',
+            default=False,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            raise CommandError(u'Invalid course_id: {}.'.format(options['course_id']))
+
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(u'Unknown username: {}.'.format(options['username']))
+
+        try:
+            profiler = TransformerProfiler(trace_memory=options['trace_memory'])
+        except ValueError as exc:
+            raise CommandError(exc.message)
+
+        store = modulestore()
+        course_usage_key = store.make_course_usage_key(course_key)
+        with profiler:
+            with store.bulk_operations(course_key):
+                collected_block_structure = BlockStructureFactory.create_from_modulestore(course_usage_key, store)
+                BlockStructureTransformers.collect(collected_block_structure)
+            get_course_blocks(user, course_usage_key, collected_block_structure=collected_block_structure)
+
+        self.stdout.write(u'{:<10} {:<40} {:>12} {:>15} {:>15}'.format(
+            u'phase', u'transformer', u'time (ms)', u'blocks removed', u'memory (KB)',
+        ))
+        for profile in profiler.totals():
+            self.stdout.write(u'{:<10} {:<40} {:>12.1f} {:>15} {:>15}'.format(
+                profile.phase,
+                profile.transformer_name,
+                profile.duration * 1000,
+                profile.num_blocks_removed,
+                u'{:.1f}'.format(profile.memory_delta / 1024.0) if profile.memory_delta is not None else u'-',
+            ))
@@ -0,0 +1,40 @@
+"""
+Tests for profile_course_blocks management command.
+"""
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestProfileCourseBlocks(ModuleStoreTestCase):
+    """
+    Tests profile_course_blocks management command.
+    """
+    def setUp(self):
+        super(TestProfileCourseBlocks, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        ItemFactory.create(parent=chapter, category='sequential', visible_to_staff_only=True)
+        self.user = UserFactory.create()
+
+    def test_profile(self):
+        out = StringIO()
+        call_command('profile_course_blocks', unicode(self.course.id), username=self.user.username, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn('collect', output)
+        self.assertIn('visibility', output)
+        self.assertIn('user_partitions', output)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('profile_course_blocks', unicode(self.course.id), username='unknown')
+
+    def test_invalid_course_id(self):
+        with self.assertRaises(CommandError):
+            call_command('profile_course_blocks', 'invalid_course_id', username=self.user.username)
@@ -1,6 +1,7 @@
 """
 User Partitions Transformer
 """
+from courseware.user_partition_groups import UserPartitionGroupResolver
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
@@ -252,13 +253,4 @@ def _get_user_partition_groups(course_key, user_partitions, user):
             in a group for a particular partition, then that partition's
             ID will not be in the dict.
     """
-    partition_groups = {}
-    for partition in user_partitions:
-        group = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
-        if group is not None:
-            partition_groups[partition.id] = group
-    return partition_groups
+    return UserPartitionGroupResolver.for_user(course_key, user).get_groups(user_partitions)
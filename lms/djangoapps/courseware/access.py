@@ -35,6 +35,7 @@ from courseware.access_utils import (
     check_course_open_for_learner,
 )
 from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
+from courseware.user_partition_groups import UserPartitionGroupResolver
 from lms.djangoapps.ccx.custom_exception import CCXLocatorValidationException
 from lms.djangoapps.ccx.models import CustomCourseForEdX
 from mobile_api.models import IgnoreMobileAvailableFlagConfig
@@ -396,8 +397,11 @@ def _has_group_access(descriptor, user, course_key):
     This function returns a boolean indicating whether or not `user` has
     sufficient group memberships to "load" a block (the `descriptor`)
     """
+    # The user's role and groups in the course are resolved once per request.
+    user_partition_groups = UserPartitionGroupResolver.for_user(course_key, user)
+
     # Allow staff and instructors roles group access, as they are not masquerading as a student.
-    if get_user_role(user, course_key) in ['staff', 'instructor']:
+    if user_partition_groups.user_role in ['staff', 'instructor']:
         return ACCESS_GRANTED
 
     # use merged_group_access which takes group access on the block's
@@ -447,11 +451,7 @@ def _has_group_access(descriptor, user, course_key):
     # look up the user's group for each partition
     user_groups = {}
     for partition, groups in partition_groups:
-        user_groups[partition.id] = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
+        user_groups[partition.id] = user_partition_groups.get_group(partition)
 
     # finally: check that the user has a satisfactory group assignment
     # for each partition.
@@ -988,6 +988,34 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def bulk_create_for_locations(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient for each of the given users, with pre-fetched
+        data for the given locations, using a single query.
+
+        Returns a dict mapping each user_id to its ScoresClient.
+        """
+        clients = {}
+        for user_id in user_ids:
+            client = cls(course_id, user_id)
+            client._has_fetched = True  # pylint: disable=protected-access
+            clients[user_id] = client
+
+        if clients:
+            scores_qset = StudentModule.objects.filter(
+                student_id__in=clients.keys(),
+                course_id=course_id,
+                module_state_key__in=set(scorable_locations),
+            )
+            for user_id, location, correct, total, created in scores_qset.values_list(
+                    'student_id', 'module_state_key', 'grade', 'max_grade', 'created'
+            ):
+                clients[user_id]._locations_to_scores[  # pylint: disable=protected-access
+                    location.map_into_course(course_id)
+                ] = cls.Score(correct, total, created)
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -56,9 +56,7 @@ from openedx.core.lib.url_utils import quote_slashes, unquote_slashes
 from openedx.core.lib.xblock_utils import request_token as xblock_request_token
 from openedx.core.lib.xblock_utils import (
     add_staff_markup,
-    replace_course_urls,
-    replace_jump_to_id_urls,
-    replace_static_urls,
+    replace_urls,
     wrap_xblock
 )
 from student.models import anonymous_id_for_user, user_by_anonymous_id
@@ -643,27 +641,21 @@ def get_module_system_for_user(
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
+    # Rewrite, in a single pass:
+    # - urls beginning in /static to point to course-specific content
+    # - urls of the form '/course/' to refer to the root of multicourse directory
     #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
+    # - intra-courseware links (/jump_to_id/<id>). This format is an improvement over
+    #   the /course/... format for studio authored courses, because it is agnostic to
+    #   course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
     block_wrappers.append(partial(
-        replace_jump_to_id_urls,
+        replace_urls,
         course_id,
         reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
+        data_dir=getattr(descriptor, 'data_dir', None),
+        static_asset_path=static_asset_path or descriptor.static_asset_path
     ))
 
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
@@ -716,7 +708,7 @@ def get_module_system_for_user(
         hostname=settings.SITE_NAME,
         # TODO (cpennington): This should be removed when all html from
         # a module is coming through get_html and is therefore covered
-        # by the replace_static_urls code below
+        # by the replace_urls block wrapper above
         replace_urls=partial(
             static_replace.replace_static_urls,
             data_directory=getattr(descriptor, 'data_dir', None),
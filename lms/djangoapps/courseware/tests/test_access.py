@@ -12,6 +12,7 @@ from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.client import RequestFactory
+from django.test.utils import override_settings
 from milestones.tests.utils import MilestonesTestCaseMixin
 from mock import Mock, patch
 from nose.plugins.attrib import attr
@@ -19,6 +20,7 @@ from opaque_keys.edx.locator import CourseLocator
 
 import courseware.access as access
 import courseware.access_response as access_response
+import request_cache
 from courseware.masquerade import CourseMasquerade
 from courseware.tests.factories import (
     BetaTesterFactory,
@@ -28,8 +30,12 @@ from courseware.tests.factories import (
     UserFactory
 )
 from courseware.tests.helpers import LoginEnrollmentTestCase, masquerade_as_group_member
+from courseware.user_partition_groups import REQUEST_CACHE_NAMESPACE
 from lms.djangoapps.ccx.models import CustomCourseForEdX
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from openedx.core.djangoapps.course_groups.views import link_cohort_to_partition_group
 from openedx.core.djangoapps.waffle_utils.testutils import WAFFLE_TABLES
 from student.models import CourseEnrollment
 from student.roles import CourseCcxCoachRole, CourseStaffRole
@@ -334,6 +340,53 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase, MilestonesTes
             bool(access.has_access(self.global_staff, 'load', chapter, course_key=self.course.id))
         )
 
+    @override_settings(USER_PARTITION_GROUPS_REQUEST_CACHE=True)
+    @patch('courseware.access_utils.in_preview_mode', Mock(return_value=True))
+    def test_has_group_access_resolved_once_per_request(self):
+        """
+        Test that group access follows cohort changes and masquerades made in the
+        same request, while the users' groups are resolved once per request.
+        """
+        request_cache.clear_cache(REQUEST_CACHE_NAMESPACE)
+        self.addCleanup(request_cache.clear_cache, REQUEST_CACHE_NAMESPACE)
+
+        partition_id = MINIMUM_STATIC_PARTITION_ID
+        group_0_id = MINIMUM_STATIC_PARTITION_ID + 1
+        group_1_id = MINIMUM_STATIC_PARTITION_ID + 2
+        user_partition = UserPartition(
+            partition_id, 'Test User Partition', '',
+            [Group(group_0_id, 'Group 1'), Group(group_1_id, 'Group 2')],
+            scheme_id='cohort'
+        )
+        self.course.user_partitions.append(user_partition)
+        modulestore().update_item(self.course, ModuleStoreEnum.UserID.test)
+        config_course_cohorts(self.course, is_cohorted=True)
+        cohorts = []
+        for group_id in (group_0_id, group_1_id):
+            cohort = CohortFactory(course_id=self.course.id)
+            link_cohort_to_partition_group(cohort, partition_id, group_id)
+            cohorts.append(cohort)
+
+        chapter = ItemFactory.create(category="chapter", parent_location=self.course.location)
+        chapter.group_access = {partition_id: [group_0_id]}
+        CourseEnrollmentFactory(user=self.student, course_id=self.course.id)
+
+        add_user_to_cohort(cohorts[0], self.student.username)
+        self.assertTrue(access._has_group_access(chapter, self.student, self.course.id))
+
+        # Moving the student to the other cohort changes their access in the same request.
+        add_user_to_cohort(cohorts[1], self.student.username)
+        self.assertFalse(access._has_group_access(chapter, self.student, self.course.id))
+        add_user_to_cohort(cohorts[0], self.student.username)
+        self.assertTrue(access._has_group_access(chapter, self.student, self.course.id))
+
+        # Staff have access, unless they masquerade as a member of another group.
+        self.assertTrue(access._has_group_access(chapter, self.global_staff, self.course.id))
+        self.assertEqual(200, masquerade_as_group_member(self.global_staff, self.course, partition_id, group_1_id))
+        self.assertFalse(access._has_group_access(chapter, self.global_staff, self.course.id))
+        self.assertEqual(200, masquerade_as_group_member(self.global_staff, self.course, partition_id, group_0_id))
+        self.assertTrue(access._has_group_access(chapter, self.global_staff, self.course.id))
+
     def test_has_access_to_course(self):
         self.assertFalse(access._has_access_to_course(
             None, 'staff', self.course.id
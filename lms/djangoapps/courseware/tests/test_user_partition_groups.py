@@ -0,0 +1,84 @@
+"""
+Tests for the per-request resolution of users' groups in user partitions.
+"""
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import Mock, patch
+from opaque_keys.edx.locator import CourseLocator
+
+import request_cache
+from courseware.user_partition_groups import REQUEST_CACHE_NAMESPACE, UserPartitionGroupResolver
+from student.tests.factories import UserFactory
+from xmodule.partitions.partitions import Group, UserPartition
+
+
+@override_settings(USER_PARTITION_GROUPS_REQUEST_CACHE=True)
+class UserPartitionGroupResolverTest(TestCase):
+    """
+    Tests that UserPartitionGroupResolver looks up the groups of a user once
+    per request.
+    """
+    def setUp(self):
+        super(UserPartitionGroupResolverTest, self).setUp()
+        request_cache.clear_cache(REQUEST_CACHE_NAMESPACE)
+        self.addCleanup(request_cache.clear_cache, REQUEST_CACHE_NAMESPACE)
+
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.user = UserFactory()
+        self.groups = [Group(0, 'Group 0'), Group(1, 'Group 1')]
+        self.scheme = Mock()
+        self.scheme.get_group_for_user.side_effect = lambda course_key, user, partition: (
+            self.groups[1] if partition.id == 1 else None
+        )
+        self.partitions = [
+            UserPartition(partition_id, 'Partition', 'Partition', self.groups, self.scheme)
+            for partition_id in range(2)
+        ]
+
+    def test_get_groups(self):
+        resolver = UserPartitionGroupResolver.for_user(self.course_key, self.user)
+        self.assertEqual(resolver.get_groups(self.partitions), {1: self.groups[1]})
+        self.assertIsNone(resolver.get_group(self.partitions[0]))
+        self.assertEqual(self.scheme.get_group_for_user.call_count, 2)
+
+    def test_memoized_per_request(self):
+        for __ in range(3):
+            resolver = UserPartitionGroupResolver.for_user(self.course_key, self.user)
+            resolver.get_groups(self.partitions)
+        self.assertIs(UserPartitionGroupResolver.for_user(self.course_key, self.user), resolver)
+        self.assertEqual(self.scheme.get_group_for_user.call_count, 2)
+
+        # Other users and courses have their own resolvers
+        self.assertIsNot(UserPartitionGroupResolver.for_user(self.course_key, UserFactory()), resolver)
+        self.assertIsNot(UserPartitionGroupResolver.for_user(CourseLocator('org', 'other', 'run'), self.user), resolver)
+
+    @override_settings(USER_PARTITION_GROUPS_REQUEST_CACHE=False)
+    def test_not_memoized(self):
+        resolver = UserPartitionGroupResolver.for_user(self.course_key, self.user)
+        self.assertIsNot(UserPartitionGroupResolver.for_user(self.course_key, self.user), resolver)
+
+    @patch('courseware.user_partition_groups.get_course_masquerade', Mock(return_value=Mock()))
+    def test_not_memoized_when_masquerading(self):
+        resolver = UserPartitionGroupResolver.for_user(self.course_key, self.user)
+        self.assertIsNot(UserPartitionGroupResolver.for_user(self.course_key, self.user), resolver)
+
+    @patch('courseware.access.get_user_role', return_value='staff')
+    def test_user_role(self, mock_get_user_role):
+        resolver = UserPartitionGroupResolver.for_user(self.course_key, self.user)
+        self.assertEqual(resolver.user_role, 'staff')
+        self.assertEqual(UserPartitionGroupResolver.for_user(self.course_key, self.user).user_role, 'staff')
+        mock_get_user_role.assert_called_once_with(self.user, self.course_key)
+
+    @patch('openedx.core.djangoapps.course_groups.cohorts.bulk_cache_cohorts')
+    @patch('courseware.user_partition_groups.CourseEnrollment.bulk_fetch_enrollment_states')
+    @patch('courseware.user_partition_groups.BulkCourseTags.prefetch')
+    def test_for_users(self, mock_prefetch_tags, mock_fetch_enrollments, mock_cache_cohorts):
+        users = [self.user, UserFactory()]
+        resolvers = UserPartitionGroupResolver.for_users(self.course_key, users)
+
+        mock_cache_cohorts.assert_called_once_with(self.course_key, users)
+        mock_fetch_enrollments.assert_called_once_with(users, self.course_key)
+        mock_prefetch_tags.assert_called_once_with(self.course_key, users)
+        self.assertEqual(sorted(resolvers), sorted(user.id for user in users))
+        for user in users:
+            self.assertIs(UserPartitionGroupResolver.for_user(self.course_key, user), resolvers[user.id])
@@ -3,12 +3,16 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
 from collections import defaultdict
 from unittest import skip
 
 from django.test import TestCase
 from edx_user_state_client.tests import UserStateClientTestBase
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
 
+from courseware.models import StudentModule
 from courseware.tests.factories import UserFactory
 from courseware.user_state_client import DjangoXBlockUserStateClient
 
@@ -67,3 +71,44 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+class TestDjangoUserStateClientBulkSet(TestCase):
+    """
+    Tests of setting the state of many blocks at once.
+    """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestDjangoUserStateClientBulkSet, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        course_key = CourseLocator('org', 'course', 'run')
+        self.block_keys = [course_key.make_usage_key('problem', 'problem_{}'.format(index)) for index in range(4)]
+
+    def test_set_many_merges_in_bulk(self):
+        self.client.set_many(self.user.username, {self.block_keys[0]: {'a': 1}, self.block_keys[1]: {'a': 1}})
+
+        with patch.object(StudentModule.objects, 'get_or_create') as mock_get_or_create:
+            self.client.set_many(
+                self.user.username,
+                {block_key: {'b': 2} for block_key in self.block_keys},
+            )
+            self.assertFalse(mock_get_or_create.called)
+
+        states = {
+            student_module.module_state_key: json.loads(student_module.state)
+            for student_module in StudentModule.objects.filter(student=self.user)
+        }
+        self.assertEqual(
+            states,
+            {
+                self.block_keys[0]: {'a': 1, 'b': 2},
+                self.block_keys[1]: {'a': 1, 'b': 2},
+                self.block_keys[2]: {'b': 2},
+                self.block_keys[3]: {'b': 2},
+            },
+        )
+        self.assertEqual(len(list(self.client.get_history(self.user.username, self.block_keys[0]))), 2)
+        self.assertEqual(len(list(self.client.get_history(self.user.username, self.block_keys[2]))), 1)
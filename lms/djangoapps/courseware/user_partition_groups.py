@@ -0,0 +1,130 @@
+"""
+Per-request resolution of the groups to which users belong in the user
+partitions of a course.
+
+Access checks and the UserPartitionTransformer look up the user's group in
+the same partitions for every block they check, and each partition scheme
+goes to the database (or a cache) for every lookup.  The resolvers of this
+module look up the user's group in each partition of a course once, and are
+kept in the request cache, per user and course, for the rest of the request.
+"""
+from django.conf import settings
+from django.dispatch import receiver
+from lazy import lazy
+
+import request_cache
+from courseware.masquerade import get_course_masquerade
+from openedx.core.djangoapps.course_groups.signals.signals import COHORT_MEMBERSHIP_UPDATED
+from openedx.core.djangoapps.user_api.course_tag.api import BulkCourseTags
+from student.models import CourseEnrollment
+
+REQUEST_CACHE_NAMESPACE = u'courseware.user_partition_groups'
+
+
+class UserPartitionGroupResolver(object):
+    """
+    Resolves the groups to which a user belongs in the user partitions of a
+    course, looking up the group in each partition once.
+    """
+    def __init__(self, course_key, user):
+        """
+        Arguments:
+            course_key (CourseKey): The course of the partitions.
+            user (User): The user whose groups are resolved.
+        """
+        self.course_key = course_key
+        self.user = user
+
+        # The user's group in each partition looked up so far, by
+        # partition id.  None if the user isn't in a group.
+        # dict {int: Group}
+        self._groups = {}
+
+    @classmethod
+    def for_user(cls, course_key, user):
+        """
+        Returns the resolver of the user's groups in the course for the
+        current request.
+
+        Resolvers are only kept in the request cache if the
+        USER_PARTITION_GROUPS_REQUEST_CACHE setting is enabled, and if the
+        user isn't masquerading in the course, since masquerades change the
+        groups of the user.  The resolver is discarded if the user's cohort
+        in the course changes.
+        """
+        if not getattr(settings, 'USER_PARTITION_GROUPS_REQUEST_CACHE', False):
+            return cls(course_key, user)
+        if get_course_masquerade(user, course_key):
+            return cls(course_key, user)
+
+        cache = request_cache.get_cache(REQUEST_CACHE_NAMESPACE)
+        cache_key = (user.id, unicode(course_key))
+        resolver = cache.get(cache_key)
+        if resolver is None:
+            resolver = cache[cache_key] = cls(course_key, user)
+        return resolver
+
+    @classmethod
+    def for_users(cls, course_key, users):
+        """
+        Returns a dict mapping the ids of the given users to the resolvers
+        of their groups in the course, after pre-fetching the cohorts,
+        enrollment states and course tags that the partition schemes look up,
+        for all the users at once.
+
+        Since the course tags are pre-fetched, users who aren't yet assigned
+        to a group of a random partition are not assigned one.
+        """
+        # avoid circular import: cohorts imports courseware.courses, which imports courseware.access
+        from openedx.core.djangoapps.course_groups.cohorts import bulk_cache_cohorts
+
+        # before populating the caches with another bulk set of data,
+        # remove previously cached resolvers to keep memory usage low.
+        request_cache.clear_cache(REQUEST_CACHE_NAMESPACE)
+        bulk_cache_cohorts(course_key, users)
+        CourseEnrollment.bulk_fetch_enrollment_states(users, course_key)
+        BulkCourseTags.prefetch(course_key, users)
+        return {user.id: cls.for_user(course_key, user) for user in users}
+
+    @lazy
+    def user_role(self):
+        """
+        The role of the user in the course, as returned by
+        courseware.access.get_user_role.
+        """
+        from courseware.access import get_user_role  # avoid circular import
+        return get_user_role(self.user, self.course_key)
+
+    def get_group(self, user_partition):
+        """
+        Returns the Group to which the user belongs in the given partition,
+        or None if the user isn't in a group of the partition.
+        """
+        try:
+            return self._groups[user_partition.id]
+        except KeyError:
+            group = user_partition.scheme.get_group_for_user(self.course_key, self.user, user_partition)
+            self._groups[user_partition.id] = group
+            return group
+
+    def get_groups(self, user_partitions):
+        """
+        Returns a dict mapping the ids of the given partitions to the Group
+        to which the user belongs in each partition.  The partitions in
+        which the user isn't in a group are not in the dict.
+        """
+        user_groups = {}
+        for user_partition in user_partitions:
+            group = self.get_group(user_partition)
+            if group is not None:
+                user_groups[user_partition.id] = group
+        return user_groups
+
+
+@receiver(COHORT_MEMBERSHIP_UPDATED)
+def _clear_resolver_on_cohort_change(sender, user, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discards the user's resolver for the course once their cohort changes,
+    since their groups in the course's cohort partitions may have changed.
+    """
+    request_cache.get_cache(REQUEST_CACHE_NAMESPACE).pop((user.id, unicode(course_key)), None)
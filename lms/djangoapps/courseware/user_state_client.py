@@ -10,7 +10,10 @@ from time import time
 
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Case, F, TextField, Value, When
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
+from django.utils.timezone import now
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
@@ -254,8 +257,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
-        # that were queried in get_many) so that if the score has
+        # We read the stored state of every block again (rather than re-using field
+        # objects that were queried in get_many) so that if the score has
         # been changed by some other piece of the code, we don't overwrite
         # that score.
         if self.user is not None and self.user.username == username:
@@ -270,42 +273,16 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
-        for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
-                student=user,
-                course_id=usage_key.course_key,
-                module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
-            )
-
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
-                num_fields_before = len(current_state)
-                current_state.update(state)
-                num_fields_after = len(current_state)
-                student_module.state = json.dumps(current_state)
-                try:
-                    with transaction.atomic():
-                        # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
-                except IntegrityError:
-                    # The UPDATE above failed. Log information - but ignore the error.
-                    # See https://openedx.atlassian.net/browse/TNL-5365
-                    log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                        user, repr(unicode(usage_key.course_key)), usage_key
-                    ))
-                    log.warning("set_many: All {} block keys: {}".format(
-                        len(block_keys_to_state), block_keys_to_state.keys()
-                    ))
+        set_results = None
+        if len(block_keys_to_state) > 1:
+            set_results = self._bulk_set_student_modules(user, block_keys_to_state)
+        if set_results is None:
+            set_results = [
+                (usage_key, state) + self._set_student_module(user, usage_key, state, block_keys_to_state)
+                for usage_key, state in block_keys_to_state.items()
+            ]
 
+        for usage_key, state, student_module, created, num_fields_before, num_fields_after in set_results:
             # DataDog and New Relic reporting
 
             # record the size of state modifications
@@ -337,6 +314,161 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'set_many.response_time', duration)
         self._nr_stat_accumulate('set_many', 'duration', duration)
 
+    def _set_student_module(self, user, usage_key, state, block_keys_to_state):
+        """
+        Overlays the given state over the stored state of the given block for
+        the given user, creating its StudentModule if needed.
+
+        Returns a tuple of the StudentModule, whether it was created, and
+        the number of fields in its state before and after the update.
+        """
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+
+        num_fields_before = num_fields_after = len(state)
+        if not created:
+            num_fields_before, num_fields_after = self._merge_state(student_module, state)
+            try:
+                with transaction.atomic():
+                    # Updating the object - force_update guarantees no INSERT will occur.
+                    student_module.save(force_update=True)
+            except IntegrityError:
+                self._log_set_integrity_error(user, [usage_key], block_keys_to_state)
+
+        return student_module, created, num_fields_before, num_fields_after
+
+    def _bulk_set_student_modules(self, user, block_keys_to_state):
+        """
+        Overlays the given states over the stored states of the given blocks
+        for the given user, with one query to read their StudentModules, one
+        to insert those that are missing and one to update the others.
+
+        Returns a list of tuples of each block's usage key, the given state,
+        the StudentModule, whether it was created, and the number of fields
+        in its state before and after the update.  Returns None, having
+        written nothing, if some of the missing StudentModules were created
+        concurrently.
+        """
+        stored_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(user.username, block_keys_to_state.keys())
+        }
+
+        modified = now()
+        set_results = []
+        created_modules = []
+        updated_modules = []
+        for usage_key, state in block_keys_to_state.items():
+            student_module = stored_modules.get(usage_key)
+            created = student_module is None
+            if created:
+                student_module = StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    state=json.dumps(state),
+                    module_type=usage_key.block_type,
+                )
+                created_modules.append(student_module)
+                num_fields_before = num_fields_after = len(state)
+            else:
+                num_fields_before, num_fields_after = self._merge_state(student_module, state)
+                student_module.modified = modified
+                updated_modules.append(student_module)
+            set_results.append((usage_key, state, student_module, created, num_fields_before, num_fields_after))
+
+        if created_modules:
+            try:
+                with transaction.atomic():
+                    StudentModule.objects.bulk_create(created_modules)
+            except IntegrityError:
+                return None
+
+            if any(student_module.pk is None for student_module in created_modules):
+                # Not every database returns the ids of inserted rows.
+                created_ids = {
+                    usage_key: student_module.id
+                    for student_module, usage_key in self._get_student_modules(
+                        user.username,
+                        [usage_key for usage_key, __, __, created, __, __ in set_results if created],
+                    )
+                }
+                for usage_key, __, student_module, created, __, __ in set_results:
+                    if created:
+                        student_module.id = created_ids[usage_key]
+
+        if updated_modules:
+            try:
+                with transaction.atomic():
+                    StudentModule.objects.filter(
+                        id__in=[student_module.id for student_module in updated_modules],
+                    ).update(
+                        state=Case(
+                            *[
+                                When(id=student_module.id, then=Value(student_module.state))
+                                for student_module in updated_modules
+                            ],
+                            default=F('state'),
+                            output_field=TextField()
+                        ),
+                        modified=modified,
+                    )
+            except IntegrityError:
+                self._log_set_integrity_error(
+                    user,
+                    [usage_key for usage_key, __, __, created, __, __ in set_results if not created],
+                    block_keys_to_state,
+                )
+
+        # Bulk writes don't send the signals saving history, so send them here.
+        for __, __, student_module, created, __, __ in set_results:
+            post_save.send(
+                sender=StudentModule,
+                instance=student_module,
+                created=created,
+                update_fields=None,
+                raw=False,
+                using=StudentModule.objects.db,
+            )
+
+        return set_results
+
+    def _merge_state(self, student_module, state):
+        """
+        Overlays the given state over the state of the given StudentModule.
+
+        Returns the number of fields in its state before and after.
+        """
+        if student_module.state is None:
+            current_state = {}
+        else:
+            current_state = json.loads(student_module.state)
+        num_fields_before = len(current_state)
+        current_state.update(state)
+        student_module.state = json.dumps(current_state)
+        return num_fields_before, len(current_state)
+
+    def _log_set_integrity_error(self, user, usage_keys, block_keys_to_state):
+        """
+        Logs an IntegrityError updating the StudentModules of the given
+        blocks, which is otherwise ignored.
+        See https://openedx.atlassian.net/browse/TNL-5365
+        """
+        for usage_key in usage_keys:
+            log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                user, repr(unicode(usage_key.course_key)), usage_key
+            ))
+        log.warning("set_many: All {} block keys: {}".format(
+            len(block_keys_to_state), block_keys_to_state.keys()
+        ))
+
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
         Delete the stored XBlock state for a many xblock usages.
@@ -378,13 +378,16 @@ def _load_thread_for_viewing(request, course, discussion_id, thread_id, raise_ev
     return thread
 
 
-def _create_base_discussion_view_context(request, course_key):
+def _create_base_discussion_view_context(request, course_key, user_info=None):
     """
     Returns the default template context for rendering any discussion view.
+
+    user_info, if given, is the requesting user's information retrieved from
+    the comments service, so that it isn't retrieved again.
     """
     user = request.user
-    cc_user = cc.User.from_django_user(user)
-    user_info = cc_user.to_dict()
+    if user_info is None:
+        user_info = cc.User.from_django_user(user).to_dict()
     course = get_course_with_access(user, 'load', course_key, check_if_enrolled=True)
     course_settings = make_course_settings(course, user)
     uses_bootstrap = USE_BOOTSTRAP_FLAG.is_enabled()
@@ -426,7 +429,6 @@ def _create_discussion_board_context(request, base_context, thread=None):
     discussion_id = thread.commentable_id if thread else None
     course_settings = context['course_settings']
     user = context['user']
-    cc_user = cc.User.from_django_user(user)
     user_info = context['user_info']
     if thread:
 
@@ -467,7 +469,7 @@ def _create_discussion_board_context(request, base_context, thread=None):
         'is_moderator': has_permission(user, "see_all_cohorts", course_key),
         'groups': course_settings["groups"],  # still needed to render _thread_list_template
         'user_group_id': user_group_id,  # read from container in NewPostView
-        'sort_preference': cc_user.default_sort_key,
+        'sort_preference': user_info.get('default_sort_key'),
         'category_map': course_settings["category_map"],
         'course_settings': course_settings,
         'is_commentable_divided': is_commentable_divided(course_key, discussion_id, course_discussion_settings),
@@ -520,7 +522,9 @@ def user_profile(request, course_key, user_id):
         query_params['num_pages'] = num_pages
 
         with function_trace("get_metadata_for_threads"):
-            user_info = cc.User.from_django_user(request.user).to_dict()
+            # The page also shows the profiled user, which is retrieved along with the requesting user.
+            cc.User.retrieve_all([user] if request.is_ajax() else [user, profiled_user])
+            user_info = user.to_dict()
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
         is_staff = has_permission(request.user, 'openclose_thread', course.id)
@@ -543,7 +547,7 @@ def user_profile(request, course_key, user_id):
                 course_discussion_settings = get_course_discussion_settings(course_key)
                 user_group_id = get_group_id_for_user(request.user, course_discussion_settings)
 
-            context = _create_base_discussion_view_context(request, course_key)
+            context = _create_base_discussion_view_context(request, course_key, user_info=user_info)
             context.update({
                 'django_user': django_user,
                 'django_user_roles': user_roles,
@@ -6,7 +6,8 @@ import ddt
 import mock
 from django.core.management import call_command
 from django.core.urlresolvers import reverse
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import translation
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 from pytz import UTC
@@ -34,7 +35,7 @@ from django_comment_common.utils import (
 )
 from edxmako import add_lookup
 from lms.djangoapps.teams.tests.factories import CourseTeamFactory, CourseTeamMembershipFactory
-from lms.lib.comment_client.utils import CommentClientMaintenanceError, perform_request
+from lms.lib.comment_client.utils import CommentClientMaintenanceError, get_session, map_concurrently, perform_request
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
@@ -1815,6 +1816,7 @@ class GroupModeratorPermissionsTestCase(ModuleStoreTestCase):
         })
 
 
+@ddt.ddt
 class ClientConfigurationTestCase(TestCase):
     """Simple test cases to ensure enabling/disabling the use of the comment service works as intended."""
 
@@ -1843,6 +1845,41 @@ class ClientConfigurationTestCase(TestCase):
         result = perform_request('GET', 'http://www.google.com')
         self.assertEqual(result, {})
 
+    @override_settings(COMMENTS_SERVICE_POOL_MAXSIZE=2, COMMENTS_SERVICE_CONNECT_TIMEOUT=1)
+    @patch('lms.lib.comment_client.utils._SESSION', None)
+    @patch('requests.Session.request')
+    def test_pooled_session(self, mock_request):
+        """Ensures that requests are made with the session of the process when connections are pooled."""
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {}
+        mock_request.return_value = response
+
+        session = get_session()
+        self.assertEqual(perform_request('GET', 'http://www.google.com'), {})
+        self.assertEqual(perform_request('GET', 'http://www.google.com'), {})
+        self.assertIs(get_session(), session)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args[1]['timeout'], (1, config.connection_timeout))
+
+    def test_unpooled_session(self):
+        """Ensures that there is no session when connections are not pooled."""
+        with override_settings(COMMENTS_SERVICE_POOL_MAXSIZE=0):
+            self.assertIsNone(get_session())
+
+    @ddt.data(0, 3)
+    def test_map_concurrently(self, pool_maxsize):
+        """Ensures that the results of concurrent calls are in order, and that the calls use the current language."""
+        with override_settings(COMMENTS_SERVICE_POOL_MAXSIZE=pool_maxsize), translation.override('eo'):
+            self.assertEqual(
+                map_concurrently(lambda item: (item, translation.get_language()), range(5)),
+                [(item, 'eo') for item in range(5)]
+            )
+
 
 def set_discussion_division_settings(
         course_key, enable_cohorts=False, always_divide_inline_discussions=False,
@@ -1,4 +1,5 @@
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -8,7 +9,8 @@ from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade, prefetch
+from .models import PersistentCourseGrade, bulk_prefetch, clear_bulk_prefetch, prefetch
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -75,6 +77,7 @@ class CourseGradeFactory(object):
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            chunk_size=None,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -84,6 +87,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        If chunk_size is given, students are graded in chunks of that size,
+        and the persisted grades, overrides and scores of each chunk are
+        bulk-loaded before any of its students is graded.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -94,9 +101,47 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+        if not chunk_size:
+            for user in users:
+                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                    yield self._iter_grade_result(user, course_data, force_update)
+            return
+
+        users = iter(users)
+        try:
+            while True:
+                user_chunk = list(islice(users, chunk_size))
+                if not user_chunk:
+                    break
+                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter.prefetch', tags=stats_tags):
+                    self._prefetch_chunk(user_chunk, course_data)
+                for user in user_chunk:
+                    with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                        yield self._iter_grade_result(user, course_data, force_update)
+                self._clear_prefetched_chunk(course_data)
+        finally:
+            self._clear_prefetched_chunk(course_data)
+
+    @staticmethod
+    def _prefetch_chunk(users, course_data):
+        """
+        Bulk-loads the grading inputs of all the given users in the course.
+        Failures are logged and left for the per-student reads to handle.
+        """
+        try:
+            bulk_prefetch(users, course_data.course_key)
+            SubsectionGradeFactory.prefetch_scores(users, course_data)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u'Grades: Failed to prefetch grades for course %s', course_data.course_key)
+
+    @staticmethod
+    def _clear_prefetched_chunk(course_data):
+        """
+        Clears the grading inputs bulk-loaded for a chunk of users, so that
+        they are neither kept in memory nor read once the chunk is graded.
+        """
+        clear_bulk_prefetch(course_data.course_key)
+        SubsectionGradeFactory.clear_prefetched_scores(course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
@@ -9,3 +9,11 @@ class DatabaseNotReadyError(IOError):
     the data we're trying to find.
     """
     pass
+
+
+class CoalescedRecalculationNotReadyError(IOError):
+    """
+    Subclass of IOError to indicate a grade recalculation coalesced into
+    a task has not yet been cached for it.
+    """
+    pass
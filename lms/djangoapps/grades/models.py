@@ -10,10 +10,12 @@ persisted, course grades are also immune to changes in course content.
 
 import json
 import logging
+import threading
 from base64 import b64encode
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from hashlib import sha1
 
+from django.conf import settings
 from django.db import models
 from django.utils.timezone import now
 from lazy import lazy
@@ -36,6 +38,9 @@ BLOCK_RECORD_LIST_VERSION = 1
 # grade calculation.
 BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'graded'])
 
+# Remove spaces from separators for more compact representation
+_BLOCK_RECORD_LIST_ENCODER = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+
 
 class BlockRecordList(tuple):
     """
@@ -79,19 +84,22 @@ class BlockRecordList(tuple):
         Return a JSON-serialized version of the list of block records, using a
         stable ordering.
         """
-        list_of_block_dicts = [block._asdict() for block in self]
-        for block_dict in list_of_block_dicts:
-            block_dict['locator'] = unicode(block_dict['locator'])  # BlockUsageLocator is not json-serializable
+        list_of_block_dicts = [
+            {
+                u'locator': unicode(block.locator),  # BlockUsageLocator is not json-serializable
+                u'weight': block.weight,
+                u'raw_possible': block.raw_possible,
+                u'graded': block.graded,
+            }
+            for block in self
+        ]
         data = {
             u'blocks': list_of_block_dicts,
             u'course_key': unicode(self.course_key),
             u'version': self.version,
         }
-        return json.dumps(
-            data,
-            separators=(',', ':'),  # Remove spaces from separators for more compact representation
-            sort_keys=True,
-        )
+        # The stored hashes are of this exact serialization, so it must not change.
+        return _BLOCK_RECORD_LIST_ENCODER.encode(data)
 
     @classmethod
     def from_json(cls, blockrecord_json):
@@ -120,6 +128,81 @@ class BlockRecordList(tuple):
         return cls(blocks, course_key)
 
 
+class _KnownVisibleBlocksCache(object):
+    """
+    Process-local, bounded LRU cache of the hashes of VisibleBlocks known to
+    be stored in the database, by course.
+
+    VisibleBlocks are never modified or deleted once stored, so entries are
+    never invalidated, only evicted.  This lets grading tasks handled by the
+    same worker skip the VisibleBlocks lookups for block lists already seen.
+    Only hashes read from the database are added, so that rows created in an
+    uncommitted transaction are never cached.  The cache is bounded by the
+    total number of hashes held; it is disabled when the bound is 0.
+    """
+    def __init__(self):
+        self._hashes_by_course = OrderedDict()
+        self._total_hashes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_hashes(self):
+        """
+        The maximum number of hashes this cache may hold.
+        """
+        return getattr(settings, 'GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES', 0)
+
+    def contains(self, course_key, hashed):
+        """
+        Returns whether the given VisibleBlocks hash is known to be stored.
+        """
+        if not self.max_hashes:
+            return False
+        with self._lock:
+            hashes = self._hashes_by_course.pop(course_key, None)
+            if hashes is None:
+                return False
+            # Re-insert to mark as most recently used
+            self._hashes_by_course[course_key] = hashes
+            return hashed in hashes
+
+    def add(self, course_key, hashes):
+        """
+        Adds the given stored VisibleBlocks hashes of the given course,
+        evicting least recently used courses as needed.
+        """
+        max_hashes = self.max_hashes
+        if not max_hashes or not hashes:
+            return
+        with self._lock:
+            course_hashes = self._hashes_by_course.pop(course_key, set())
+            self._total_hashes -= len(course_hashes)
+            course_hashes = course_hashes | set(hashes)
+            if len(course_hashes) > max_hashes:
+                return
+
+            while self._hashes_by_course and self._total_hashes + len(course_hashes) > max_hashes:
+                __, evicted_hashes = self._hashes_by_course.popitem(last=False)
+                self._total_hashes -= len(evicted_hashes)
+
+            self._hashes_by_course[course_key] = course_hashes
+            self._total_hashes += len(course_hashes)
+
+    def has_course(self, course_key):
+        """
+        Returns whether any hashes are cached for the given course.
+        """
+        return bool(self.max_hashes) and course_key in self._hashes_by_course
+
+    def clear(self):
+        """
+        Removes all cached hashes.
+        """
+        with self._lock:
+            self._hashes_by_course.clear()
+            self._total_hashes = 0
+
+
 class VisibleBlocks(models.Model):
     """
     A django model used to track the state of a set of visible blocks under a
@@ -135,6 +218,10 @@ class VisibleBlocks(models.Model):
 
     _CACHE_NAMESPACE = u"grades.models.VisibleBlocks"
 
+    # Hashes of VisibleBlocks known to be stored, shared by all the requests
+    # and tasks handled by this process.
+    known_hashes = _KnownVisibleBlocksCache()
+
     class Meta(object):
         app_label = "grades"
 
@@ -168,6 +255,14 @@ class VisibleBlocks(models.Model):
             prefetched = cls._initialize_cache(course_key)
         return prefetched
 
+    @classmethod
+    def is_known(cls, blocks):
+        """
+        Returns whether the given BlockRecordList is known, without a query,
+        to already be stored as a VisibleBlocks.
+        """
+        return cls.known_hashes.contains(blocks.course_key, blocks.hash_value)
+
     @classmethod
     def cached_get_or_create(cls, blocks):
         prefetched = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(blocks.course_key))
@@ -179,10 +274,14 @@ class VisibleBlocks(models.Model):
                 )
                 cls._update_cache(blocks.course_key, [model])
         else:
-            model, _ = cls.objects.get_or_create(
+            model, created = cls.objects.get_or_create(
                 hashed=blocks.hash_value,
                 defaults={u'blocks_json': blocks.json_value, u'course_id': blocks.course_key},
             )
+            if created:
+                cls._created_hashes().add(model.hashed)
+            else:
+                cls._add_known_hashes(blocks.course_key, [model.hashed])
         return model
 
     @classmethod
@@ -202,6 +301,7 @@ class VisibleBlocks(models.Model):
             for brl in block_record_lists
         ])
         cls._update_cache(course_key, created)
+        cls._created_hashes().update(visible_blocks.hashed for visible_blocks in created)
         return created
 
     @classmethod
@@ -211,8 +311,11 @@ class VisibleBlocks(models.Model):
         BlockRecordList objects for the given course_key, but
         only for those that aren't already created.
         """
+        unknown_brls = [brl for brl in block_record_lists if not cls.is_known(brl)]
+        if not unknown_brls:
+            return
         existent_records = cls.bulk_read(course_key)
-        non_existent_brls = {brl for brl in block_record_lists if brl.hash_value not in existent_records}
+        non_existent_brls = {brl for brl in unknown_brls if brl.hash_value not in existent_records}
         cls.bulk_create(course_key, non_existent_brls)
 
     @classmethod
@@ -224,8 +327,33 @@ class VisibleBlocks(models.Model):
         """
         prefetched = {record.hashed: record for record in cls.objects.filter(course_id=course_key)}
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched
+        cls._add_known_hashes(course_key, prefetched)
         return prefetched
 
+    @classmethod
+    def clear_prefetched(cls, course_key):
+        """
+        Clears the visible blocks read for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def _add_known_hashes(cls, course_key, hashes):
+        """
+        Adds the given hashes, read from the database, to the process-local
+        cache of known hashes, except for those created by this request or
+        task, whose transaction may yet be rolled back.
+        """
+        cls.known_hashes.add(course_key, set(hashes) - cls._created_hashes())
+
+    @classmethod
+    def _created_hashes(cls):
+        """
+        Returns the set of hashes of the VisibleBlocks created by this
+        request or task.
+        """
+        return get_cache(cls._CACHE_NAMESPACE).setdefault(u"created_hashes", set())
+
     @classmethod
     def _update_cache(cls, course_key, visible_blocks):
         """
@@ -296,6 +424,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    _CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -342,6 +472,27 @@ class PersistentSubsectionGrade(TimeStampedModel):
             usage_key=usage_key,
         )
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches all grades for the given users in the given course,
+        replacing any grades prefetched earlier for the course.
+        """
+        grades_by_user = {user.id: [] for user in users}
+        for record in cls.objects.select_related('visible_blocks', 'override').filter(
+                user_id__in=grades_by_user.keys(),
+                course_id=course_key,
+        ):
+            grades_by_user[record.user_id].append(record)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = grades_by_user
+
+    @classmethod
+    def clear_prefetched(cls, course_key):
+        """
+        Clears the grades prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
     @classmethod
     def bulk_read_grades(cls, user_id, course_key):
         """
@@ -351,6 +502,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
         """
+        prefetched_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_key), {})
+        if user_id in prefetched_grades:
+            return prefetched_grades[user_id]
+
         return cls.objects.select_related('visible_blocks', 'override').filter(
             user_id=user_id,
             course_id=course_key,
@@ -362,7 +517,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
         Wrapper for objects.update_or_create.
         """
         cls._prepare_params(params)
-        VisibleBlocks.cached_get_or_create(params['visible_blocks'])
+        if not VisibleBlocks.is_known(params['visible_blocks']):
+            VisibleBlocks.cached_get_or_create(params['visible_blocks'])
         cls._prepare_params_visible_blocks_id(params)
         cls._prepare_params_override(params)
 
@@ -380,6 +536,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
             grade.first_attempted = first_attempted
             grade.save()
 
+        cls._clear_prefetched_grades(user_id, usage_key.course_key)
         cls._emit_grade_calculated_event(grade)
         return grade
 
@@ -400,10 +557,22 @@ class PersistentSubsectionGrade(TimeStampedModel):
 
         grades = [PersistentSubsectionGrade(**params) for params in grade_params_iter]
         grades = cls.objects.bulk_create(grades)
+        cls._clear_prefetched_grades(user_id, course_key)
         for grade in grades:
             cls._emit_grade_calculated_event(grade)
         return grades
 
+    @classmethod
+    def _clear_prefetched_grades(cls, user_id, course_key):
+        """
+        Removes the user's prefetched grades, if any, since they are out of date.
+        """
+        get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_key), {}).pop(user_id, None)
+
+    @classmethod
+    def _cache_key(cls, course_id):
+        return u"subsection_grades_cache.{}".format(course_id)
+
     @classmethod
     def _prepare_params(cls, params):
         """
@@ -602,9 +771,36 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def bulk_prefetch(cls, course_key, users):
+        """
+        Prefetches the overrides of all the given users in the given course,
+        replacing any overrides bulk prefetched earlier for the course.
+        """
+        overrides_by_user = {user.id: {} for user in users}
+        for override in cls.objects.select_related('grade').filter(
+                grade__user_id__in=overrides_by_user.keys(),
+                grade__course_id=course_key,
+        ):
+            overrides_by_user[override.grade.user_id][override.grade.usage_key] = override
+        get_cache(cls._CACHE_NAMESPACE)[str(course_key)] = overrides_by_user
+
+    @classmethod
+    def clear_bulk_prefetched(cls, course_key):
+        """
+        Clears the overrides bulk prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(str(course_key), None)
+
+    @classmethod
+    def is_bulk_prefetched(cls, user_id, course_key):
+        return user_id in get_cache(cls._CACHE_NAMESPACE).get(str(course_key), {})
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
+        if prefetch_values is None:
+            prefetch_values = get_cache(cls._CACHE_NAMESPACE).get(str(usage_key.course_key), {}).get(user_id, None)
         if prefetch_values is not None:
             return prefetch_values.get(usage_key)
         try:
@@ -618,5 +814,30 @@ class PersistentSubsectionGradeOverride(models.Model):
 
 
 def prefetch(user, course_key):
-    PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
+    if not PersistentSubsectionGradeOverride.is_bulk_prefetched(user.id, course_key):
+        PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
+    if not VisibleBlocks.known_hashes.has_course(course_key):
+        # Otherwise, the visible blocks are mostly known to this process
+        # already, and the remainder is read only if needed.
+        VisibleBlocks.bulk_read(course_key)
+
+
+def bulk_prefetch(users, course_key):
+    """
+    Prefetches the persisted subsection grades and overrides of all the given
+    users in the course, so that grading each of them needs no further queries
+    for them.
+    """
+    PersistentSubsectionGrade.prefetch(course_key, users)
+    PersistentSubsectionGradeOverride.bulk_prefetch(course_key, users)
     VisibleBlocks.bulk_read(course_key)
+
+
+def clear_bulk_prefetch(course_key):
+    """
+    Clears the grades, overrides and visible blocks prefetched by
+    bulk_prefetch for the course.
+    """
+    PersistentSubsectionGrade.clear_prefetched(course_key)
+    PersistentSubsectionGradeOverride.clear_bulk_prefetched(course_key)
+    VisibleBlocks.clear_prefetched(course_key)
@@ -26,7 +26,7 @@ from ..constants import ScoreDatabaseTableEnum
 from ..course_grade_factory import CourseGradeFactory
 from .. import events
 from ..scores import weighted_score
-from ..tasks import RECALCULATE_GRADE_DELAY_SECONDS, recalculate_subsection_grade_v3
+from ..tasks import enqueue_recalculate_subsection_grade
 
 log = getLogger(__name__)
 
@@ -208,8 +208,8 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     enqueueing a subsection update operation to occur asynchronously.
     """
     events.grade_updated(**kwargs)
-    recalculate_subsection_grade_v3.apply_async(
-        kwargs=dict(
+    enqueue_recalculate_subsection_grade(
+        dict(
             user_id=kwargs['user_id'],
             anonymous_user_id=kwargs.get('anonymous_user_id'),
             course_id=kwargs['course_id'],
@@ -220,8 +220,7 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
             event_transaction_id=unicode(get_event_transaction_id()),
             event_transaction_type=unicode(get_event_transaction_type()),
             score_db_table=kwargs['score_db_table'],
-        ),
-        countdown=RECALCULATE_GRADE_DELAY_SECONDS,
+        )
     )
 
 
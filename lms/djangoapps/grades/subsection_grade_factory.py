@@ -8,8 +8,11 @@ from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_g
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
-from student.models import anonymous_id_for_user
+from request_cache import get_cache
+from student.models import anonymous_id_for_user, anonymous_ids_for_users
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
 from .course_data import CourseData
 from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSubsectionGrade
@@ -21,6 +24,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u"grades.subsection_grade_factory.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -94,12 +99,72 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_scores(cls, users, course_data):
+        """
+        Prefetches the CSM and Submissions API scores of all the given users
+        in the course, with one query for each data store.  Scores prefetched
+        for an earlier group of users in the course are discarded.
+        """
+        course_key = course_data.course_key
+        scorable_locations = [block_key for block_key in course_data.collected_structure if possibly_scored(block_key)]
+        csm_scores = ScoresClient.bulk_create_for_locations(course_key, [user.id for user in users], scorable_locations)
+        submissions_scores = cls._bulk_get_submissions_scores(users, course_key)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = {
+            user.id: (csm_scores[user.id], submissions_scores[user.id]) for user in users
+        }
+
+    @classmethod
+    def clear_prefetched_scores(cls, course_key):
+        """
+        Discards any scores prefetched for users in the course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def _bulk_get_submissions_scores(cls, users, course_key):
+        """
+        Returns a dict of {user_id: scores} in the format returned by
+        submissions_api.get_scores, for each of the given users.
+
+        The Submissions API only exposes a per-student call, so its models
+        are queried directly here.
+        """
+        user_ids_by_anonymous_id = {
+            anonymous_id: user_id for user_id, anonymous_id in anonymous_ids_for_users(users, course_key).iteritems()
+        }
+        scores = {user.id: {} for user in users}
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=str(course_key),
+            student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+        ).select_related('latest', 'latest__submission', 'student_item')
+        for summary in score_summaries:
+            if not summary.latest.is_hidden():
+                user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+                scores[user_id][summary.student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+        return scores
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_scores_cache.{}".format(course_key)
+
+    def _get_prefetched_scores(self):
+        """
+        Returns the (csm_scores, submissions_scores) prefetched for
+        this student, if any.
+        """
+        prefetched = get_cache(self._CACHE_NAMESPACE).get(self._cache_key(self.course_data.course_key), {})
+        return prefetched.get(self.student.id)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = self._get_prefetched_scores()
+        if prefetched_scores:
+            return prefetched_scores[0]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -109,6 +174,9 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched_scores = self._get_prefetched_scores()
+        if prefetched_scores:
+            return prefetched_scores[1]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
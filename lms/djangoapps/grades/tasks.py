@@ -2,7 +2,9 @@
 This module contains tasks for asynchronous execution of grade updates.
 """
 
+from collections import OrderedDict
 from logging import getLogger
+from uuid import uuid4
 
 import six
 from celery import task
@@ -11,13 +13,14 @@ from celery_utils.persist_on_failure import PersistOnFailureTask
 from courseware.model_data import get_score
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db.utils import DatabaseError
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.models import ComputeGradesSetting
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import CourseLocator
-from openedx.core.djangoapps.monitoring_utils import set_custom_metric, set_custom_metrics_for_course_key
+from openedx.core.djangoapps.monitoring_utils import increment, set_custom_metric, set_custom_metrics_for_course_key
 from student.models import CourseEnrollment
 from submissions import api as sub_api
 from track.event_transaction_utils import set_event_transaction_id, set_event_transaction_type
@@ -27,7 +30,7 @@ from xmodule.modulestore.django import modulestore
 from .config.waffle import DISABLE_REGRADE_ON_POLICY_CHANGE, waffle
 from .constants import ScoreDatabaseTableEnum
 from .course_grade_factory import CourseGradeFactory
-from .exceptions import DatabaseNotReadyError
+from .exceptions import CoalescedRecalculationNotReadyError, DatabaseNotReadyError
 from .services import GradesService
 from .signals.signals import SUBSECTION_SCORE_CHANGED
 from .subsection_grade_factory import SubsectionGradeFactory
@@ -40,11 +43,19 @@ KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on r
     DatabaseError,
     ValidationError,
     DatabaseNotReadyError,
+    CoalescedRecalculationNotReadyError,
 )
 RECALCULATE_GRADE_DELAY_SECONDS = 2  # to prevent excessive _has_db_updated failures. See TNL-6424.
 RETRY_DELAY_SECONDS = 30
 SUBSECTION_GRADE_TIMEOUT_SECONDS = 300
 
+# How long the kwargs of coalesced subsection grade recalculations are kept for
+# the task they were coalesced into, which may wait in a long queue.
+COALESCED_RECALCULATIONS_TIMEOUT_SECONDS = 24 * 60 * 60
+# Added to the count of the recalculations coalesced into a task when the task
+# claims them, so that recalculations counted afterwards are enqueued separately.
+_COALESCE_CLAIMED_OFFSET = 10 ** 9
+
 
 class _BaseTask(PersistOnFailureTask, LoggedTask):  # pylint: disable=abstract-method
     """
@@ -117,7 +128,9 @@ def compute_grades_for_course(course_key, offset, batch_size, **kwargs):  # pyli
     course_key = CourseKey.from_string(course_key)
     enrollments = CourseEnrollment.objects.filter(course_id=course_key).order_by('created')
     student_iter = (enrollment.user for enrollment in enrollments[offset:offset + batch_size])
-    for result in CourseGradeFactory().iter(users=student_iter, course_key=course_key, force_update=True):
+    for result in CourseGradeFactory().iter(
+            users=student_iter, course_key=course_key, force_update=True, chunk_size=batch_size,
+    ):
         if result.error is not None:
             raise result.error
 
@@ -138,6 +151,131 @@ def recalculate_subsection_grade_v3(self, **kwargs):
     _recalculate_subsection_grade(self, **kwargs)
 
 
+def enqueue_recalculate_subsection_grade(task_kwargs):
+    """
+    Enqueues a recalculate_subsection_grade_v3 task with the given kwargs.
+
+    If a task recalculating the same user's grades in the same course is
+    already pending, the recalculation is instead coalesced into that task,
+    which performs all the recalculations coalesced into it at once.  Tasks
+    accept new recalculations for RECALCULATE_GRADES_COALESCE_SECONDS after
+    they are enqueued, or until they start running if sooner.
+
+    Coalescing requires the django cache to be shared by the processes that
+    enqueue and run the tasks.
+    """
+    if settings.RECALCULATE_GRADES_COALESCE_SECONDS:
+        pending_key = _get_coalesce_pending_key(task_kwargs)
+        if _coalesce_into_pending_task(pending_key, task_kwargs):
+            increment('grades.recalculate_subsection_grade.coalesced')
+            return
+
+        token = uuid4().hex
+        cache.set(_get_coalesced_count_key(token), 1, COALESCED_RECALCULATIONS_TIMEOUT_SECONDS)
+        if cache.add(pending_key, token, settings.RECALCULATE_GRADES_COALESCE_SECONDS):
+            task_kwargs = dict(task_kwargs, coalesce_key=pending_key, coalesce_token=token)
+
+    recalculate_subsection_grade_v3.apply_async(
+        kwargs=task_kwargs,
+        countdown=RECALCULATE_GRADE_DELAY_SECONDS,
+    )
+
+
+def _get_coalesce_pending_key(task_kwargs):
+    """
+    Returns the cache key of the pending task into which the recalculation
+    with the given kwargs can be coalesced.
+
+    Recalculations are coalesced per user and course, from the kwargs alone,
+    so that enqueueing them doesn't read the course's block structure.  The
+    task finds the subsections of the blocks it recalculates.
+    """
+    return u'grades.recalculate_subsection_grade.pending.{}.{}'.format(
+        task_kwargs['user_id'],
+        task_kwargs['course_id'],
+    )
+
+
+def _coalesce_into_pending_task(pending_key, task_kwargs):
+    """
+    Adds the recalculation with the given kwargs to the pending task with
+    the given cache key, if there is one that hasn't claimed its coalesced
+    recalculations yet.  Returns whether the recalculation was added.
+    """
+    token = cache.get(pending_key)
+    if token is None:
+        return False
+    try:
+        index = cache.incr(_get_coalesced_count_key(token))
+    except ValueError:
+        return False
+    if index > _COALESCE_CLAIMED_OFFSET:
+        return False
+    cache.set(_get_coalesced_kwargs_key(token, index), task_kwargs, COALESCED_RECALCULATIONS_TIMEOUT_SECONDS)
+    return True
+
+
+def _claim_coalesced_recalculations(kwargs, retries):
+    """
+    Returns the kwargs of all the recalculations the task with the given
+    kwargs performs: its own and those coalesced into it.
+
+    On the first attempt, the task claims the recalculations coalesced into
+    it so far, and records their number in its kwargs for any retries.
+    Later recalculations are enqueued in new tasks.
+
+    A recalculation is counted before its kwargs are cached, so the first
+    attempt is retried if some are missing.  Those still missing on a retry
+    are skipped: the process coalescing them died in between.
+    """
+    token = kwargs.get('coalesce_token')
+    if token is None:
+        return [kwargs]
+
+    if 'coalesced_count' not in kwargs:
+        if cache.get(kwargs['coalesce_key']) == token:
+            cache.delete(kwargs['coalesce_key'])
+        try:
+            kwargs['coalesced_count'] = (
+                cache.incr(_get_coalesced_count_key(token), _COALESCE_CLAIMED_OFFSET) - _COALESCE_CLAIMED_OFFSET
+            )
+        except ValueError:
+            log.warning(u'Grades: coalesced recalculations expired before task ran. Kwargs: %s', kwargs)
+            kwargs['coalesced_count'] = 1
+
+    # The task's own recalculation is the first; the kwargs of
+    # any others are cached as they're coalesced into the task.
+    keys = [_get_coalesced_kwargs_key(token, index) for index in six.moves.range(2, kwargs['coalesced_count'] + 1)]
+    coalesced_kwargs = cache.get_many(keys)
+    if len(coalesced_kwargs) < len(keys):
+        if retries == 0:
+            # A recalculation was counted but its kwargs are not cached yet.
+            raise CoalescedRecalculationNotReadyError
+        log.warning(
+            u'Grades: skipping %d coalesced recalculations whose kwargs were never cached. Kwargs: %s',
+            len(keys) - len(coalesced_kwargs),
+            kwargs,
+        )
+    set_custom_metric('coalesced_count', kwargs['coalesced_count'])
+    return [kwargs] + [coalesced_kwargs[key] for key in keys if key in coalesced_kwargs]
+
+
+def _get_coalesced_count_key(token):
+    """
+    Returns the cache key of the count of the recalculations coalesced into
+    the task with the given token.
+    """
+    return u'grades.recalculate_subsection_grade.count.{}'.format(token)
+
+
+def _get_coalesced_kwargs_key(token, index):
+    """
+    Returns the cache key of the kwargs of the recalculation with the given
+    index coalesced into the task with the given token.
+    """
+    return u'grades.recalculate_subsection_grade.kwargs.{}.{}'.format(token, index)
+
+
 def _recalculate_subsection_grade(self, **kwargs):
     """
     Updates a saved subsection grade.
@@ -160,6 +298,16 @@ def _recalculate_subsection_grade(self, **kwargs):
             event at the root of the current event transaction.
         score_db_table (ScoreDatabaseTableEnum): database table that houses
             the changed score. Used in conjunction with expected_modified_time.
+        coalesce_key (string, OPTIONAL): cache key under which the task is
+            pending, accepting the recalculations coalesced into it.
+        coalesce_token (string, OPTIONAL): identifies the recalculations
+            coalesced into the task.
+        coalesced_count (int, OPTIONAL): number of recalculations the task
+            performs, once claimed.
+
+    Coalesced recalculations are performed at once: the grade of each
+    subsection is updated only if higher if all the recalculations of its
+    blocks are, and as if a score was deleted if any was.
     """
     try:
         course_key = CourseLocator.from_string(kwargs['course_id'])
@@ -180,18 +328,13 @@ def _recalculate_subsection_grade(self, **kwargs):
         # created. This race condition occurs if the transaction in the task
         # creator's process hasn't committed before the task initiates in the worker
         # process.
-        has_database_updated = _has_db_updated_with_new_score(self, scored_block_usage_key, **kwargs)
-
-        if not has_database_updated:
-            raise DatabaseNotReadyError
+        all_kwargs = _claim_coalesced_recalculations(kwargs, self.request.retries)
+        for score_kwargs in _latest_score_changes(all_kwargs):
+            score_usage_key = UsageKey.from_string(score_kwargs['usage_id']).replace(course_key=course_key)
+            if not _has_db_updated_with_new_score(self, score_usage_key, **score_kwargs):
+                raise DatabaseNotReadyError
 
-        _update_subsection_grades(
-            course_key,
-            scored_block_usage_key,
-            kwargs['only_if_higher'],
-            kwargs['user_id'],
-            kwargs['score_deleted'],
-        )
+        _update_subsection_grades(course_key, kwargs['user_id'], all_kwargs)
     except Exception as exc:   # pylint: disable=broad-except
         if not isinstance(exc, KNOWN_RETRY_ERRORS):
             log.info("tnl-6244 grades unexpected failure: {}. task id: {}. kwargs={}".format(
@@ -202,6 +345,23 @@ def _recalculate_subsection_grade(self, **kwargs):
         raise self.retry(kwargs=kwargs, exc=exc)
 
 
+def _latest_score_changes(all_kwargs):
+    """
+    Returns the kwargs of the latest of the given recalculations for each
+    changed score.  The database is up to date with all the changes to a
+    score once it is with the latest.
+    """
+    latest_kwargs = OrderedDict()
+    for recalculation_kwargs in all_kwargs:
+        score_key = (recalculation_kwargs['usage_id'], recalculation_kwargs['score_db_table'])
+        previous_kwargs = latest_kwargs.get(score_key)
+        if previous_kwargs is None or (
+                recalculation_kwargs['expected_modified_time'] >= previous_kwargs['expected_modified_time']
+        ):
+            latest_kwargs[score_key] = recalculation_kwargs
+    return latest_kwargs.values()
+
+
 def _has_db_updated_with_new_score(self, scored_block_usage_key, **kwargs):
     """
     Returns whether the database has been updated with the
@@ -250,32 +410,41 @@ def _has_db_updated_with_new_score(self, scored_block_usage_key, **kwargs):
     return db_is_updated
 
 
-def _update_subsection_grades(course_key, scored_block_usage_key, only_if_higher, user_id, score_deleted):
+def _update_subsection_grades(course_key, user_id, all_kwargs):
     """
     A helper function to update subsection grades in the database
-    for each subsection containing the given block, and to signal
-    that those subsection grades were updated.
+    for each subsection containing the scored blocks of the given
+    recalculations, and to signal that those subsection grades were
+    updated.
     """
     student = User.objects.get(id=user_id)
     store = modulestore()
     with store.bulk_operations(course_key):
         course_structure = get_course_blocks(student, store.make_course_usage_key(course_key))
-        subsections_to_update = course_structure.get_transformer_block_field(
-            scored_block_usage_key,
-            GradesTransformer,
-            'subsections',
-            set(),
-        )
+
+        # The recalculations of the blocks in each subsection to update
+        subsections_to_update = OrderedDict()
+        for recalculation_kwargs in all_kwargs:
+            scored_block_usage_key = UsageKey.from_string(recalculation_kwargs['usage_id']).replace(
+                course_key=course_key
+            )
+            for subsection_usage_key in course_structure.get_transformer_block_field(
+                    scored_block_usage_key,
+                    GradesTransformer,
+                    'subsections',
+                    set(),
+            ):
+                subsections_to_update.setdefault(subsection_usage_key, []).append(recalculation_kwargs)
 
         course = store.get_course(course_key, depth=0)
         subsection_grade_factory = SubsectionGradeFactory(student, course, course_structure)
 
-        for subsection_usage_key in subsections_to_update:
+        for subsection_usage_key, recalculations in subsections_to_update.iteritems():
             if subsection_usage_key in course_structure:
                 subsection_grade = subsection_grade_factory.update(
                     course_structure[subsection_usage_key],
-                    only_if_higher,
-                    score_deleted
+                    all(recalculation_kwargs['only_if_higher'] for recalculation_kwargs in recalculations),
+                    any(recalculation_kwargs['score_deleted'] for recalculation_kwargs in recalculations),
                 )
                 SUBSECTION_SCORE_CHANGED.send(
                     sender=None,
@@ -7,6 +7,9 @@ from django.conf import settings
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from mock import patch
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from openedx.core.djangolib.testing.utils import get_mock_request
+from request_cache import get_cache
+from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -14,9 +17,11 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentSubsectionGrade, PersistentSubsectionGradeOverride, bulk_prefetch
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
+from ..subsection_grade_factory import SubsectionGradeFactory
 from .base import GradeTestBase
-from .utils import mock_get_score
+from .utils import answer_problem, mock_get_score
 
 
 @ddt.ddt
@@ -171,6 +176,57 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    @ddt.data(1, 2)
+    def test_iter_chunked(self, chunk_size):
+        other_request = get_mock_request(UserFactory())
+        CourseEnrollment.enroll(other_request.user, self.course.id)
+        answer_problem(self.course, self.request, self.problem, score=1, max_value=1)
+        answer_problem(self.course, other_request, self.problem2, score=1, max_value=2)
+        users = [self.request.user, other_request.user]
+
+        expected_percents = {
+            result.student: result.course_grade.percent
+            for result in CourseGradeFactory().iter(users, self.course, force_update=True)
+        }
+        self.assertTrue(all(expected_percents.values()))
+
+        with patch(
+            'lms.djangoapps.grades.course_grade_factory.bulk_prefetch', wraps=bulk_prefetch
+        ) as mock_bulk_prefetch:
+            chunked_percents = {
+                result.student: result.course_grade.percent
+                for result in CourseGradeFactory().iter(users, self.course, force_update=True, chunk_size=chunk_size)
+            }
+        self.assertEqual(chunked_percents, expected_percents)
+        self.assertEqual(mock_bulk_prefetch.call_count, len(users) / chunk_size)
+
+    def test_iter_chunked_clears_prefetched(self):
+        # pylint: disable=protected-access
+        other_user = UserFactory()
+        CourseEnrollment.enroll(other_user, self.course.id)
+        users = [self.request.user, other_user]
+
+        def prefetched_grades():
+            """ Returns the subsection grades prefetched for the course, by user id """
+            return get_cache(PersistentSubsectionGrade._CACHE_NAMESPACE).get(
+                PersistentSubsectionGrade._cache_key(self.course.id)
+            )
+
+        results = CourseGradeFactory().iter(users, self.course, chunk_size=1)
+        next(results)
+        self.assertEqual(prefetched_grades().keys(), [self.request.user.id])
+        next(results)
+        self.assertEqual(prefetched_grades().keys(), [other_user.id])
+        self.assertEqual(list(results), [])
+
+        self.assertIsNone(prefetched_grades())
+        self.assertIsNone(
+            get_cache(PersistentSubsectionGradeOverride._CACHE_NAMESPACE).get(str(self.course.id))
+        )
+        self.assertIsNone(
+            get_cache(SubsectionGradeFactory._CACHE_NAMESPACE).get(SubsectionGradeFactory._cache_key(self.course.id))
+        )
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
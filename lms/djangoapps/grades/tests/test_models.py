@@ -10,7 +10,7 @@ from hashlib import sha1
 import ddt
 import pytz
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 from mock import patch
@@ -25,6 +25,7 @@ from lms.djangoapps.grades.models import (
     PersistentSubsectionGradeOverride,
     VisibleBlocks
 )
+from request_cache import clear_cache
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 
 
@@ -187,6 +188,29 @@ class VisibleBlocksTest(GradesModelTestCase):
         with self.assertRaises(AttributeError):
             visible_blocks.blocks = expected_blocks
 
+    @override_settings(GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES=10)
+    def test_known_hashes(self):
+        """
+        Ensures that stored visible blocks read by one request are known to
+        later requests without queries, but that those created by a request
+        are not.
+        """
+        self.addCleanup(VisibleBlocks.known_hashes.clear)
+        created_blocks = BlockRecordList.from_list([self.record_a], self.course_key)
+        VisibleBlocks.bulk_get_or_create([created_blocks], self.course_key)
+        VisibleBlocks.bulk_read(self.course_key)
+        self.assertFalse(VisibleBlocks.is_known(created_blocks))
+
+        clear_cache(VisibleBlocks._CACHE_NAMESPACE)  # pylint: disable=protected-access
+        VisibleBlocks.bulk_read(self.course_key)
+        self.assertTrue(VisibleBlocks.is_known(created_blocks))
+
+        clear_cache(VisibleBlocks._CACHE_NAMESPACE)  # pylint: disable=protected-access
+        with self.assertNumQueries(0):
+            VisibleBlocks.bulk_get_or_create(
+                [BlockRecordList.from_list([self.record_a], self.course_key)], self.course_key
+            )
+
 
 @ddt.ddt
 class PersistentSubsectionGradeTest(GradesModelTestCase):
@@ -11,9 +11,12 @@ import ddt
 import pytz
 import six
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.db.utils import IntegrityError
+from django.test.utils import override_settings
 from mock import MagicMock, patch
 
+from lms.djangoapps.grades import tasks
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
@@ -144,6 +147,65 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
             PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
             mock_task_apply.assert_called_once_with(countdown=RECALCULATE_GRADE_DELAY_SECONDS, kwargs=local_task_args)
 
+    @override_settings(RECALCULATE_GRADES_COALESCE_SECONDS=60)
+    @patch('lms.djangoapps.grades.tasks.cache', LocMemCache('grades_tasks_test', {}))
+    @patch('lms.djangoapps.grades.tasks._update_subsection_grades')
+    def test_coalesced_recalculations(self, mock_update):
+        """
+        Ensures that recalculations of the same user's grades in a course
+        are coalesced into the pending task, until it runs.
+        """
+        self.set_up_course()
+        send_args = self.problem_weighted_score_changed_kwargs
+        send_args['only_if_higher'] = True
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **dict(send_args, only_if_higher=False))
+            self.assertEquals(mock_task_apply.call_count, 1)
+            task_kwargs = mock_task_apply.call_args[1]['kwargs']
+
+            with self.mock_csm_get_score(MagicMock(modified=self.frozen_now_datetime)):
+                recalculate_subsection_grade_v3.apply(kwargs=task_kwargs)
+            self.assertEquals(mock_update.call_count, 1)
+            course_key, user_id, all_kwargs = mock_update.call_args[0]
+            self.assertEquals((course_key, user_id), (self.course.id, self.user.id))
+            self.assertEquals([kwargs['only_if_higher'] for kwargs in all_kwargs], [True, False])
+
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
+            self.assertEquals(mock_task_apply.call_count, 2)
+
+    @override_settings(RECALCULATE_GRADES_COALESCE_SECONDS=60)
+    @patch('lms.djangoapps.grades.tasks.cache', LocMemCache('grades_tasks_test_missing', {}))
+    @patch('lms.djangoapps.grades.tasks._update_subsection_grades')
+    def test_coalesced_recalculation_never_cached(self, mock_update):
+        """
+        Ensures that a recalculation counted but never cached for the
+        pending task, because its process died in between, is skipped
+        once the task retried, and the others are performed.
+        """
+        self.set_up_course()
+        send_args = self.problem_weighted_score_changed_kwargs
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **dict(send_args, only_if_higher=False))
+            task_kwargs = mock_task_apply.call_args[1]['kwargs']
+            # A process counts a recalculation, and dies before caching its kwargs.
+            count_key = tasks._get_coalesced_count_key(task_kwargs['coalesce_token'])  # pylint: disable=protected-access
+            tasks.cache.incr(count_key)
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **dict(send_args, only_if_higher=True))
+            self.assertEquals(mock_task_apply.call_count, 1)
+
+            with self.mock_csm_get_score(MagicMock(modified=self.frozen_now_datetime)):
+                recalculate_subsection_grade_v3.apply(kwargs=task_kwargs)
+            self.assertEquals(mock_update.call_count, 1)
+            all_kwargs = mock_update.call_args[0][2]
+            self.assertEquals([kwargs['only_if_higher'] for kwargs in all_kwargs], [False, True])
+
     @patch('lms.djangoapps.grades.signals.signals.SUBSECTION_SCORE_CHANGED.send')
     def test_triggers_subsection_score_signal(self, mock_subsection_signal):
         """
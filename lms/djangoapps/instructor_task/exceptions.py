@@ -16,3 +16,8 @@ class UpdateProblemModuleStateError(Exception):
 class DuplicateTaskException(Exception):
     """Exception indicating that a task already exists or has already completed."""
     pass
+
+
+class GradeReportShardMissingError(Exception):
+    """Exception indicating that the rows of a shard of a grade report were not stored."""
+    pass
@@ -17,12 +17,14 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+import tempfile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -181,9 +183,8 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Large reports can be built up incrementally with a `ReportFile`
+    (see `open_report_file`), rather than passing in the whole dataset.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -274,6 +275,31 @@ class DjangoStorageReportStore(ReportStore):
         output_buffer.seek(0)
         self.store(course_id, filename, output_buffer)
 
+    def open(self, course_id, filename):
+        """
+        Return a file object for reading the stored file `filename`.
+        """
+        return self.storage.open(self.path_to(course_id, filename))
+
+    def exists(self, course_id, filename):
+        """
+        Return whether the file `filename` has been stored for `course_id`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the stored file `filename`.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
+
+    def open_report_file(self, course_id, filename):
+        """
+        Return a new, empty `ReportFile` that will be stored in this report
+        store as `filename` once complete.
+        """
+        return ReportFile(self, course_id, filename)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples.
@@ -308,3 +334,56 @@ class DjangoStorageReportStore(ReportStore):
         """
         hashed_course_id = hashlib.sha1(course_id.to_deprecated_string()).hexdigest()
         return os.path.join(hashed_course_id, filename)
+
+
+class ReportFile(object):
+    """
+    A CSV report that can be appended to a batch of rows at a time.
+
+    Rows are written to a local temporary file as they are added, so memory
+    use depends on the size of each batch rather than the size of the report.
+    Nothing is uploaded to the report store until `store` is called.
+    """
+    def __init__(self, report_store, course_id, filename):
+        self.report_store = report_store
+        self.course_id = course_id
+        self.filename = filename
+        self.num_rows = 0
+        self._file = tempfile.TemporaryFile()
+        self._csvwriter = csv.writer(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append_rows(self, rows):
+        """
+        Write the given rows (each row is an iterable of strings) to the end
+        of this report.
+        """
+        for row in self.report_store._get_utf8_encoded_rows(rows):  # pylint: disable=protected-access
+            self._csvwriter.writerow(row)
+            self.num_rows += 1
+
+    def append_file(self, csv_file):
+        """
+        Copy the contents of `csv_file`, a file object of utf-8 encoded CSV
+        rows, to the end of this report.  `num_rows` is not updated.
+        """
+        shutil.copyfileobj(csv_file, self._file)
+
+    def store(self):
+        """
+        Upload the rows written so far to the report store.
+        """
+        self._file.flush()
+        self._file.seek(0)
+        self.report_store.store(self.course_id, self.filename, File(self._file))
+
+    def close(self):
+        """
+        Discard the local copy of this report.
+        """
+        self._file.close()
@@ -350,6 +350,35 @@ def queue_subtasks_for_query(
     return progress
 
 
+def queue_final_subtask(entry_id, final_subtask_id, final_subtask):
+    """
+    Queues `final_subtask` once all other subtasks of the InstructorTask have completed.
+
+    This is meant to be called by each of the other subtasks as they finish, after they
+    have called update_subtask_status().  The final subtask (for example, one that merges
+    the results of the others) must have been included, with the id `final_subtask_id`,
+    in the subtask ids passed to initialize_subtask_info(), so that the InstructorTask is
+    not marked as complete until it has run.
+
+    Returns true if the final subtask was queued by this call.  Only one caller will
+    queue it, even if several subtasks complete at the same time.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_status_info = json.loads(entry.subtasks)['status']
+    for subtask_id, subtask_status in subtask_status_info.iteritems():
+        if subtask_id != final_subtask_id and subtask_status['state'] not in READY_STATES:
+            return False
+
+    # cache.add fails if the key already exists
+    key = "subtask-queued-{}".format(final_subtask_id)
+    if not cache.add(key, 'true', SUBTASK_LOCK_EXPIRE):
+        return False
+
+    TASK_LOG.info("Queuing final subtask %s for instructor task %d", final_subtask_id, entry_id)
+    final_subtask.apply_async()
+    return True
+
+
 def _acquire_subtask_lock(task_id):
     """
     Mark the specified task_id as being in progress.
@@ -493,6 +522,23 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
         _release_subtask_lock(current_task_id)
 
 
+def checkpoint_subtask_status(entry_id, current_task_id, new_subtask_status):
+    """
+    Record the progress of a subtask that is still running in the parent InstructorTask object.
+
+    The status of the subtask is updated without changing its state, so the counts of the parent
+    task are not changed.  Unlike update_subtask_status(), the lock on the subtask is kept, and the
+    update is not retried: a failure to record the progress is only logged, since the final status
+    of the subtask is recorded by update_subtask_status() when it completes.
+    """
+    try:
+        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+    except DatabaseError:
+        TASK_LOG.warning("Failed to checkpoint status for subtask %s of instructor task %d with status %s",
+                         current_task_id, entry_id, new_subtask_status)
+        dog_stats_api.increment('instructor_task.subtask.failed_checkpoint')
+
+
 @transaction.atomic
 def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     """
@@ -19,14 +19,26 @@ a problem URL and optionally a student.  These are used to set up the initial va
 of the query for traversing StudentModule objects.
 
 """
+import json
 import logging
+import traceback
 from functools import partial
 
 from celery import task
+from celery.states import FAILURE, READY_STATES, SUCCESS
 from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_final_subtask,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -183,10 +195,152 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    if GradeReportSetting.current().enabled:
+        task_fn = partial(
+            CourseGradeReport.queue_shards,
+            partial(_create_grades_csv_shard_subtask, entry_id, xmodule_instance_args, action_name),
+            partial(_create_grades_csv_merge_subtask, entry_id, xmodule_instance_args, action_name),
+            partial(_create_grades_csv_timeout_subtask, entry_id, xmodule_instance_args, action_name),
+            xmodule_instance_args,
+        )
+    else:
+        task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+def _create_grades_csv_shard_subtask(entry_id, xmodule_instance_args, action_name, shard, initial_subtask_status):
+    """Creates a subtask to grade the users in one shard of a grade report."""
+    return calculate_grades_csv_shard.subtask(
+        (entry_id, xmodule_instance_args, action_name, shard, initial_subtask_status.to_dict()),
+        task_id=initial_subtask_status.task_id,
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+def _create_grades_csv_merge_subtask(entry_id, xmodule_instance_args, action_name, num_shards, initial_subtask_status):
+    """Creates a subtask to merge the shards of a grade report."""
+    return merge_grades_csv_shards.subtask(
+        (entry_id, xmodule_instance_args, action_name, num_shards, initial_subtask_status.to_dict()),
+        task_id=initial_subtask_status.task_id,
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+def _create_grades_csv_timeout_subtask(entry_id, xmodule_instance_args, action_name, shards_by_subtask_id):
+    """
+    Creates a subtask to fail the shards of a grade report which are still incomplete
+    after GRADE_REPORT_SHARDS_TIMEOUT seconds.
+    """
+    return fail_stalled_grades_csv_shards.subtask(
+        (entry_id, xmodule_instance_args, action_name, shards_by_subtask_id),
+        countdown=settings.GRADE_REPORT_SHARDS_TIMEOUT,
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, action_name, shard, subtask_status_dict):
+    """
+    Grade the users in one shard of a grade report queued by `calculate_grades_csv`,
+    and queue the merge of all shards if this is the last one to complete.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    try:
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+    except DuplicateTaskException:
+        # A redelivered shard whose first run completed, but stopped before queuing
+        # the merge, queues it now.
+        _queue_grades_csv_merge(entry_id, xmodule_instance_args, action_name, shard)
+        raise
+
+    try:
+        num_succeeded, num_failed = CourseGradeReport.generate_shard(
+            xmodule_instance_args, entry_id, action_name, shard
+        )
+    except Exception:
+        TASK_LOG.exception(u"Grade report shard %s of InstructorTask %s: failed unexpectedly!", shard, entry_id)
+        # None of the shard's users are in the report.
+        subtask_status.increment(failed=shard.get('num_users', 0), state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        _queue_grades_csv_merge(entry_id, xmodule_instance_args, action_name, shard)
+        raise
+
+    subtask_status.increment(succeeded=num_succeeded, failed=num_failed, state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    _queue_grades_csv_merge(entry_id, xmodule_instance_args, action_name, shard)
+    return subtask_status.to_dict()
+
+
+def _queue_grades_csv_merge(entry_id, xmodule_instance_args, action_name, shard):
+    """Queues the merge of a grade report's shards, if they are all complete."""
+    merge_subtask_status = SubtaskStatus.create(shard['merge_subtask_id'])
+    queue_final_subtask(
+        entry_id,
+        shard['merge_subtask_id'],
+        _create_grades_csv_merge_subtask(
+            entry_id, xmodule_instance_args, action_name, shard['num_shards'], merge_subtask_status
+        ),
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def fail_stalled_grades_csv_shards(entry_id, xmodule_instance_args, action_name, shards_by_subtask_id):
+    """
+    Fail the shards of a grade report queued by `calculate_grades_csv` which are still
+    incomplete, e.g. because their worker was killed, and queue the merge, which then
+    fails the report since their rows are missing.
+
+    A stalled shard which completes afterwards updates its status again, but its
+    users stay counted as failed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_status_info = json.loads(entry.subtasks)['status']
+    merge_shard = next(shards_by_subtask_id.itervalues())
+    if subtask_status_info[merge_shard['merge_subtask_id']]['state'] in READY_STATES:
+        return
+
+    for subtask_id, shard in shards_by_subtask_id.iteritems():
+        subtask_status = SubtaskStatus.from_dict(subtask_status_info[subtask_id])
+        if subtask_status.state not in READY_STATES:
+            TASK_LOG.warning(
+                u"Grade report shard %s of InstructorTask %s: did not complete in time", shard, entry_id
+            )
+            subtask_status.increment(failed=shard['num_users'], state=FAILURE)
+            update_subtask_status(entry_id, subtask_id, subtask_status)
+    _queue_grades_csv_merge(entry_id, xmodule_instance_args, action_name, merge_shard)
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grades_csv_shards(entry_id, xmodule_instance_args, action_name, num_shards, subtask_status_dict):
+    """
+    Concatenate the shards of a grade report queued by `calculate_grades_csv`
+    into the final report.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        CourseGradeReport.merge_shards(xmodule_instance_args, entry_id, action_name, num_shards)
+    except Exception as exc:
+        TASK_LOG.exception(u"Merging grade report shards of InstructorTask %s: failed unexpectedly!", entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        # The report is missing or incomplete, so the task failed as a whole,
+        # although update_subtask_status marks it as succeeded once all its
+        # subtasks are done.
+        entry = InstructorTask.objects.get(pk=entry_id)
+        entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+        entry.task_state = FAILURE
+        entry.save_now()
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -1,36 +1,42 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
 import re
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, izip_longest
 from time import time
+from uuid import uuid4
 
 from lazy import lazy
 from pytz import UTC
 
 from certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from courseware.courses import get_course_by_id
+from courseware.user_partition_groups import UserPartitionGroupResolver
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import GradeReportShardMissingError
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, initialize_subtask_info
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
-from openedx.core.djangoapps.course_groups.cohorts import bulk_cache_cohorts, get_cohort, is_course_cohorted
-from openedx.core.djangoapps.user_api.course_tag.api import BulkCourseTags
+from openedx.core.djangoapps.course_groups.cohorts import get_cohort, is_course_cohorted
 from student.models import CourseEnrollment
 from student.roles import BulkRoleCache
+from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
-from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import open_csv_report_file, upload_csv_to_report_store, upload_report_file_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -54,6 +60,18 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _shard_filename(entry_id, csv_name, index):
+    """
+    Returns the name of the file holding a shard's rows of a grade report.
+    Shards are kept in a subdirectory, so they aren't listed for download.
+    """
+    return u'grade_report_shards/{entry_id}/{csv_name}_{index:05d}.csv'.format(
+        entry_id=entry_id,
+        csv_name=csv_name,
+        index=index,
+    )
+
+
 class _CourseGradeReportContext(object):
     """
     Internal class that provides a common context to use for a single grade
@@ -167,7 +185,6 @@ class _TeamBulkContext(object):
 
 class _EnrollmentBulkContext(object):
     def __init__(self, context, users):
-        CourseEnrollment.bulk_fetch_enrollment_states(users, context.course_id)
         self.verified_users = [
             verified.user.id for verified in
             SoftwareSecurePhotoVerification.verified_query().filter(user__in=users).select_related('user__id')
@@ -179,10 +196,10 @@ class _CourseGradeBulkContext(object):
         self.certs = _CertificateBulkContext(context, users)
         self.teams = _TeamBulkContext(context, users)
         self.enrollments = _EnrollmentBulkContext(context, users)
-        bulk_cache_cohorts(context.course_id, users)
+        # Pre-fetches the users' cohorts, enrollment states and course tags
+        self.user_partition_groups = UserPartitionGroupResolver.for_users(context.course_id, users)
         BulkRoleCache.prefetch(users)
         PersistentCourseGrade.prefetch(context.course_id, users)
-        BulkCourseTags.prefetch(context.course_id, users)
 
 
 class CourseGradeReport(object):
@@ -201,20 +218,187 @@ class CourseGradeReport(object):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def queue_shards(
+            cls, create_shard_subtask_fcn, create_merge_subtask_fcn, create_timeout_subtask_fcn,
+            _xmodule_instance_args, entry_id, course_id, _task_input, action_name,
+    ):
+        """
+        Public method to generate a grade report in parallel, by splitting the
+        enrolled users into ranges of user ids (shards) that are each graded
+        by their own subtask.  Once all shards are complete, a final merge
+        subtask concatenates their CSVs, in order, into the report.
+
+        `create_shard_subtask_fcn` is called with a shard dict and a
+        SubtaskStatus, and `create_merge_subtask_fcn` with the number of
+        shards and a SubtaskStatus; each returns a celery subtask.
+        `create_timeout_subtask_fcn` is called with the dict of the shards
+        by subtask id, and returns a celery subtask which fails the shards
+        that never complete, e.g. because their worker was killed, so that
+        the report is merged (and fails) instead of staying in progress.
+
+        Returns the task progress as stored in the InstructorTask, which the
+        subtasks update as they complete.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+
+        # If the task has been requeued after its subtasks were defined,
+        # don't define (and grade) a second set of them.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Grade report shards have already been queued for InstructorTask %s', entry_id)
+            return json.loads(entry.task_output)
+
+        user_ids = list(
+            CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        shard_size = GradeReportSetting.current().batch_size
+        user_id_ranges = []
+        for start in range(0, len(user_ids), shard_size):
+            shard_user_ids = user_ids[start:start + shard_size]
+            user_id_ranges.append((shard_user_ids[0], shard_user_ids[-1], len(shard_user_ids)))
+
+        shard_subtask_ids = [str(uuid4()) for _ in user_id_ranges]
+        merge_subtask_id = str(uuid4())
+        with outer_atomic():
+            progress = initialize_subtask_info(
+                entry, action_name, len(user_ids), shard_subtask_ids + [merge_subtask_id]
+            )
+
+        TASK_LOG.info(
+            u'InstructorTask %s: queuing %s grade report shards for %s users in course %s',
+            entry_id, len(user_id_ranges), len(user_ids), course_id,
+        )
+        if not user_id_ranges:
+            create_merge_subtask_fcn(0, SubtaskStatus.create(merge_subtask_id)).apply_async()
+
+        shards_by_subtask_id = {}
+        for index, (first_user_id, last_user_id, num_users) in enumerate(user_id_ranges):
+            shard = shards_by_subtask_id[shard_subtask_ids[index]] = {
+                'index': index,
+                'first_user_id': first_user_id,
+                'last_user_id': last_user_id,
+                'num_users': num_users,
+                'num_shards': len(user_id_ranges),
+                'merge_subtask_id': merge_subtask_id,
+            }
+            create_shard_subtask_fcn(shard, SubtaskStatus.create(shard_subtask_ids[index])).apply_async()
+        if shards_by_subtask_id:
+            create_timeout_subtask_fcn(shards_by_subtask_id).apply_async()
+
+        return progress
+
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, entry_id, action_name, shard):
+        """
+        Public method to grade the enrolled users in the given shard, and
+        store their rows for the merge step.
+
+        Returns a tuple of the number of users graded successfully and the
+        number of users that failed.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(
+                _xmodule_instance_args, entry_id, course_id, entry.task_input, action_name
+            )
+            report = CourseGradeReport()
+            users = report._enrolled_users(context).filter(
+                id__gte=shard['first_user_id'],
+                id__lte=shard['last_user_id'],
+            ).order_by('id')
+
+            report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+            success_filename = _shard_filename(entry_id, 'grade_report', shard['index'])
+            error_filename = _shard_filename(entry_id, 'grade_report_err', shard['index'])
+            num_succeeded, num_failed = 0, 0
+            with report_store.open_report_file(course_id, success_filename) as success_file, \
+                    report_store.open_report_file(course_id, error_filename) as error_file:
+                for success_rows, error_rows in report._batched_rows(context, users):
+                    success_file.append_rows(success_rows)
+                    error_file.append_rows(error_rows)
+                    num_succeeded += len(success_rows)
+                    num_failed += len(error_rows)
+
+                success_file.store()
+                if error_file.num_rows > 0:
+                    error_file.store()
+
+            return num_succeeded, num_failed
+
+    @classmethod
+    def merge_shards(cls, _xmodule_instance_args, entry_id, action_name, num_shards):
+        """
+        Public method to concatenate the stored rows of every shard, in
+        order, into the final grade report, and clean up the shard files.
+
+        Raises GradeReportShardMissingError, without uploading a report, if
+        the rows of a shard were not stored because it failed.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        missing_shards = [
+            index for index in range(num_shards)
+            if not report_store.exists(course_id, _shard_filename(entry_id, 'grade_report', index))
+        ]
+        if missing_shards:
+            raise GradeReportShardMissingError(
+                u'Grade report shards {} of InstructorTask {} were not stored'.format(missing_shards, entry_id)
+            )
+
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(
+                _xmodule_instance_args, entry_id, course_id, entry.task_input, action_name
+            )
+            report = CourseGradeReport()
+            date = datetime.now(UTC)
+            with open_csv_report_file('grade_report', course_id, date) as success_file, \
+                    open_csv_report_file('grade_report_err', course_id, date) as error_file:
+                success_file.append_rows([report._success_headers(context)])
+                error_file.append_rows([report._error_headers()])
+
+                has_errors = False
+                for index in range(num_shards):
+                    for csv_name, report_file in (('grade_report', success_file), ('grade_report_err', error_file)):
+                        filename = _shard_filename(entry_id, csv_name, index)
+                        if not report_store.exists(course_id, filename):
+                            # Error rows are only stored for shards that had errors.
+                            continue
+                        with report_store.open(course_id, filename) as shard_file:
+                            report_file.append_file(shard_file)
+                        report_store.delete(course_id, filename)
+                        has_errors = has_errors or report_file is error_file
+
+                upload_report_file_to_report_store(success_file, 'grade_report')
+                if has_errors:
+                    upload_report_file_to_report_store(error_file, 'grade_report_err')
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
+
+        Rows are appended to the report files a batch of users at a time, so
+        memory use depends on USER_BATCH_SIZE rather than on the number of
+        enrollments in the course.
         """
         context.update_status(u'Starting grades')
-        success_headers = self._success_headers(context)
-        error_headers = self._error_headers()
-        batched_rows = self._batched_rows(context)
+        date = datetime.now(UTC)
+        with open_csv_report_file('grade_report', context.course_id, date) as success_file, \
+                open_csv_report_file('grade_report_err', context.course_id, date) as error_file:
+            success_file.append_rows([self._success_headers(context)])
+            error_file.append_rows([self._error_headers()])
 
-        context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+            context.update_status(u'Compiling grades')
+            for success_rows, error_rows in self._batched_rows(context):
+                success_file.append_rows(success_rows)
+                error_file.append_rows(error_rows)
+                self._update_progress(context, success_rows, error_rows)
 
-        context.update_status(u'Uploading grades')
-        self._upload(context, success_headers, success_rows, error_headers, error_rows)
+            context.update_status(u'Uploading grades')
+            self._upload(success_file, error_file)
 
         return context.update_status(u'Completed grades')
 
@@ -239,40 +423,34 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
-    def _batched_rows(self, context):
+    def _batched_rows(self, context, users=None):
         """
         A generator of batches of (success_rows, error_rows) for this report.
+        If `users` is not given, all users enrolled in the course are included.
         """
-        for users in self._batch_users(context):
+        for users in self._batch_users(context, users):
             users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _update_progress(self, context, success_rows, error_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Adds the given batch of (success_rows, error_rows) to the task's
+        progress, and updates the task state.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
-
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
+        context.task_progress.succeeded += len(success_rows)
+        context.task_progress.failed += len(error_rows)
         context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
         context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+        context.task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
 
-    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
+    def _upload(self, success_file, error_file):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Uploads the given report files.  The error report is only uploaded
+        if it contains more than its header.
         """
-        date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
-        if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+        upload_report_file_to_report_store(success_file, 'grade_report')
+        if error_file.num_rows > 1:
+            upload_report_file_to_report_store(error_file, 'grade_report_err')
 
     def _grades_header(self, context):
         """
@@ -286,7 +464,7 @@ class CourseGradeReport(object):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
-    def _batch_users(self, context):
+    def _batch_users(self, context, users=None):
         """
         Returns a generator of batches of users.
         """
@@ -294,9 +472,17 @@ class CourseGradeReport(object):
             args = [iter(iterable)] * chunk_size
             return izip_longest(*args, fillvalue=fillvalue)
 
+        if users is None:
+            users = self._enrolled_users(context)
+        # Don't cache the complete queryset; only one batch of users is needed at a time.
+        return grouper(users.iterator())
+
+    def _enrolled_users(self, context):
+        """
+        Returns a queryset of all users enrolled in the course.
+        """
         users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
-        users = users.select_related('profile__allow_certificate')
-        return grouper(users)
+        return users.select_related('profile__allow_certificate')
 
     def _user_grades(self, course_grade, context):
         """
@@ -359,14 +545,14 @@ class CourseGradeReport(object):
             cohort_group_names.append(group.name if group else '')
         return cohort_group_names
 
-    def _user_experiment_group_names(self, user, context):
+    def _user_experiment_group_names(self, user, context, user_partition_groups):
         """
         Returns a list of names of course experiments in which the given user
         belongs.
         """
         experiment_group_names = []
         for partition in context.course_experiments:
-            group = PartitionService(context.course_id).get_group(user, partition, assign=False)
+            group = user_partition_groups[user.id].get_group(partition)
             experiment_group_names.append(group.name if group else '')
         return experiment_group_names
 
@@ -432,6 +618,7 @@ class CourseGradeReport(object):
                 course=context.course,
                 collected_block_structure=context.course_structure,
                 course_key=context.course_id,
+                chunk_size=self.USER_BATCH_SIZE,
             ):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
@@ -441,7 +628,7 @@ class CourseGradeReport(object):
                         [user.id, user.email, user.username] +
                         self._user_grades(course_grade, context) +
                         self._user_cohort_group_names(user, context) +
-                        self._user_experiment_group_names(user, context) +
+                        self._user_experiment_group_names(user, context, bulk_context.user_partition_groups) +
                         self._user_team_names(user, bulk_context.teams) +
                         self._user_verification_mode(user, context, bulk_context.enrollments) +
                         self._user_certificate_info(user, context, course_grade, bulk_context.certs) +
@@ -480,7 +667,9 @@ class ProblemGradeReport(object):
         # whether each user is currently enrolled in the course.
         CourseEnrollment.bulk_fetch_enrollment_states(enrolled_students, course_id)
 
-        for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
+        for student, course_grade, error in CourseGradeFactory().iter(
+            enrolled_students, course, chunk_size=CourseGradeReport.USER_BATCH_SIZE,
+        ):
             student_fields = [getattr(student, field_name) for field_name in header_row]
             task_progress.attempted += 1
 
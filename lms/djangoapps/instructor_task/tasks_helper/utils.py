@@ -28,18 +28,39 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         course_id: ID of the course
     """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
-    )
+    report_store.store_rows(course_id, _report_filename(csv_name, course_id, timestamp), rows)
+    tracker_emit(csv_name)
+
+
+def open_csv_report_file(csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Return an empty `ReportFile` that rows can be appended to a batch at a
+    time, named the same way as by `upload_csv_to_report_store`.  Pass it to
+    `upload_report_file_to_report_store` once complete.
+    """
+    report_store = ReportStore.from_config(config_name)
+    return report_store.open_report_file(course_id, _report_filename(csv_name, course_id, timestamp))
+
+
+def upload_report_file_to_report_store(report_file, csv_name):
+    """
+    Upload a completed `ReportFile` using its ReportStore.
+    """
+    report_file.store()
     tracker_emit(csv_name)
 
 
+def _report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the name of the CSV file for the given report.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -49,6 +49,21 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_report_file_append_rows(self):
+        """
+        Test that rows appended to a ReportFile in batches are stored as a
+        single CSV.
+        """
+        report_store = self.create_report_store()
+        with report_store.open_report_file(self.course_id, 'report.csv') as report_file:
+            report_file.append_rows([[u'header']])
+            report_file.append_rows([[u'row1'], [u'ni\xf1o']])
+            self.assertEqual(report_file.num_rows, 3)
+            report_file.store()
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as csv_file:
+            self.assertEqual(csv_file.read().splitlines(), ['header', 'row1', u'ni\xf1o'.encode('utf-8')])
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -16,6 +17,7 @@ from datetime import datetime
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -34,6 +36,15 @@ from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException, GradeReportShardMissingError
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus
+from lms.djangoapps.instructor_task.tasks import (
+    calculate_grades_csv_shard,
+    fail_stalled_grades_csv_shards,
+    merge_grades_csv_shards
+)
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -53,6 +64,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -424,6 +436,127 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         )
 
 
+class TestShardedGradeReport(InstructorGradeReportTestCase):
+    """
+    Test that grade reports split into shards are merged into a complete report.
+    """
+    def setUp(self):
+        super(TestShardedGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [UserFactory.create() for _ in range(3)]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+        self.entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        GradeReportSetting.objects.create(enabled=True, batch_size=2)
+
+    def test_sharded_report(self):
+        create_shard_subtask = Mock()
+        create_merge_subtask = Mock()
+        progress = CourseGradeReport.queue_shards(
+            create_shard_subtask, create_merge_subtask, Mock(), None, self.entry.id, self.course.id, None, 'graded'
+        )
+        self.assertEqual(progress['total'], 3)
+        self.assertFalse(create_merge_subtask.called)
+
+        shards = [call_args[0][0] for call_args in create_shard_subtask.call_args_list]
+        student_ids = sorted(student.id for student in self.students)
+        self.assertEqual(
+            [(shard['first_user_id'], shard['last_user_id']) for shard in shards],
+            [(student_ids[0], student_ids[1]), (student_ids[2], student_ids[2])],
+        )
+
+        # Grade the shards out of order; the merged report is still ordered by shard.
+        for shard in reversed(shards):
+            num_succeeded, num_failed = CourseGradeReport.generate_shard(None, self.entry.id, 'graded', shard)
+            self.assertEqual((num_succeeded, num_failed), (1 if shard['index'] else 2, 0))
+        CourseGradeReport.merge_shards(None, self.entry.id, 'graded', len(shards))
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{u'Student ID': unicode(student_id)} for student_id in student_ids],
+            ignore_other_columns=True,
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks._queue_grades_csv_merge')
+    def test_failed_shard(self, _mock_queue_merge):
+        create_shard_subtask = Mock()
+        CourseGradeReport.queue_shards(
+            create_shard_subtask, Mock(), Mock(), None, self.entry.id, self.course.id, None, 'graded'
+        )
+        (shard, shard_status), (other_shard, other_shard_status) = [
+            call_args[0] for call_args in create_shard_subtask.call_args_list
+        ]
+
+        # The second shard is graded, and the first one fails.
+        calculate_grades_csv_shard(self.entry.id, None, 'graded', other_shard, other_shard_status.to_dict())
+        with patch.object(CourseGradeReport, 'generate_shard', side_effect=Exception('Shard failed')):
+            with self.assertRaises(Exception):
+                calculate_grades_csv_shard(self.entry.id, None, 'graded', shard, shard_status.to_dict())
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertDictContainsSubset({'succeeded': 1, 'failed': 2}, json.loads(entry.task_output))
+
+        # The merge fails the task instead of uploading a report without the first shard's users.
+        merge_status = SubtaskStatus.create(shard['merge_subtask_id'])
+        with self.assertRaises(GradeReportShardMissingError):
+            merge_grades_csv_shards(self.entry.id, None, 'graded', shard['num_shards'], merge_status.to_dict())
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
+    @patch('lms.djangoapps.instructor_task.tasks._queue_grades_csv_merge')
+    def test_redelivered_shard(self, mock_queue_merge):
+        create_shard_subtask = Mock()
+        CourseGradeReport.queue_shards(
+            create_shard_subtask, Mock(), Mock(), None, self.entry.id, self.course.id, None, 'graded'
+        )
+        shard, shard_status = create_shard_subtask.call_args_list[0][0]
+        calculate_grades_csv_shard(self.entry.id, None, 'graded', shard, shard_status.to_dict())
+        mock_queue_merge.reset_mock()
+
+        # A shard redelivered after it completed is rejected, but queues the merge.
+        with self.assertRaises(DuplicateTaskException):
+            calculate_grades_csv_shard(self.entry.id, None, 'graded', shard, shard_status.to_dict())
+        self.assertEqual(mock_queue_merge.call_count, 1)
+
+    @patch('lms.djangoapps.instructor_task.tasks._queue_grades_csv_merge')
+    def test_stalled_shard(self, mock_queue_merge):
+        create_shard_subtask = Mock()
+        create_timeout_subtask = Mock()
+        CourseGradeReport.queue_shards(
+            create_shard_subtask, Mock(), create_timeout_subtask, None, self.entry.id, self.course.id, None, 'graded'
+        )
+        shards_by_subtask_id = create_timeout_subtask.call_args[0][0]
+        self.assertEqual(
+            sorted(shards_by_subtask_id.values()),
+            sorted(call_args[0][0] for call_args in create_shard_subtask.call_args_list)
+        )
+
+        # The second shard is graded, and the first one never completes.
+        other_shard, other_shard_status = create_shard_subtask.call_args_list[1][0]
+        calculate_grades_csv_shard(self.entry.id, None, 'graded', other_shard, other_shard_status.to_dict())
+        mock_queue_merge.reset_mock()
+
+        fail_stalled_grades_csv_shards(self.entry.id, None, 'graded', shards_by_subtask_id)
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertDictContainsSubset({'succeeded': 1, 'failed': 2}, json.loads(entry.task_output))
+        self.assertEqual(mock_queue_merge.call_count, 1)
+
+    def test_no_enrollments(self):
+        CourseEnrollment.objects.filter(course_id=self.course.id).delete()
+        create_shard_subtask = Mock()
+        create_merge_subtask = Mock()
+        create_timeout_subtask = Mock()
+        CourseGradeReport.queue_shards(
+            create_shard_subtask, create_merge_subtask, create_timeout_subtask,
+            None, self.entry.id, self.course.id, None, 'graded'
+        )
+        self.assertFalse(create_shard_subtask.called)
+        self.assertFalse(create_timeout_subtask.called)
+        self.assertEqual(create_merge_subtask.call_args[0][0], 0)
+
+
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
 
@@ -225,6 +225,35 @@ if 'loc_cache' not in CACHES:
         'LOCATION': 'edx_location_mem_cache',
     }
 
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS
+)
+COURSE_STRUCTURE_INDEXED_FIELDS = ENV_TOKENS.get('COURSE_STRUCTURE_INDEXED_FIELDS', COURSE_STRUCTURE_INDEXED_FIELDS)
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = ENV_TOKENS.get(
+    'COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES', COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES
+)
+COURSE_DEFINITION_BATCH_LOADING = ENV_TOKENS.get('COURSE_DEFINITION_BATCH_LOADING', COURSE_DEFINITION_BATCH_LOADING)
+PRECOMPUTE_INHERITED_SETTINGS = ENV_TOKENS.get('PRECOMPUTE_INHERITED_SETTINGS', PRECOMPUTE_INHERITED_SETTINGS)
+ASSET_INDEX_CACHE_TIMEOUT = ENV_TOKENS.get('ASSET_INDEX_CACHE_TIMEOUT', ASSET_INDEX_CACHE_TIMEOUT)
+ASSET_NOT_FOUND_CACHE_TIMEOUT = ENV_TOKENS.get('ASSET_NOT_FOUND_CACHE_TIMEOUT', ASSET_NOT_FOUND_CACHE_TIMEOUT)
+ASSET_FIND_REQUEST_CACHE = ENV_TOKENS.get('ASSET_FIND_REQUEST_CACHE', ASSET_FIND_REQUEST_CACHE)
+USER_PARTITION_GROUPS_REQUEST_CACHE = ENV_TOKENS.get(
+    'USER_PARTITION_GROUPS_REQUEST_CACHE', USER_PARTITION_GROUPS_REQUEST_CACHE
+)
+CONTENTSERVER_DISK_CACHE_DIR = ENV_TOKENS.get('CONTENTSERVER_DISK_CACHE_DIR', CONTENTSERVER_DISK_CACHE_DIR)
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'CONTENTSERVER_DISK_CACHE_MAX_SIZE', CONTENTSERVER_DISK_CACHE_MAX_SIZE
+)
+STATIC_URL_REWRITE_CACHE_MAX_LENGTH = ENV_TOKENS.get(
+    'STATIC_URL_REWRITE_CACHE_MAX_LENGTH', STATIC_URL_REWRITE_CACHE_MAX_LENGTH
+)
+STATIC_URL_REWRITERS_MAX_ENTRIES = ENV_TOKENS.get(
+    'STATIC_URL_REWRITERS_MAX_ENTRIES', STATIC_URL_REWRITERS_MAX_ENTRIES
+)
+GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES = ENV_TOKENS.get(
+    'GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES', GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES
+)
+
 # Email overrides
 DEFAULT_FROM_EMAIL = ENV_TOKENS.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
 DEFAULT_FEEDBACK_EMAIL = ENV_TOKENS.get('DEFAULT_FEEDBACK_EMAIL', DEFAULT_FEEDBACK_EMAIL)
@@ -261,6 +290,12 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get(
     'BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS',
     BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
 )
+BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS = ENV_TOKENS.get(
+    'BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS',
+    BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS
+)
+BULK_EMAIL_SMTP_CONNECTIONS = ENV_TOKENS.get('BULK_EMAIL_SMTP_CONNECTIONS', BULK_EMAIL_SMTP_CONNECTIONS)
+BULK_EMAIL_CHECKPOINT_INTERVAL = ENV_TOKENS.get('BULK_EMAIL_CHECKPOINT_INTERVAL', BULK_EMAIL_CHECKPOINT_INTERVAL)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -272,6 +307,9 @@ BULK_EMAIL_ROUTING_KEY_SMALL_JOBS = ENV_TOKENS.get('BULK_EMAIL_ROUTING_KEY_SMALL
 
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = ENV_TOKENS.get('RECALCULATE_GRADES_ROUTING_KEY', LOW_PRIORITY_QUEUE)
+RECALCULATE_GRADES_COALESCE_SECONDS = ENV_TOKENS.get(
+    'RECALCULATE_GRADES_COALESCE_SECONDS', RECALCULATE_GRADES_COALESCE_SECONDS
+)
 
 # Queue to use for updating grades due to grading policy change
 POLICY_CHANGE_GRADES_ROUTING_KEY = ENV_TOKENS.get('POLICY_CHANGE_GRADES_ROUTING_KEY', LOW_PRIORITY_QUEUE)
@@ -356,6 +394,8 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_MAXSIZE = ENV_TOKENS.get('COMMENTS_SERVICE_POOL_MAXSIZE', COMMENTS_SERVICE_POOL_MAXSIZE)
+COMMENTS_SERVICE_CONNECT_TIMEOUT = ENV_TOKENS.get('COMMENTS_SERVICE_CONNECT_TIMEOUT', COMMENTS_SERVICE_CONNECT_TIMEOUT)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get('ZENDESK_URL', ZENDESK_URL)
 ZENDESK_CUSTOM_FIELDS = ENV_TOKENS.get('ZENDESK_CUSTOM_FIELDS', ZENDESK_CUSTOM_FIELDS)
@@ -645,6 +685,7 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADE_REPORT_SHARDS_TIMEOUT = ENV_TOKENS.get('GRADE_REPORT_SHARDS_TIMEOUT', GRADE_REPORT_SHARDS_TIMEOUT)
 
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
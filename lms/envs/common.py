@@ -63,6 +63,16 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Maximum number of keep-alive connections to the comments service pooled in each
+# process, which is also the maximum number of requests made concurrently by the
+# comment client's batch fetches. Set to 0 to open a connection for each request.
+COMMENTS_SERVICE_POOL_MAXSIZE = 10
+
+# Timeout, in seconds, for connecting to the comments service. When None, the
+# connection timeout of the forums configuration is used for connecting as well
+# as for reading responses.
+COMMENTS_SERVICE_CONNECT_TIMEOUT = None
+
 LMS_ROOT_URL = "http://localhost:8000"
 LMS_ENROLLMENT_API_PATH = "/api/enrollment/v1/"
 
@@ -416,6 +426,10 @@ FEATURES = {
 
     # Whether HTML XBlocks/XModules return HTML content with the Course Blocks API student_view_data
     'ENABLE_HTML_XBLOCK_STUDENT_VIEW_DATA': False,
+
+    # Whether to report the time and blocks removed of each Block Structure
+    # transformer as monitoring custom metrics.
+    'PROFILE_BLOCK_STRUCTURE_TRANSFORMERS': False,
 }
 
 # Settings for the course reviews tool template and identification key, set either to None to disable course reviews
@@ -704,6 +718,9 @@ TRACK_MAX_EVENT = 50000
 
 DEBUG_TRACK_LOG = False
 
+# Backends which write to slow stores (such as track.backends.mongodb.MongoBackend)
+# can be wrapped in track.backends.batching.BatchingBackend, which queues the events
+# and sends them in batches from a background thread, off the request thread.
 TRACKING_BACKENDS = {
     'logger': {
         'ENGINE': 'track.backends.logger.LoggerBackend',
@@ -853,6 +870,63 @@ MODULESTORE = {
     }
 }
 
+# Maximum number of blocks (summed over all structures) to keep in the process-local
+# LRU cache of split modulestore course structures. Set to 0 to disable it.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = 100000
+
+# Settings fields whose values are indexed, in the structures of the process-local
+# cache, to answer get_items queries on them without scanning every block.
+COURSE_STRUCTURE_INDEXED_FIELDS = ['group_access', 'is_entrance_exam']
+
+# Maximum number of split modulestore definitions to keep in the process-local LRU
+# cache, in front of the 'course_definition_cache' django cache, if it exists. Set
+# to 0 to disable it.
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = 10000
+
+# Whether fetching the definition of a lazily loaded block also fetches the pending
+# definitions of its siblings, in the same query.
+COURSE_DEFINITION_BATCH_LOADING = True
+
+# Whether blocks of the structures in the process-local cache read their inherited
+# settings from a table computed once per structure, rather than from their ancestors.
+PRECOMPUTE_INHERITED_SETTINGS = True
+
+# Number of seconds to cache the per-course index of asset metadata (digest, lock
+# and content type) used when rewriting static URLs. Set to 0 to disable it.
+ASSET_INDEX_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of seconds to remember that a course asset does not exist, so that repeated
+# requests of missing assets don't query GridFS each time. Set to 0 to disable it.
+ASSET_NOT_FOUND_CACHE_TIMEOUT = 60
+
+# Whether to remember the course assets found during a request, so that repeated
+# finds of the same asset don't query GridFS each time. Only the content of small
+# assets, up to a total size per request, is kept.
+ASSET_FIND_REQUEST_CACHE = True
+
+# Whether to remember a user's role and groups in the user partitions of a course
+# for the rest of the request, rather than looking them up for each block checked.
+USER_PARTITION_GROUPS_REQUEST_CACHE = True
+
+# Directory in which the contentserver caches the data of course assets too large for the
+# django cache, and the maximum total size in bytes of the cached data. Set the directory
+# to None to disable the cache.
+CONTENTSERVER_DISK_CACHE_DIR = None
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Maximum length of rewritten block content (summed over all blocks) whose static,
+# course and jump_to_id url rewriting is reused by later renders of the same content
+# in a process. Set to 0 to disable it.
+STATIC_URL_REWRITE_CACHE_MAX_LENGTH = 10 * 1024 * 1024
+
+# Maximum number of compiled url rewriters, one per course and set of rewriting
+# options, that a process keeps for reuse. Set to 0 to disable it.
+STATIC_URL_REWRITERS_MAX_ENTRIES = 1000
+
+# Maximum number of hashes of stored VisibleBlocks (summed over all courses) that
+# grading keeps in its process-local cache. Set to 0 to disable it.
+GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES = 100000
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -1964,11 +2038,29 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Maximum delay in seconds between individual mail messages being sent.  The delay
+# doubles, up to this value, with each retry of a bulk email task for rate-related
+# reasons, and decays as messages are sent without being throttled.
+BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS = 1
+
+# Number of SMTP connections over which each bulk email task sends messages
+# concurrently.  It is halved with each retry of the task for rate-related reasons.
+BULK_EMAIL_SMTP_CONNECTIONS = 4
+
+# Number of messages sent by a bulk email task between the records of its progress.
+# Set to 0 to only record its progress when it completes.
+BULK_EMAIL_CHECKPOINT_INTERVAL = 25
+
 ############################# Persistent Grades ####################################
 
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
+# Number of seconds for which a pending subsection grade recalculation task accepts
+# the later recalculations of the same user's grades in the same course, which it
+# then performs at once. Set to 0 to disable coalescing.
+RECALCULATE_GRADES_COALESCE_SECONDS = 300
+
 # Queue to use for updating grades due to grading policy change
 POLICY_CHANGE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
@@ -2607,6 +2699,10 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Number of seconds after which the shards of a sharded grade report which haven't
+# completed, e.g. because their worker was killed, are failed, along with the report.
+GRADE_REPORT_SHARDS_TIMEOUT = 6 * 60 * 60
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
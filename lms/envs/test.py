@@ -235,6 +235,46 @@ CACHES = {
     },
 }
 
+# Structures are cached in-process outside of the django caches, which would
+# make mongo call counts depend on test ordering.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BLOCKS = 0
+
+# Definitions are cached in-process, and fetched along with their siblings', which
+# would make mongo call counts depend on test ordering and on the blocks accessed.
+COURSE_DEFINITION_PROCESS_CACHE_MAX_ENTRIES = 0
+COURSE_DEFINITION_BATCH_LOADING = False
+
+# Asset indexes are kept in the request cache, which would make mongo call
+# counts of static URL rewriting depend on test ordering.
+ASSET_INDEX_CACHE_TIMEOUT = 0
+
+# Finds of assets are cached across tests and in the request cache, which would
+# make tests that write to GridFS directly, and mongo call counts, depend on
+# test ordering.
+ASSET_NOT_FOUND_CACHE_TIMEOUT = 0
+ASSET_FIND_REQUEST_CACHE = False
+
+# Tests change users' roles, cohorts and enrollments between access checks made
+# without clearing the request cache.
+USER_PARTITION_GROUPS_REQUEST_CACHE = False
+
+# Rewritten content is cached in-process, which would make tests of static url
+# rewriting depend on test ordering.
+STATIC_URL_REWRITE_CACHE_MAX_LENGTH = 0
+GRADES_VISIBLE_BLOCKS_PROCESS_CACHE_MAX_HASHES = 0
+
+# Requests to the comments service are mocked by patching requests.request, which
+# the pooled session doesn't use.
+COMMENTS_SERVICE_POOL_MAXSIZE = 0
+
+# Send bulk emails over a single connection, so that the mocked sends of the
+# tests happen in order, and don't let the delay between sends grow.
+BULK_EMAIL_SMTP_CONNECTIONS = 1
+BULK_EMAIL_MAX_DELAY_BETWEEN_SENDS = BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
+
+# Tests of grades tasks expect each score change to enqueue its own task.
+RECALCULATE_GRADES_COALESCE_SECONDS = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -1,6 +1,6 @@
 import logging
 
-from .utils import CommentClientRequestError, extract, perform_request
+from .utils import CommentClientRequestError, extract, map_concurrently, perform_request
 
 log = logging.getLogger(__name__)
 
@@ -97,6 +97,27 @@ class Model(object):
     def find(cls, id):
         return cls(id=id)
 
+    @classmethod
+    def find_all(cls, ids, *args, **kwargs):
+        """
+        Returns the instances with the given ids, retrieved together with
+        retrieve_all.
+        """
+        return cls.retrieve_all([cls.find(instance_id) for instance_id in ids], *args, **kwargs)
+
+    @classmethod
+    def retrieve_all(cls, instances, *args, **kwargs):
+        """
+        Retrieves the given instances that weren't retrieved yet, with their
+        requests to the comments service made concurrently, and returns the
+        instances.
+        """
+        map_concurrently(
+            lambda instance: instance.retrieve(*args, **kwargs),
+            [instance for instance in instances if not instance.retrieved]
+        )
+        return instances
+
     def _update_from_response(self, response_data):
         for k, v in response_data.items():
             if k in self.accessible_fields:
@@ -1,11 +1,18 @@
 """" Common utilities for comment client wrapper """
 import logging
+import os
+import threading
 from contextlib import contextmanager
+from cookielib import DefaultCookiePolicy
+from multiprocessing.pool import ThreadPool
 from time import time
 from uuid import uuid4
 
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.db import connection
+from django.utils import translation
 from django.utils.translation import get_language
 
 import dogstats_wrapper as dog_stats_api
@@ -13,6 +20,13 @@ import dogstats_wrapper as dog_stats_api
 log = logging.getLogger(__name__)
 
 
+# The requests Session of this process, which pools connections to the comments service.
+_SESSION = None
+# The id of the process that created _SESSION, as forked processes must not share its connections.
+_SESSION_PID = None
+_SESSION_LOCK = threading.Lock()
+
+
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
 
@@ -34,6 +48,75 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+def _get_pool_maxsize():
+    """
+    Returns the maximum number of connections to the comments service pooled in
+    this process, or 0 if connections aren't pooled.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_POOL_MAXSIZE', 0)
+
+
+def get_session():
+    """
+    Returns the requests Session of this process, which keeps connections to the
+    comments service alive between requests, or None if connections aren't pooled.
+
+    The session is created on first use in each process, and doesn't store
+    cookies, as it is shared by the requests made on behalf of all users.
+    """
+    global _SESSION, _SESSION_PID  # pylint: disable=global-statement
+    pool_maxsize = _get_pool_maxsize()
+    if not pool_maxsize:
+        return None
+
+    pid = os.getpid()
+    if _SESSION is None or _SESSION_PID != pid:
+        with _SESSION_LOCK:
+            if _SESSION is None or _SESSION_PID != pid:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSION, _SESSION_PID = session, pid
+    return _SESSION
+
+
+def map_concurrently(func, items):
+    """
+    Returns the list of the results of calling func on each of the given items.
+
+    The calls are made concurrently by up to COMMENTS_SERVICE_POOL_MAXSIZE
+    threads, so that the requests they make to the comments service are sent
+    in parallel over the pooled connections.  The calls are made in the
+    calling thread, one after the other, when connections aren't pooled.
+    """
+    items = list(items)
+    pool_maxsize = _get_pool_maxsize()
+    if not pool_maxsize or len(items) < 2:
+        return [func(item) for item in items]
+
+    language = get_language()
+
+    def call(item):
+        """
+        Calls func on the item in the language of the calling thread.
+        """
+        try:
+            with translation.override(language):
+                return func(item)
+        finally:
+            # Close any database connection the call opened in this thread.
+            connection.close()
+
+    pool = ThreadPool(min(pool_maxsize, len(items)))
+    try:
+        return pool.map(call, items)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 @contextmanager
 def request_timer(request_id, method, url, tags=None):
     start = time()
@@ -84,14 +167,20 @@ def perform_request(method, url, data_or_params=None, raw=False,
     else:
         data = None
         params = merge_dict(data_or_params, request_id_dict)
+    timeout = config.connection_timeout
+    connect_timeout = getattr(settings, 'COMMENTS_SERVICE_CONNECT_TIMEOUT', None)
+    if connect_timeout is not None:
+        timeout = (connect_timeout, timeout)
+
+    session = get_session()
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = (session or requests).request(
             method,
             url,
             data=data,
             params=params,
             headers=headers,
-            timeout=config.connection_timeout
+            timeout=timeout
         )
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
@@ -6,9 +6,13 @@ Module with family of classes for block structures.
 
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
+    _CompactBlockRelations - Serializable array-backed form of all blocks' relations.
+    _ColumnarBlockData - Serializable columnar form of all blocks' data.
     _BlockData - Data structure for a single block's data.
 """
-from copy import deepcopy
+import cPickle as pickle
+from array import array
+from collections import defaultdict
 from functools import partial
 from logging import getLogger
 
@@ -39,6 +43,81 @@ class _BlockRelations(object):
         # list [UsageKey]
         self.children = []
 
+    def copy(self):
+        """
+        Returns a new instance of _BlockRelations with copies of this
+        instance's parents and children lists.
+        """
+        block_relations = _BlockRelations()
+        block_relations.parents = list(self.parents)
+        block_relations.children = list(self.children)
+        return block_relations
+
+
+class _CompactBlockRelations(object):
+    """
+    Integer-indexed, array-backed representation of the relations of
+    all blocks in a block structure, for compact serialization.
+
+    Each block is identified by its index in usage_keys.  The children
+    of the block at index i are the blocks whose indices are in
+    children[child_offsets[i]:child_offsets[i + 1]], and likewise for
+    its parents, in their original order.
+    """
+    # Type code of the arrays of block indices and offsets.
+    TYPE_CODE = 'i'
+
+    def __init__(self, block_relations):
+        """
+        Arguments:
+            block_relations (dict({UsageKey: _BlockRelations})) -
+                Internal map of a block's usage key to its
+                parents/children relations.
+        """
+        # list [UsageKey]
+        self.usage_keys = list(block_relations)
+        indices = {usage_key: index for index, usage_key in enumerate(self.usage_keys)}
+        relations = [block_relations[usage_key] for usage_key in self.usage_keys]
+
+        # array [int]
+        self.child_offsets, self.children = self._pack(
+            indices, (block.children for block in relations),
+        )
+        self.parent_offsets, self.parents = self._pack(
+            indices, (block.parents for block in relations),
+        )
+
+    def to_block_relations(self):
+        """
+        Returns the dict({UsageKey: _BlockRelations}) represented by
+        this instance.
+        """
+        usage_keys = self.usage_keys
+        block_relations = {}
+        for index, usage_key in enumerate(usage_keys):
+            relations = _BlockRelations()
+            relations.children = [
+                usage_keys[child] for child in self.children[self.child_offsets[index]:self.child_offsets[index + 1]]
+            ]
+            relations.parents = [
+                usage_keys[parent] for parent in self.parents[self.parent_offsets[index]:self.parent_offsets[index + 1]]
+            ]
+            block_relations[usage_key] = relations
+        return block_relations
+
+    @classmethod
+    def _pack(cls, indices, adjacency_lists):
+        """
+        Returns a tuple of the offsets and the concatenated indices of
+        the given lists of usage keys.
+        """
+        offsets = array(cls.TYPE_CODE, [0])
+        packed = array(cls.TYPE_CODE)
+        for usage_keys in adjacency_lists:
+            packed.extend(indices[usage_key] for usage_key in usage_keys)
+            offsets.append(len(packed))
+        return offsets, packed
+
 
 class BlockStructure(object):
     """
@@ -62,6 +141,14 @@ class BlockStructure(object):
         # dict {UsageKey: _BlockRelations}
         self._block_relations = {}
 
+        # Set of usage keys of the blocks whose _BlockRelations are
+        # owned by this structure, once its _BlockRelations are shared
+        # with another structure (see BlockStructureBlockData.copy).
+        # Any other _BlockRelations are copied before being modified.
+        # None if this structure owns all of its _BlockRelations.
+        # set(UsageKey) or None
+        self._owned_relations = None
+
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
@@ -120,7 +207,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._get_writable_relations(usage_key).parents = []
 
     def __contains__(self, usage_key):
         """
@@ -228,6 +315,7 @@ class BlockStructure(object):
 
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
+        self._owned_relations = None
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -237,8 +325,32 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
+        for usage_key in (parent_key, child_key):
+            if usage_key in self._block_relations:
+                self._get_writable_relations(usage_key)
+            elif self._owned_relations is not None:
+                self._owned_relations.add(usage_key)
         self._add_to_relations(self._block_relations, parent_key, child_key)
 
+    def _get_writable_relations(self, usage_key):
+        """
+        Returns the _BlockRelations of the block identified by the
+        given usage_key, first replacing it with a copy owned by this
+        structure if it is shared with another structure.
+
+        Raises KeyError if the block is not in this structure.
+
+        Arguments:
+            usage_key (UsageKey) - Usage key of the block whose
+                relations are to be modified.
+        """
+        block_relations = self._block_relations[usage_key]
+        if self._owned_relations is not None and usage_key not in self._owned_relations:
+            block_relations = block_relations.copy()
+            self._block_relations[usage_key] = block_relations
+            self._owned_relations.add(usage_key)
+        return block_relations
+
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
         """
@@ -326,7 +438,14 @@ class TransformerData(FieldData):
     """
     Data structure to encapsulate collected data for a transformer.
     """
-    pass
+    def copy(self):
+        """
+        Returns a new instance of TransformerData with a shallow
+        copy of this instance's fields.
+        """
+        transformer_data = TransformerData()
+        transformer_data.fields = dict(self.fields)
+        return transformer_data
 
 
 class TransformerDataMap(dict):
@@ -347,6 +466,16 @@ class TransformerDataMap(dict):
         key = self._translate_key(key)
         dict.__delitem__(self, key)
 
+    def copy(self):
+        """
+        Returns a new instance of TransformerDataMap with a copy of
+        each of this map's TransformerData.
+        """
+        return TransformerDataMap(
+            (transformer_name, transformer_data.copy())
+            for transformer_name, transformer_data in self.iteritems()
+        )
+
     def get_or_create(self, key):
         """
         Returns the TransformerData associated with the given
@@ -391,17 +520,257 @@ class BlockData(FieldData):
         # Map of transformer name to its block-specific data.
         self.transformer_data = TransformerDataMap()
 
+    def copy(self):
+        """
+        Returns a new instance of BlockData with a shallow copy of this
+        instance's fields and a copy of its transformer data.
+        """
+        block_data = BlockData(self.location)
+        block_data.fields = dict(self.fields)
+        block_data.transformer_data = self.transformer_data.copy()
+        return block_data
+
+
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    A TransformerDataMap for a single block deserialized from
+    _ColumnarBlockData, which loads each transformer's data for the
+    block when it is first accessed.
+    """
+    def __init__(self, columnar_block_data, block_index, *args, **kwargs):
+        super(_LazyTransformerDataMap, self).__init__(*args, **kwargs)
+        self._columnar_block_data = columnar_block_data
+        self._block_index = block_index
+
+    def __missing__(self, transformer_name):
+        transformer_data = self._load(transformer_name)
+        if transformer_data is None:
+            raise KeyError(transformer_name)
+        return transformer_data
+
+    def copy(self):
+        return _LazyTransformerDataMap(
+            self._columnar_block_data,
+            self._block_index,
+            (
+                (transformer_name, transformer_data.copy())
+                for transformer_name, transformer_data in dict.iteritems(self)
+            ),
+        )
+
+    def iteritems(self):
+        # Load the data of all transformers before iterating.
+        for transformer_name in self._columnar_block_data.transformer_names:
+            if transformer_name not in self:
+                self._load(transformer_name)
+        return super(_LazyTransformerDataMap, self).iteritems()
+
+    def _load(self, transformer_name):
+        """
+        Loads, adds and returns the data of the given transformer for
+        the block.  Returns None if the block has no such data.
+        """
+        transformer_data = self._columnar_block_data.get_transformer_data(transformer_name, self._block_index)
+        if transformer_data is not None:
+            dict.__setitem__(self, transformer_name, transformer_data)
+        return transformer_data
+
+
+class _ColumnarBlockData(object):
+    """
+    Columnar representation of the data of all blocks in a block
+    structure, for compact serialization.
+
+    Each collected xBlock field, and each transformer's block field,
+    is stored as a column: an array with the index of each block's
+    value in a table of the column's distinct values.
+
+    The columns of each transformer are pickled separately and are
+    unpickled only when the transformer's data is first accessed, so
+    the data of transformers that are not run is never deserialized.
+    """
+    # Index stored in a column for blocks that have no value.
+    MISSING = -1
+
+    # Type code of the arrays of value indices.
+    TYPE_CODE = 'i'
+
+    def __init__(self, block_data_map):
+        """
+        Arguments:
+            block_data_map (dict({UsageKey: BlockData})) - Internal
+                map of a block's usage key to its collected data.
+        """
+        # list [UsageKey]
+        self.usage_keys = list(block_data_map)
+        blocks = [block_data_map[usage_key] for usage_key in self.usage_keys]
+
+        # dict {field_name: (list [value], array [int])}
+        self.xblock_field_columns = self._build_columns([block.fields for block in blocks])
+
+        transformer_block_data = defaultdict(dict)
+        for index, block in enumerate(blocks):
+            for transformer_name, transformer_data in block.transformer_data.iteritems():
+                transformer_block_data[transformer_name][index] = transformer_data
+
+        # dict {transformer_name: string}
+        self._serialized_transformer_columns = {
+            transformer_name: pickle.dumps(
+                self._build_transformer_columns(block_data_by_index, len(blocks)),
+                pickle.HIGHEST_PROTOCOL,
+            )
+            for transformer_name, block_data_by_index in transformer_block_data.iteritems()
+        }
+        self._transformer_columns = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_transformer_columns']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._transformer_columns = {}
+
+    @property
+    def transformer_names(self):
+        """
+        Returns the names of the transformers that have block data.
+        """
+        return self._serialized_transformer_columns.keys()
+
+    def to_block_data_map(self):
+        """
+        Returns the dict({UsageKey: BlockData}) represented by this
+        instance.  The transformer data of the blocks is loaded lazily.
+        """
+        block_fields = self._read_columns(self.xblock_field_columns, range(len(self.usage_keys)))
+        block_data_map = {}
+        for index, usage_key in enumerate(self.usage_keys):
+            block_data = BlockData(usage_key)
+            block_data.fields = block_fields[index]
+            block_data.transformer_data = _LazyTransformerDataMap(self, index)
+            block_data_map[usage_key] = block_data
+        return block_data_map
+
+    def get_transformer_data(self, transformer_name, block_index):
+        """
+        Returns the TransformerData of the given transformer for the
+        block at the given index, or None if the block has none.
+        """
+        try:
+            block_present, field_columns = self._transformer_columns[transformer_name]
+        except KeyError:
+            try:
+                serialized_columns = self._serialized_transformer_columns[transformer_name]
+            except KeyError:
+                return None
+            block_present, field_columns = self._transformer_columns[transformer_name] = pickle.loads(
+                serialized_columns
+            )
+
+        if not block_present[block_index]:
+            return None
+        transformer_data = TransformerData()
+        transformer_data.fields = self._read_columns(field_columns, [block_index])[0]
+        return transformer_data
+
+    @classmethod
+    def _build_transformer_columns(cls, block_data_by_index, num_blocks):
+        """
+        Returns a tuple of an array marking the blocks that have data
+        for a transformer and the columns of the transformer's fields.
+
+        Arguments:
+            block_data_by_index (dict({int: TransformerData})) - The
+                transformer's data of each block that has any, by the
+                block's index.
+
+            num_blocks (int) - The number of blocks in the structure.
+        """
+        block_present = array('b', [0]) * num_blocks
+        fields_per_block = [{}] * num_blocks
+        for index, transformer_data in block_data_by_index.iteritems():
+            block_present[index] = 1
+            fields_per_block[index] = transformer_data.fields
+        return block_present, cls._build_columns(fields_per_block)
+
+    @classmethod
+    def _build_columns(cls, fields_per_block):
+        """
+        Returns a dict mapping each field name in the given list of
+        per-block fields dicts to its column: a tuple of the list of the
+        field's distinct values and the array of each block's value index.
+        """
+        columns = {}
+        for index, fields in enumerate(fields_per_block):
+            for field_name, value in fields.iteritems():
+                try:
+                    values, value_indices, interned = columns[field_name]
+                except KeyError:
+                    values, value_indices, interned = columns[field_name] = (
+                        [], array(cls.TYPE_CODE, [cls.MISSING]) * len(fields_per_block), {},
+                    )
+                value_indices[index] = cls._intern(value, values, interned)
+        return {
+            field_name: (values, value_indices)
+            for field_name, (values, value_indices, _) in columns.iteritems()
+        }
+
+    # Types of the values that are stored only once per column.  Values
+    # of other types, such as datetimes with different timezones or 0.0
+    # and -0.0, may compare equal without being interchangeable.
+    INTERNED_TYPES = frozenset([str, unicode, bool, int, long, type(None)])
+
+    @classmethod
+    def _intern(cls, value, values, interned):
+        """
+        Returns the index of the given value in the given list of
+        values, appending it if it is not there yet.  Values of the
+        INTERNED_TYPES are stored only once.
+        """
+        value_type = type(value)
+        if value_type in cls.INTERNED_TYPES:
+            # Include the type so that equal values of different
+            # types, such as True and 1, are not conflated.
+            key = (value_type, value)
+            try:
+                return interned[key]
+            except KeyError:
+                interned[key] = len(values)
+        values.append(value)
+        return len(values) - 1
+
+    @classmethod
+    def _read_columns(cls, columns, block_indices):
+        """
+        Returns a list with the fields dict of each of the blocks at the
+        given indices, read from the given columns.
+        """
+        fields_per_block = [{} for _ in block_indices]
+        for field_name, (values, value_indices) in columns.iteritems():
+            for fields, block_index in zip(fields_per_block, block_indices):
+                value_index = value_indices[block_index]
+                if value_index != cls.MISSING:
+                    fields[field_name] = values[value_index]
+        return fields_per_block
+
 
 class BlockStructureBlockData(BlockStructure):
     """
     Subclass of BlockStructure that is responsible for managing block
     and transformer data.
+
+    Copies of a BlockStructureBlockData share their blocks' relations and
+    data until either side modifies them through this class's methods, at
+    which point only the modified block's relations or data are copied.
+    So values read from a block structure should not be modified in place.
     """
     # The latest version of the data structure of this class. Incrementally
     # update this value whenever the data structure changes. Dependent storage
     # layers can then use this value when serializing/deserializing block
     # structures, and invalidating any previously cached/stored data.
-    VERSION = 2
+    VERSION = 4
 
     def __init__(self, root_block_usage_key):
         super(BlockStructureBlockData, self).__init__(root_block_usage_key)
@@ -411,21 +780,36 @@ class BlockStructureBlockData(BlockStructure):
         # dict {UsageKey: BlockData}
         self._block_data_map = {}
 
+        # Set of usage keys of the blocks whose BlockData are owned by
+        # this structure, once its BlockData are shared with another
+        # structure (see copy).  Any other BlockData are copied before
+        # being modified.  None if this structure owns all of its BlockData.
+        # set(UsageKey) or None
+        self._owned_block_data = None
+
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
     def copy(self):
         """
         Returns a new instance of BlockStructureBlockData with a
-        deep-copy of this instance's contents.
+        copy-on-write view of this instance's contents.
+
+        The blocks' relations and data are shared by both instances
+        until either of them modifies a block, so copying a collected
+        structure costs only the copying of its top-level maps.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        new_copy = BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
-            deepcopy(self.transformer_data),
-            deepcopy(self._block_data_map),
+            dict(self._block_relations),
+            self.transformer_data.copy(),
+            dict(self._block_data_map),
         )
+        for block_structure in (self, new_copy):
+            block_structure._owned_relations = set()  # pylint: disable=protected-access
+            block_structure._owned_block_data = set()  # pylint: disable=protected-access
+        return new_copy
 
     def iteritems(self):
         """
@@ -577,8 +961,11 @@ class BlockStructureBlockData(BlockStructure):
                 whose data entry is to be deleted.
         """
         try:
-            transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
-            delattr(transformer_block_data, key)
+            self.get_transformer_block_data(usage_key, transformer)
+        except KeyError:
+            return
+        try:
+            delattr(self._get_or_create_block(usage_key).transformer_data[transformer], key)
         except (AttributeError, KeyError):
             pass
 
@@ -607,11 +994,11 @@ class BlockStructureBlockData(BlockStructure):
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._get_writable_relations(child).parents.remove(usage_key)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._get_writable_relations(parent).children.remove(usage_key)
 
         # Remove block.
         self._block_relations.pop(usage_key, None)
@@ -736,17 +1123,26 @@ class BlockStructureBlockData(BlockStructure):
 
     def _get_or_create_block(self, usage_key):
         """
-        Returns the BlockData associated with the given usage_key.
-        If not found, creates and returns a new BlockData and
-        maps it to the given key.
+        Returns the BlockData associated with the given usage_key,
+        for modification.  If not found, creates and returns a new
+        BlockData and maps it to the given key.  If shared with another
+        structure, replaces it with a copy owned by this structure.
         """
         try:
-            return self._block_data_map[usage_key]
+            block_data = self._block_data_map[usage_key]
         except KeyError:
             block_data = BlockData(usage_key)
             self._block_data_map[usage_key] = block_data
+            if self._owned_block_data is not None:
+                self._owned_block_data.add(usage_key)
             return block_data
 
+        if self._owned_block_data is not None and usage_key not in self._owned_block_data:
+            block_data = block_data.copy()
+            self._block_data_map[usage_key] = block_data
+            self._owned_block_data.add(usage_key)
+        return block_data
+
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
     """
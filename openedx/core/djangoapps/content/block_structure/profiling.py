@@ -0,0 +1,233 @@
+"""
+Module for profiling the collect and transform phases of
+BlockStructureTransformers.
+
+Each phase of each transformer is measured for its wall time, the number
+of blocks it removed from the block structure and, when memory tracing is
+enabled, the change in memory allocated while it ran.  The measurements
+are reported as monitoring custom metrics, when the
+PROFILE_BLOCK_STRUCTURE_TRANSFORMERS feature is enabled, and recorded by
+the active TransformerProfiler, if any.
+"""
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from openedx.core.djangoapps import monitoring_utils
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # pylint: disable=invalid-name
+
+
+# Names of the profiled phases.
+COLLECT = u'collect'
+TRANSFORM = u'transform'
+FILTER = u'filter'
+
+# Name under which the single traversal that applies the block filters
+# of all filtering transformers is profiled.
+ALL_FILTERS = u'all_filters'
+
+
+TransformerProfile = namedtuple(
+    'TransformerProfile',
+    ['phase', 'transformer_name', 'duration', 'num_blocks_removed', 'memory_delta'],
+)
+
+
+class TransformerProfiler(object):
+    """
+    Context manager that records a TransformerProfile for each transformer
+    phase that runs in the current thread while it is active.
+
+    Usage:
+        with TransformerProfiler(trace_memory=True) as profiler:
+            get_course_blocks(user, course_usage_key)
+        for profile in profiler.profiles:
+            ...
+    """
+    _active = threading.local()
+
+    def __init__(self, trace_memory=False):
+        """
+        Arguments:
+            trace_memory (bool) - Whether to also record the memory
+                allocated by each transformer phase.  Requires the
+                tracemalloc module.
+        """
+        if trace_memory and tracemalloc is None:
+            raise ValueError(u'Memory tracing requires the tracemalloc module.')
+        self.trace_memory = trace_memory
+        self.profiles = []
+        self._started_tracing = False
+
+        # Profiled block filters not yet recorded, with their
+        # transformers' names.
+        # list [(string, _ProfiledFilter)]
+        self._pending_filters = []
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._active.profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._active.profiler = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @classmethod
+    def current(cls):
+        """
+        Returns the TransformerProfiler active in the current thread, if any.
+        """
+        return getattr(cls._active, 'profiler', None)
+
+    def totals(self):
+        """
+        Returns a list of TransformerProfiles with the sums of all the
+        profiles recorded for each phase of each transformer, in the order
+        they were first recorded.
+        """
+        keys = []
+        totals = {}
+        for profile in self.profiles:
+            key = (profile.phase, profile.transformer_name)
+            if key in totals:
+                total = totals[key]
+                totals[key] = total._replace(
+                    duration=total.duration + profile.duration,
+                    num_blocks_removed=total.num_blocks_removed + profile.num_blocks_removed,
+                    memory_delta=_sum_or_none(total.memory_delta, profile.memory_delta),
+                )
+            else:
+                keys.append(key)
+                totals[key] = profile
+        return [totals[phase_key] for phase_key in keys]
+
+
+@contextmanager
+def profile_transformer(phase, transformer_name, block_structure):
+    """
+    Context manager that profiles the given phase of the named
+    transformer run on the given block structure.
+    """
+    profiler = TransformerProfiler.current()
+    report_metrics = settings.FEATURES.get('PROFILE_BLOCK_STRUCTURE_TRANSFORMERS', False)
+    if not profiler and not report_metrics:
+        yield
+        return
+
+    num_blocks = len(block_structure)
+    memory = _traced_memory()
+    start_time = time.time()
+    yield
+    profile = TransformerProfile(
+        phase=phase,
+        transformer_name=transformer_name,
+        duration=time.time() - start_time,
+        num_blocks_removed=num_blocks - len(block_structure),
+        memory_delta=_sum_or_none(_traced_memory(), -memory if memory is not None else None),
+    )
+    _record(profile, profiler, report_metrics)
+
+
+def profile_filters(transformer_name, block_filters):
+    """
+    Returns the given block filters of the named transformer, wrapped to
+    measure their calls when a TransformerProfiler is active.  Their
+    profiles are recorded by record_filter_profiles.
+
+    The filters of all filtering transformers are applied in a single
+    traversal, so they are profiled per call.  Memory is not traced for
+    filters.
+    """
+    profiler = TransformerProfiler.current()
+    if not profiler:
+        return block_filters
+
+    profiled_filters = [_ProfiledFilter(block_filter) for block_filter in block_filters]
+    profiler._pending_filters.extend(  # pylint: disable=protected-access
+        (transformer_name, profiled_filter) for profiled_filter in profiled_filters
+    )
+    return profiled_filters
+
+
+def record_filter_profiles():
+    """
+    Records a TransformerProfile for the block filters of each transformer
+    profiled since the last call, in the active TransformerProfiler.
+    """
+    profiler = TransformerProfiler.current()
+    if not profiler:
+        return
+
+    for transformer_name, profiled_filter in profiler._pending_filters:  # pylint: disable=protected-access
+        _record(
+            TransformerProfile(
+                FILTER, transformer_name, profiled_filter.duration, profiled_filter.num_blocks_removed, None,
+            ),
+            profiler,
+            report_metrics=False,
+        )
+    profiler._pending_filters = []  # pylint: disable=protected-access
+
+
+class _ProfiledFilter(object):
+    """
+    Block filter wrapper that measures the calls to the filter.
+    """
+    def __init__(self, block_filter):
+        self.block_filter = block_filter
+        self.duration = 0.0
+        self.num_blocks_removed = 0
+
+    def __call__(self, block_key):
+        start_time = time.time()
+        retained = self.block_filter(block_key)
+        self.duration += time.time() - start_time
+        if not retained:
+            self.num_blocks_removed += 1
+        return retained
+
+
+def _record(profile, profiler, report_metrics):
+    """
+    Records the given profile in the given profiler, if any, and reports
+    it as monitoring custom metrics, if requested.
+    """
+    if profiler:
+        profiler.profiles.append(profile)
+    if report_metrics:
+        metric_prefix = u'block_structure.{}.{}'.format(profile.phase, profile.transformer_name)
+        monitoring_utils.accumulate(metric_prefix + u'.duration_ms', int(profile.duration * 1000))
+        monitoring_utils.accumulate(metric_prefix + u'.num_blocks_removed', profile.num_blocks_removed)
+        if profile.memory_delta is not None:
+            monitoring_utils.accumulate(metric_prefix + u'.memory_delta_bytes', profile.memory_delta)
+
+
+def _traced_memory():
+    """
+    Returns the size of the memory currently traced by tracemalloc,
+    or None if memory is not being traced.
+    """
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return None
+
+
+def _sum_or_none(value1, value2):
+    """
+    Returns the sum of the given values, or None if either is None.
+    """
+    if value1 is None or value2 is None:
+        return None
+    return value1 + value2
@@ -7,7 +7,7 @@ from logging import getLogger
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
 from . import config
-from .block_structure import BlockStructureBlockData
+from .block_structure import BlockStructureBlockData, _ColumnarBlockData, _CompactBlockRelations
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
@@ -88,6 +88,7 @@ class BlockStructureStore(object):
             found.
         """
         bs_model = self._get_model(root_block_usage_key)
+        self._verify_schema_version(bs_model)
 
         try:
             serialized_data = self._get_from_cache(bs_model)
@@ -160,6 +161,20 @@ class BlockStructureStore(object):
         self._cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
         logger.info("BlockStructure: Added to cache; %s, size: %d", bs_model, len(serialized_data))
 
+    def _verify_schema_version(self, bs_model):
+        """
+        Verifies the data for the given BlockStructureModel was
+        stored with the current block structure schema.
+        Raises:
+             BlockStructureNotFound if stored with another schema,
+             so that the block structure is collected again.
+        """
+        if not _is_storage_backing_enabled():
+            return
+        if bs_model.block_structure_schema_version != unicode(BlockStructureBlockData.VERSION):
+            logger.info("BlockStructure: Stored with an outdated schema; %s.", bs_model)
+            raise BlockStructureNotFound(bs_model.data_usage_key)
+
     def _get_from_cache(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -194,9 +209,9 @@ class BlockStructureStore(object):
         Serializes the data for the given block_structure.
         """
         data_to_cache = (
-            block_structure._block_relations,
+            _CompactBlockRelations(block_structure._block_relations),
             block_structure.transformer_data,
-            block_structure._block_data_map,
+            _ColumnarBlockData(block_structure._block_data_map),
         )
         return zpickle(data_to_cache)
 
@@ -204,12 +219,19 @@ class BlockStructureStore(object):
         """
         Deserializes the given data and returns the parsed block_structure.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+        compact_block_relations, transformer_data, columnar_block_data = zunpickle(serialized_data)
+        if not (
+                isinstance(compact_block_relations, _CompactBlockRelations) and
+                isinstance(columnar_block_data, _ColumnarBlockData)
+        ):
+            # Serialized in the format of a previous schema version.
+            logger.info("BlockStructure: Serialized in an outdated format; %s.", root_block_usage_key)
+            raise BlockStructureNotFound(root_block_usage_key)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
-            block_relations,
+            compact_block_relations.to_block_relations(),
             transformer_data,
-            block_data_map,
+            columnar_block_data.to_block_data_map(),
         )
 
     @staticmethod
@@ -4,14 +4,23 @@ Tests for block_structure.py
 # pylint: disable=protected-access
 from collections import namedtuple
 from copy import deepcopy
+from datetime import datetime
+import cPickle as pickle
 import ddt
 import itertools
+import pytz
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from openedx.core.lib.graph_traversals import traverse_post_order
 
-from ..block_structure import BlockStructure, BlockStructureModulestoreData
+from ..block_structure import (
+    BlockData,
+    BlockStructure,
+    BlockStructureModulestoreData,
+    _ColumnarBlockData,
+    _CompactBlockRelations,
+)
 from ..exceptions import TransformerException
 from .helpers import MockXBlock, MockTransformer, ChildrenMapTestMixin
 
@@ -224,6 +233,46 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
+    @ddt.data(
+        [],
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_compact_relations(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        block_relations = _CompactBlockRelations(block_structure._block_relations).to_block_relations()
+
+        self.assertSetEqual(set(block_relations), set(block_structure))
+        for block in block_structure:
+            self.assertEquals(block_relations[block].children, block_structure.get_children(block))
+            self.assertEquals(block_relations[block].parents, block_structure.get_parents(block))
+
+    def test_columnar_block_data(self):
+        start = datetime(2017, 1, 1, 12, tzinfo=pytz.utc)
+        block_values = [
+            (start, 0.0, True, u'Unit'),
+            (start.astimezone(pytz.timezone('Europe/Paris')), -0.0, 1, u'Unit'),
+        ]
+        block_data_map = {}
+        for block_id, values in enumerate(block_values):
+            block_data = block_data_map[block_id] = BlockData(block_id)
+            block_data.fields = dict(zip(['start', 'weight', 'graded', 'display_name'], values))
+
+        columnar_block_data = pickle.loads(pickle.dumps(_ColumnarBlockData(block_data_map), pickle.HIGHEST_PROTOCOL))
+        block_fields = {
+            block_id: block_data.fields
+            for block_id, block_data in columnar_block_data.to_block_data_map().iteritems()
+        }
+
+        # Values that are equal but not interchangeable are kept apart.
+        for block_id, values in enumerate(block_values):
+            start, weight, graded, display_name = values
+            self.assertEqual(block_fields[block_id]['start'].tzinfo.zone, start.tzinfo.zone)
+            self.assertEqual(repr(block_fields[block_id]['weight']), repr(weight))
+            self.assertIs(type(block_fields[block_id]['graded']), type(graded))
+            self.assertEqual(block_fields[block_id]['display_name'], display_name)
+
     def test_copy(self):
         def _set_value(structure, value):
             """
@@ -268,3 +317,30 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+    def test_copy_on_write(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        for block in block_structure:
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', 'original_value')
+        new_copy = block_structure.copy()
+
+        # unmodified blocks are shared by both structures
+        for block in block_structure:
+            self.assertIs(block_structure._block_relations[block], new_copy._block_relations[block])
+            self.assertIs(block_structure[block], new_copy[block])
+
+        # only the modified blocks are copied
+        new_copy.set_transformer_block_field(1, 'transformer', 'test_key', 'new_value')
+        new_copy.set_root_block(2)
+        self.assertIsNot(block_structure[1], new_copy[1])
+        self.assertIsNot(block_structure._block_relations[2], new_copy._block_relations[2])
+        self.assertIs(block_structure[2], new_copy[2])
+        self.assertIs(block_structure._block_relations[3], new_copy._block_relations[3])
+
+        self.assertEquals(block_structure.get_transformer_block_field(1, 'transformer', 'test_key'), 'original_value')
+        self.assertEquals(block_structure.get_parents(2), [1])
+        self.assertEquals(new_copy.get_parents(2), [])
+
+        new_copy.remove_transformer_block_field(1, 'transformer', 'test_key')
+        self.assertIsNone(new_copy.get_transformer_block_field(1, 'transformer', 'test_key'))
+        self.assertEquals(block_structure.get_transformer_block_field(1, 'transformer', 'test_key'), 'original_value')
@@ -1,14 +1,21 @@
 """
 Tests for block_structure/cache.py
 """
+# pylint: disable=protected-access
+import itertools
+
 import ddt
+from mock import patch
 from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import zpickle
 
+from ..block_structure import _CompactBlockRelations
 from ..config import STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
+from ..models import BlockStructureModel
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
@@ -59,6 +66,46 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             self.assertIsNotNone(stored_value)
             self.assert_block_structure(stored_value, self.children_map)
 
+    def test_transformer_data_loaded_lazily(self):
+        self.store.add(self.block_structure)
+        stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        columnar_block_data = stored_value[self.block_key_factory(0)].transformer_data._columnar_block_data
+        self.assertEquals(columnar_block_data._transformer_columns, {})
+
+        self.assertEquals(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+        self.assertIsNone(stored_value.get_transformer_block_field(self.block_key_factory(1), MockTransformer, 'test'))
+        self.assertEquals(columnar_block_data._transformer_columns.keys(), [MockTransformer.name()])
+
+    @ddt.data(*itertools.product((True, False), (2, 3)))
+    @ddt.unpack
+    def test_get_previous_format(self, with_storage_backing, version):
+        if version == 2:
+            # Block relations and block data serialized as dicts
+            block_relations = self.block_structure._block_relations
+        else:
+            # Compact block relations, block data serialized as a dict
+            block_relations = _CompactBlockRelations(self.block_structure._block_relations)
+        previous_format = (
+            block_relations,
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,
+        )
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with patch.object(self.store, '_serialize', return_value=zpickle(previous_format)):
+                self.store.add(self.block_structure)
+            with self.assertRaises(BlockStructureNotFound):
+                self.store.get(self.block_structure.root_block_usage_key)
+
+    def test_get_previous_schema_version(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            BlockStructureModel.objects.update(block_structure_schema_version=u'2')
+            with self.assertRaises(BlockStructureNotFound):
+                self.store.get(self.block_structure.root_block_usage_key)
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
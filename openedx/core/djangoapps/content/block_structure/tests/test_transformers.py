@@ -7,6 +7,7 @@ from unittest import TestCase
 
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerException, TransformerDataIncompatible
+from ..profiling import ALL_FILTERS, FILTER, TRANSFORM, TransformerProfiler
 from ..transformers import BlockStructureTransformers
 from .helpers import (
     ChildrenMapTestMixin, MockTransformer, MockFilteringTransformer, mock_registered_transformers
@@ -71,6 +72,28 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    def test_transform_profiled(self):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+
+        with TransformerProfiler() as profiler:
+            self.transformers.transform(block_structure)
+        self.assertIsNone(TransformerProfiler.current())
+
+        self.assertEquals(
+            [(profile.phase, profile.transformer_name) for profile in profiler.totals()],
+            [
+                (TRANSFORM, 'MockFilteringTransformer'),
+                (TRANSFORM, ALL_FILTERS),
+                (FILTER, 'MockFilteringTransformer'),
+                (TRANSFORM, 'MockTransformer'),
+            ],
+        )
+        for profile in profiler.totals():
+            self.assertGreaterEqual(profile.duration, 0)
+            self.assertEquals(profile.num_blocks_removed, 0)
+            self.assertIsNone(profile.memory_delta)
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
@@ -5,6 +5,14 @@ import functools
 from logging import getLogger
 
 from .exceptions import TransformerException, TransformerDataIncompatible
+from .profiling import (
+    ALL_FILTERS,
+    COLLECT,
+    TRANSFORM,
+    profile_filters,
+    profile_transformer,
+    record_filter_profiles,
+)
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
 
@@ -77,7 +85,8 @@ class BlockStructureTransformers(object):
         """
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+            with profile_transformer(COLLECT, transformer.name(), block_structure):
+                transformer.collect(block_structure)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
@@ -128,14 +137,18 @@ class BlockStructureTransformers(object):
 
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            with profile_transformer(TRANSFORM, transformer.name(), block_structure):
+                transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+            filters.extend(profile_filters(transformer.name(), transformer_filters))
 
         combined_filters = functools.reduce(
             self._filter_chain,
             filters,
             block_structure.create_universal_filter()
         )
-        block_structure.filter_topological_traversal(combined_filters)
+        with profile_transformer(TRANSFORM, ALL_FILTERS, block_structure):
+            block_structure.filter_topological_traversal(combined_filters)
+        record_filter_profiles()
 
     def _filter_chain(self, accumulated, additional):
         """
@@ -150,4 +163,5 @@ class BlockStructureTransformers(object):
         method from the given transformers.
         """
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            with profile_transformer(TRANSFORM, transformer.name(), block_structure):
+                transformer.transform(self.usage_info, block_structure)
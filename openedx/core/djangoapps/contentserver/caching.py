@@ -1,12 +1,21 @@
 """
 Helper functions for caching course assets.
 """
+import hashlib
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
 from xmodule.contentstore.content import STATIC_CONTENT_VERSION
 
+log = logging.getLogger(__name__)
+
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
 try:
@@ -48,3 +57,142 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+class DiskContentCache(object):
+    """
+    Bounded LRU cache of the data of course assets in files on local disk, shared by all
+    the processes using the same directory.
+
+    Files are named after the asset's location and content digest, so a changed asset is
+    cached under a new name and its outdated file eventually evicted.  The least recently
+    used files are evicted once the total size of the cached files exceeds the maximum
+    size.  Failures to read or write the cache are logged and otherwise ignored.
+    """
+    # Fraction of the maximum size to which the cache is shrunk by evictions, so that
+    # evictions do not happen on every write to a full cache.
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, directory, max_size):
+        """
+        Arguments:
+            directory (str): The directory in which to store the cached files.
+            max_size (int): The maximum total size, in bytes, of the cached files.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        # This process' estimate of the total size of the cached files, or None if
+        # it hasn't been measured yet.
+        self._size = None
+        self._lock = threading.Lock()
+
+    def open(self, content):
+        """
+        Returns the cached file of the given content, opened for reading, or None if
+        it isn't cached.
+        """
+        path = self._path(content)
+        if path is None:
+            return None
+        try:
+            cached_file = open(path, 'rb')
+            # Mark as most recently used
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        return cached_file
+
+    def store(self, content):
+        """
+        Caches the data of the given content, unless it is too large to be cached, and
+        returns the cached file opened for reading, or None if it wasn't cached.
+        """
+        path = self._path(content)
+        if path is None or content.length is None or content.length > self.max_size * (1 - self.EVICTION_TARGET):
+            return None
+
+        temp_path = u'{}.{}.tmp'.format(path, uuid.uuid4().hex)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(temp_path, 'wb') as temp_file:
+                for chunk in content.stream_data():
+                    temp_file.write(chunk)
+            os.rename(temp_path, path)
+            cached_file = open(path, 'rb')
+        except (IOError, OSError):
+            log.exception(u'Failed to cache the content of %s on disk', unicode(content.location))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+        self._add_size(content.length)
+        return cached_file
+
+    def _path(self, content):
+        """
+        Returns the path of the cached file of the given content, or None if the content
+        has no digest.
+        """
+        if not content.content_digest:
+            return None
+        name = hashlib.sha1(u'{}@{}'.format(content.location, content.content_digest).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name[:2], name)
+
+    def _add_size(self, size):
+        """
+        Adds size to the estimated total size of the cached files, and evicts files if
+        the estimate exceeds the maximum size.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """
+        Measures the total size of the cached files, written by any process, and evicts
+        the least recently used files if it exceeds the maximum size.
+        """
+        cached_files = []
+        for dir_path, __, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached_files.append((stat.st_mtime, stat.st_size, path))
+
+        self._size = sum(size for __, size, __ in cached_files)
+        if self._size <= self.max_size:
+            return
+
+        for __, size, path in sorted(cached_files):
+            if self._size <= self.max_size * self.EVICTION_TARGET:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+
+_DISK_CONTENT_CACHES = {}
+
+
+def get_disk_content_cache():
+    """
+    Returns the DiskContentCache configured by the CONTENTSERVER_DISK_CACHE_DIR and
+    CONTENTSERVER_DISK_CACHE_MAX_SIZE settings, or None if it is disabled.
+    """
+    directory = getattr(settings, 'CONTENTSERVER_DISK_CACHE_DIR', None)
+    max_size = getattr(settings, 'CONTENTSERVER_DISK_CACHE_MAX_SIZE', 0)
+    if not directory or not max_size:
+        return None
+
+    key = (directory, max_size)
+    if key not in _DISK_CONTENT_CACHES:
+        _DISK_CONTENT_CACHES[key] = DiskContentCache(directory, max_size)
+    return _DISK_CONTENT_CACHES[key]
@@ -4,23 +4,24 @@ Middleware to serve assets.
 
 import logging
 import datetime
+import uuid
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import get_cached_content, get_disk_content_cache, set_cached_content
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -31,6 +32,12 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this many bytes are loaded into memory and cached in the django cache.
+MAX_IN_MEMORY_CONTENT_LENGTH = 1048576
+
+# Requests for more ranges than this are answered with the full content.
+MAX_BYTE_RANGES = 20
+
 
 class StaticContentServer(object):
     """
@@ -107,25 +114,41 @@ class StaticContentServer(object):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
-            # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            # if this asset has changed since then.  If-None-Match takes precedence over
+            # If-Modified-Since.
+            etag = get_etag(content)
+            if 'HTTP_IF_NONE_MATCH' in request.META:
+                if etag is not None and etag_matches(request.META['HTTP_IF_NONE_MATCH'], etag):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+            elif 'HTTP_IF_MODIFIED_SINCE' in request.META:
+                last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
-            # *** File streaming within a byte range ***
+            # Serve large assets from the local disk cache, if there is one, rather than
+            # reading them from GridFS.
+            cached_file = None
+            if isinstance(content, StaticContentStream):
+                disk_cache = get_disk_content_cache()
+                if disk_cache is not None:
+                    cached_file = disk_cache.open(content) or disk_cache.store(content)
+                    if cached_file is not None:
+                        content = content.with_stream(cached_file)
+                if newrelic:
+                    newrelic.agent.add_custom_parameter('contentserver.from_disk_cache', cached_file is not None)
+
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]...]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
+            # or, for multiple ranges, a multipart/byteranges body with a Content-Range per part.
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -138,36 +161,56 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Don't let a request make us stream many overlapping ranges of the content.
+                        # We send back the full content instead.
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"More than %d ranges in Range header: %s for content: %s",
+                            MAX_BYTE_RANGES, header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
+                        # Unsatisfiable ranges are ignored, unless none of the ranges is satisfiable.
+                        satisfiable_ranges = [
+                            (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                        ]
+                        if not satisfiable_ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if len(satisfiable_ranges) == 1:
+                            first, last = satisfiable_ranges[0]
+                            response = StreamingHttpResponse(content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            # According to Http/1.1 spec content for multiple ranges should be sent as a
+                            # multipart message.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            boundary = uuid.uuid4().hex
+                            parts, length = get_multipart_byteranges(content, satisfiable_ranges, boundary)
+                            response = StreamingHttpResponse(
+                                parts, content_type='multipart/byteranges; boundary={}'.format(boundary)
                             )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            response['Content-Length'] = str(length)
+                        response.status_code = 206  # Partial Content
+
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+                            newrelic.agent.add_custom_parameter('contentserver.num_ranges', len(satisfiable_ranges))
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if cached_file is not None:
+                    # Lets the server send the file with sendfile, where it is available.
+                    response = FileResponse(cached_file)
+                elif isinstance(content, StaticContentStream):
+                    response = StreamingHttpResponse(content.stream_data())
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -176,7 +219,10 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            if not response['Content-Type'].startswith('multipart/byteranges'):
+                response['Content-Type'] = content.content_type
+            if etag is not None:
+                response['ETag'] = etag
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -283,13 +329,80 @@ class StaticContentServer(object):
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
             # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            if content.length is not None and content.length < MAX_IN_MEMORY_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
         return content
 
 
+def get_etag(content):
+    """
+    Returns the entity tag of the given content, based on its digest, or None if it has no digest.
+    """
+    content_digest = getattr(content, "content_digest", None)
+    if not content_digest:
+        return None
+    return '"{}"'.format(content_digest)
+
+
+def etag_matches(header_value, etag):
+    """
+    Returns whether the given If-None-Match header value matches the given entity tag.
+
+    Entity tags are compared with the weak comparison function, as required for If-None-Match.
+    See spec for details: https://tools.ietf.org/html/rfc7232#section-3.2
+    """
+    for requested_etag in header_value.split(','):
+        requested_etag = requested_etag.strip()
+        if requested_etag == '*':
+            return True
+        if requested_etag.startswith('W/'):
+            requested_etag = requested_etag[2:]
+        if requested_etag == etag:
+            return True
+    return False
+
+
+def get_multipart_byteranges(content, ranges, boundary):
+    """
+    Returns an iterator over a multipart/byteranges body containing the given ranges of
+    the given content, separated by the given boundary, and the length of that body.
+
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+    """
+    part_header_format = (
+        '--{boundary}\r\n'
+        'Content-Type: {content_type}\r\n'
+        'Content-Range: bytes {first}-{last}/{length}\r\n'
+        '\r\n'
+    )
+    part_headers = [
+        part_header_format.format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        )
+        for first, last in ranges
+    ]
+    closing = '--{boundary}--\r\n'.format(boundary=boundary)
+    length = len(closing) + sum(
+        len(part_header) + (last - first + 1) + len('\r\n')
+        for part_header, (first, last) in zip(part_headers, ranges)
+    )
+
+    def parts():
+        """
+        Yields the parts of the body.
+        """
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield '\r\n'
+        yield closing
+
+    return parts(), length
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -5,11 +5,16 @@ import copy
 
 import datetime
 import ddt
+import hashlib
 import logging
+import os
+import shutil
 import unittest
+from tempfile import mkdtemp
 from uuid import uuid4
 
 from django.conf import settings
+from django.http import FileResponse
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -27,6 +32,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import DiskContentCache
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -242,13 +248,39 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message
+        with a part per range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        parts = body.split('--{}'.format(boundary))
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        data = self.contentstore.find(self.unlocked_asset).data
+        for part, (first, last) in zip(parts[1:-1], [(first_byte, last_byte), (self.length_unlocked - 100, None)]):
+            headers, part_data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last if last is not None else self.length_unlocked - 1, length=self.length_unlocked
+            ), headers)
+            self.assertEqual(part_data, data[first:(last + 1 if last is not None else None)] + '\r\n')
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_BYTE_RANGES', 1)
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a request for too many ranges outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-10, -100')
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -285,6 +317,53 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_etag(self):
+        """
+        Test that the ETag of an asset is its digest, and that requests with a matching
+        If-None-Match header output 304 Not Modified.
+        """
+        content = self.contentstore.find(self.unlocked_asset, as_stream=True)
+        etag = '"{}"'.format(content.content_digest)
+
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"{}", W/{}'.format(FAKE_MD5_HASH, etag))
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        # If-Modified-Since is ignored when If-None-Match is given.
+        resp = self.client.get(
+            self.url_unlocked,
+            HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH),
+            HTTP_IF_MODIFIED_SINCE=content.last_modified_at.strftime(HTTP_DATE_FORMAT),
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_IN_MEMORY_CONTENT_LENGTH', 0)
+    def test_disk_cache(self):
+        """
+        Test that assets are cached on disk, and served from the cached files.
+        """
+        cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        data = self.contentstore.find(self.unlocked_asset).data
+
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=cache_dir, CONTENTSERVER_DISK_CACHE_MAX_SIZE=1024 * 1024):
+            for __ in range(2):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertIsInstance(resp, FileResponse)
+                self.assertEqual(''.join(resp.streaming_content), data)
+
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-20')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(''.join(resp.streaming_content), data[10:21])
+
+        cached_files = [file_name for __, __, file_names in os.walk(cache_dir) for file_name in file_names]
+        self.assertEqual(len(cached_files), 1)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -447,3 +526,57 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+class FakeContent(object):
+    """
+    Content with the attributes used by DiskContentCache.
+    """
+    def __init__(self, name, data):
+        self.location = name
+        self.content_digest = hashlib.md5(data).hexdigest()
+        self.length = len(data)
+        self.data = data
+
+    def stream_data(self):
+        """
+        Yields the content's data.
+        """
+        yield self.data
+
+
+class DiskContentCacheTestCase(unittest.TestCase):
+    """
+    Tests for DiskContentCache.
+    """
+    def setUp(self):
+        super(DiskContentCacheTestCase, self).setUp()
+        self.cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.cache = DiskContentCache(self.cache_dir, max_size=1000)
+
+    def test_store_and_open(self):
+        content = FakeContent('asset', 'a' * 10)
+        self.assertIsNone(self.cache.open(content))
+        self.assertEqual(self.cache.store(content).read(), content.data)
+        self.assertEqual(self.cache.open(content).read(), content.data)
+
+        # A changed asset isn't served from the cached file of its previous version.
+        self.assertIsNone(self.cache.open(FakeContent('asset', 'b' * 10)))
+
+    def test_too_large(self):
+        self.assertIsNone(self.cache.store(FakeContent('asset', 'a' * 500)))
+
+    def test_eviction(self):
+        contents = [FakeContent('asset{}'.format(index), chr(ord('a') + index) * 90) for index in range(12)]
+        for index, content in enumerate(contents[:11]):
+            self.cache.store(content)
+            # Make the modification times distinct and increasing.
+            os.utime(self.cache._path(content), (index, index))  # pylint: disable=protected-access
+        # Opening an asset marks it as the most recently used.
+        self.cache.open(contents[0])
+
+        # Exceeding the maximum size evicts the least recently used assets, down to 90% of the maximum size.
+        self.cache.store(contents[11])
+        cached = [self.cache.open(content) is not None for content in contents]
+        self.assertEqual(cached, [True, False, False] + [True] * 9)
@@ -168,6 +168,14 @@ def _cohort_cache_key(user_id, course_key):
     return u"{}.{}".format(user_id, course_key)
 
 
+@receiver(COHORT_MEMBERSHIP_UPDATED)
+def _clear_cached_cohort(sender, user, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discards the user's cohort cached for the current request once it changes.
+    """
+    request_cache.get_cache(COHORT_CACHE_NAMESPACE).pop(_cohort_cache_key(user.id, course_key), None)
+
+
 def bulk_cache_cohorts(course_key, users):
     """
     Pre-fetches and caches the cohort assignments for the
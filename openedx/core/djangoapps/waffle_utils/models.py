@@ -50,6 +50,31 @@ class WaffleFlagCourseOverrideModel(ConfigurationModel):
             return effective.override_choice
         return cls.ALL_CHOICES.unset
 
+    @classmethod
+    def override_values(cls, waffle_flag, course_ids):
+        """
+        Returns a dict mapping each of the given course ids to whether the
+        waffle flag was overridden (on or off) for the course, or is unset,
+        as returned by override_value, with a single query.
+
+        Arguments:
+            waffle_flag (String): The name of the flag.
+            course_ids (list of CourseKey): The course ids for which the flag
+                may have been overridden.
+
+        """
+        override_values = {course_id: cls.ALL_CHOICES.unset for course_id in course_ids}
+        if not course_ids or not waffle_flag:
+            return override_values
+
+        # The latest change of each course's override is the effective one.
+        overrides = cls.objects.filter(waffle_flag=waffle_flag, course_id__in=course_ids).order_by('change_date')
+        for override in overrides:
+            override_values[override.course_id] = (
+                override.override_choice if override.enabled else cls.ALL_CHOICES.unset
+            )
+        return override_values
+
     class Meta(object):
         app_label = "waffle_utils"
         verbose_name = 'Waffle flag course override'
@@ -67,6 +67,29 @@ class TestCourseWaffleFlag(TestCase):
             # course which should get the default value of False.
             self.assertEqual(self.TEST_COURSE_FLAG.is_enabled(self.TEST_COURSE_2_KEY), False)
 
+    def test_prefetch_course_overrides(self):
+        """
+        Tests that the overrides prefetched for several courses are used when
+        checking the flag for each of them.
+        """
+        override_values = {
+            self.TEST_COURSE_KEY: WaffleFlagCourseOverrideModel.ALL_CHOICES.on,
+            self.TEST_COURSE_2_KEY: WaffleFlagCourseOverrideModel.ALL_CHOICES.off,
+        }
+        with patch.object(WaffleFlagCourseOverrideModel, 'override_values', return_value=override_values):
+            with patch.object(WaffleFlagCourseOverrideModel, 'override_value') as mock_override_value:
+                self.TEST_COURSE_FLAG.prefetch_course_overrides([self.TEST_COURSE_KEY, self.TEST_COURSE_2_KEY])
+                self.assertTrue(self.TEST_COURSE_FLAG.is_enabled(self.TEST_COURSE_KEY))
+                self.assertFalse(self.TEST_COURSE_FLAG.is_enabled(self.TEST_COURSE_2_KEY))
+                self.assertFalse(mock_override_value.called)
+
+                # overrides that are already cached aren't loaded again
+                self.TEST_COURSE_FLAG.prefetch_course_overrides([self.TEST_COURSE_KEY, self.TEST_COURSE_2_KEY])
+                WaffleFlagCourseOverrideModel.override_values.assert_called_once_with(
+                    self.NAMESPACED_FLAG_NAME,
+                    [self.TEST_COURSE_KEY, self.TEST_COURSE_2_KEY]
+                )
+
     @ddt.data(
         {'flag_undefined_default': None, 'result': False},
         {'flag_undefined_default': False, 'result': False},